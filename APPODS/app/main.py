@@ -8,12 +8,12 @@ import tkinter as tk
 from pathlib import Path
 from PIL import Image
 
-from app.win_reco import open_win_reco      # ⭐ Recomendaciones
-from app.win_home import open_win_home      # 👤 Perfil de usuario
-from app.win_form import open_win_form      # 💵 Ingresos
-from app.win_list import open_win_list      # 🧾 Registro de gastos
-from app.win_table import open_win_table    # 📊 Reporte de gastos
+# Las pantallas (y lo que arrastran: matplotlib, SDKs de IA, importador…) no se importan aquí:
+# el router recibe "módulo:función" (PANTALLAS) y el splash las importa en segundo plano.
+from app.utils import nav                   # root único + router de vistas
 from core.profile import load_profile       # para leer el nombre del usuario
+from core.orchestrator import precalentar_en_segundo_plano
+from core import warmup
 
 APP_TITLE   = "ZAVE MENU"
 APP_VERSION = "v0.1"
@@ -33,14 +33,41 @@ DANGER_DARK        = "#B02A37"
 ASSETS_DIR = Path(__file__).resolve().parent.parent / "assets"
 LOGO_PATH  = ASSETS_DIR / "ZAVE LOGO.png"
 
+# Pantallas del router: (ruta, "módulo:función", título)
+PANTALLAS = [
+    ("reco",     "app.win_reco:open_win_reco",   "Recomendaciones personalizadas"),  # ⭐
+    ("perfil",   "app.win_home:open_win_home",   "Perfil de Usuario"),               # 👤
+    ("ingresos", "app.win_form:open_win_form",   "Ingresos"),                        # 💵
+    ("gastos",   "app.win_list:open_win_list",   "Registro de Gastos"),              # 🧾
+    ("reporte",  "app.win_table:open_win_table", "Reporte de Gastos"),               # 📊
+]
+
+# Logo ya escalado en segundo plano (splash): tamaño en px → PIL.Image
+_LOGO_CACHE: dict = {}
+
 def _init_theme():
     ctk.set_appearance_mode("light")
     ctk.set_default_color_theme("green")
 
+def _logo_px(sw: int, sh: int) -> int:
+    return max(48, int(64 * min(sw/1920, sh/1080)))
+
+def prescalar_logo(size_px: int) -> None:
+    """Abre y escala el logo una vez (solo PIL: puede correr fuera del hilo de Tk)."""
+    with Image.open(LOGO_PATH) as img:
+        _LOGO_CACHE[size_px] = img.convert("RGBA").resize((size_px, size_px), Image.LANCZOS)
+
+def tareas_arranque(sw: int, sh: int) -> list:
+    """Lo que el splash precalienta: core (perfil, ledger, categorías, IA), pantallas y logo."""
+    return warmup.tareas_core() + [
+        warmup.Tarea("Pantallas", 4.0, warmup.importar(*(ref.split(":")[0] for _, ref, _ in PANTALLAS))),
+        warmup.Tarea("Logo", 0.3, lambda: prescalar_logo(_logo_px(sw, sh))),
+    ]
+
 def _load_logo_image(root, size_px=64):
     """Carga el logo ZAVE y guarda la referencia en root para evitar GC."""
     try:
-        img = Image.open(LOGO_PATH)
+        img = _LOGO_CACHE.get(size_px) or Image.open(LOGO_PATH)
         ctk_img = ctk.CTkImage(light_image=img, dark_image=img, size=(size_px, size_px))
         root._zave_logo_img = ctk_img  # mantener referencia viva
         return ctk_img
@@ -86,56 +113,21 @@ def _force_maximize(win: ctk.CTk):
     win.after(50, _zoom)
     win.after(250, _zoom)
 
-def go_to(open_window_fn, current_root: ctk.CTk):
-    """Cierra Main y abre SOLO la ventana destino."""
-    try:
-        current_root.destroy()
-    except Exception:
-        pass
-
-    new_root = ctk.CTk()
-    new_root.withdraw()
-    try:
-        new_root.state("zoomed")
-    except Exception:
-        new_root.geometry("1280x800")
-
-    open_window_fn(new_root)
-
-    def _bind_close_for_children():
-        for w in new_root.winfo_children():
-            if isinstance(w, (ctk.CTkToplevel, tk.Toplevel)):
-                w.protocol("WM_DELETE_WINDOW", new_root.destroy)
-    new_root.after(50, _bind_close_for_children)
-
-    new_root.mainloop()
-
-def main():
-    _init_theme()
-
-    root = ctk.CTk()
-    root.title(APP_TITLE)
-    _force_maximize(root)  # <<— maximiza al abrir
-    global _FIRST_LAUNCH_TIP_SHOWN
-    if not _FIRST_LAUNCH_TIP_SHOWN:
-    # Espera a que la UI pinte y lanza el mensaje
-        root.after(800, lambda: tk.messagebox.showinfo(
-            "Bienvenido a ZAVE",
-            "👋 Bienvenido a ZAVE\n\nPara comenzar, ve a «Perfil de Usuario» y completa tu información. "
-            "Así las recomendaciones serán más precisas."
-        ))
-        _FIRST_LAUNCH_TIP_SHOWN = True
-
-    # Leer nombre del usuario para el saludo
+def _saludo() -> str:
+    """Saludo con el nombre del perfil (o genérico si no hay)."""
     try:
         state = load_profile()
         nombre = (state.get("usuario", {}).get("nombre", "") or "").strip()
     except Exception:
         nombre = ""
-    saludo = f"¡Hola {nombre}!" if nombre else "¡Hola!"
+    return f"¡Hola {nombre}!" if nombre else "¡Hola!"
+
+def _build_menu(parent: ctk.CTk) -> ctk.CTkFrame:
+    """Vista 'inicio' del router: logo, saludo y botones a cada pantalla."""
+    vista = ctk.CTkFrame(parent, fg_color="transparent", corner_radius=0)
 
     # Escalado
-    sw, sh = root.winfo_screenwidth(), root.winfo_screenheight()
+    sw, sh = parent.winfo_screenwidth(), parent.winfo_screenheight()
     scale  = min(sw/1920, sh/1080)
 
     radius        = max(8, int(10 * scale))
@@ -156,14 +148,14 @@ def main():
     pad_footer    = max(6,  int(8 * scale))
 
     # Lienzo
-    outer = ctk.CTkFrame(root, fg_color=BG)
+    outer = ctk.CTkFrame(vista, fg_color=BG)
     outer.pack(fill="both", expand=True, padx=pad_outer, pady=pad_outer)
 
     card = ctk.CTkFrame(outer, fg_color=CARD_BG, corner_radius=radius)
     card.pack(expand=True, padx=pad_card_x, pady=pad_card_y)
 
     # Encabezado con LOGO persistente
-    logo_img = _load_logo_image(root, size_px=max(48, int(64 * scale)))
+    logo_img = _load_logo_image(parent, size_px=_logo_px(sw, sh))
     if logo_img:
         ctk.CTkLabel(
             card, image=logo_img, text="  ZAVE",
@@ -179,12 +171,13 @@ def main():
         ).pack(pady=(pad_top_title, pad_between))
 
     # Saludo personalizado en negrita
-    ctk.CTkLabel(
+    lbl_saludo = ctk.CTkLabel(
         card,
-        text=saludo,
+        text=_saludo(),
         text_color=TEXT,
         font=ctk.CTkFont("Segoe UI Semibold", font_saludo, "bold")
-    ).pack(pady=(0, pad_between))
+    )
+    lbl_saludo.pack(pady=(0, pad_between))
 
     # Chip de versión
     ctk.CTkLabel(
@@ -203,23 +196,23 @@ def main():
 
     # Botones
     _nav_button(card, "⭐\u2003Recomendaciones",
-                lambda: go_to(open_win_reco, root),
+                lambda: nav.ir_a("reco"),
                 radius=radius, font_btn=font_btn, btn_h=btn_h, btn_w=btn_w).pack(pady=pad_between)
 
     _nav_button(card, "👤\u2003Perfil de Usuario",
-                lambda: go_to(open_win_home, root),
+                lambda: nav.ir_a("perfil"),
                 radius=radius, font_btn=font_btn, btn_h=btn_h, btn_w=btn_w).pack(pady=pad_between)
 
     _nav_button(card, "💵\u2003Registro de Ingresos",
-                lambda: go_to(open_win_form, root),
+                lambda: nav.ir_a("ingresos"),
                 radius=radius, font_btn=font_btn, btn_h=btn_h, btn_w=btn_w).pack(pady=pad_between)
 
     _nav_button(card, "🧾\u2003Registro de Gastos",
-                lambda: go_to(open_win_list, root),
+                lambda: nav.ir_a("gastos"),
                 radius=radius, font_btn=font_btn, btn_h=btn_h, btn_w=btn_w).pack(pady=pad_between)
 
     _nav_button(card, "📊\u2003Reporte de Gastos",
-                lambda: go_to(open_win_table, root),
+                lambda: nav.ir_a("reporte"),
                 radius=radius, font_btn=font_btn, btn_h=btn_h, btn_w=btn_w).pack(pady=pad_between)
 
     ctk.CTkFrame(card, fg_color=SEPARATOR, height=2)\
@@ -228,7 +221,7 @@ def main():
     ctk.CTkButton(
         card,
         text="🚪\u2003Salir",
-        command=root.destroy,
+        command=nav.salir,
         fg_color=DANGER,
         hover_color=DANGER_DARK,
         text_color="white",
@@ -238,6 +231,36 @@ def main():
         width=btn_w
     ).pack(pady=(pad_between, pad_top_title))
 
+    # Al volver a Inicio tras editar el perfil solo cambia el saludo
+    nav.al_volver(vista, lambda: lbl_saludo.configure(text=_saludo()))
+    return vista
+
+def main():
+    _init_theme()
+    precalentar_en_segundo_plano()  # conexiones IA listas antes del primer gasto
+
+    root = ctk.CTk()
+    root.title(APP_TITLE)
+    root.minsize(1280, 720)
+    _force_maximize(root)  # <<— maximiza al abrir
+    global _FIRST_LAUNCH_TIP_SHOWN
+    if not _FIRST_LAUNCH_TIP_SHOWN:
+    # Espera a que la UI pinte y lanza el mensaje
+        root.after(800, lambda: tk.messagebox.showinfo(
+            "Bienvenido a ZAVE",
+            "👋 Bienvenido a ZAVE\n\nPara comenzar, ve a «Perfil de Usuario» y completa tu información. "
+            "Así las recomendaciones serán más precisas."
+        ))
+        _FIRST_LAUNCH_TIP_SHOWN = True
+
+    # Un solo root en toda la sesión: cada pantalla es una vista que se construye una vez
+    # y después solo se oculta/muestra (o se refresca si los datos cambiaron)
+    nav.iniciar(root)
+    nav.registrar("inicio",   _build_menu,    APP_TITLE)
+    for ruta, ref, titulo in PANTALLAS:
+        nav.registrar(ruta, ref, titulo)
+    nav.ir_a("inicio")
+
     root.mainloop()
 
 if __name__ == "__main__":
@@ -1,5 +1,6 @@
 # app/splash.py
-# Splash con animación y barra de progreso (bloqueante), carga de logo desde APPODS/assets.
+# Splash con barra de progreso (bloqueante) que sigue el precalentamiento real (core.warmup),
+# carga de logo desde APPODS/assets.
 
 import customtkinter as ctk
 import tkinter as tk
@@ -9,6 +10,8 @@ import time
 # Pillow para cargar y escalar el logo SIEMPRE
 from PIL import Image, ImageTk, ImageOps
 
+from core import warmup
+
 PRIMARY_BLUE = "#2563EB"
 TEXT         = "#111827"
 TEXT_MUTED   = "#6B7280"
@@ -57,10 +60,13 @@ def _load_logo_tkimage(target_px: int = 164):
         img = Image.new("RGBA", (target_px, target_px), (37, 99, 235, 255))
         return ImageTk.PhotoImage(img)
 
-def run_splash_then(callback, duration_ms: int = 2000):
+def run_splash_then(callback, timeout_ms: int = 20000, tareas=None):
     """
-    Muestra un splash animado durante `duration_ms` ms y luego ejecuta `callback()`.
-    Bloquea la ejecución con su propio mainloop y destruye todo antes de llamar al callback.
+    Muestra el splash mientras core.warmup corre el arranque en hilos de fondo (pantallas,
+    perfil, ledger, categorías, logo, conexiones IA) y ejecuta `callback()` en cuanto termina.
+    La barra refleja el avance real (peso de las tareas terminadas); `timeout_ms` es solo un
+    tope por si alguna tarea se cuelga. Bloquea con su propio mainloop y destruye todo antes
+    de llamar al callback.
     """
     # Root CTk (oculto). El splash será un Toplevel sobre este root.
     root = ctk.CTk()
@@ -79,6 +85,12 @@ def run_splash_then(callback, duration_ms: int = 2000):
     y = (sh - H) // 2
     splash.geometry(f"{W}x{H}+{x}+{y}")
 
+    # Arranca el trabajo antes de pintar: corre mientras se arma el splash
+    if tareas is None:
+        from app.main import tareas_arranque
+        tareas = tareas_arranque(sw, sh)
+    warmup.iniciar(tareas)
+
     # ---- Contenido ----
     body = tk.Frame(splash, bg=BG)
     body.pack(fill="both", expand=True, padx=22, pady=22)
@@ -102,48 +114,51 @@ def run_splash_then(callback, duration_ms: int = 2000):
     lbl_loading = tk.Label(body, text="Cargando", font=("Segoe UI", 10), fg=TEXT_MUTED, bg=BG)
     lbl_loading.pack()
 
-    # --- Animación (after loop) ---
+    # --- Sondeo del avance (after loop) ---
     start_t   = time.perf_counter()
-    total_s   = max(0.2, duration_ms / 1000.0)  # evita 0
+    limite_s  = max(0.2, timeout_ms / 1000.0)
     after_id  = {"id": None}
-    dots_step = {"i": 0}
+    mostrado  = {"v": 0.0}
 
-    def ease_out_cubic(x: float) -> float:
-        return 1 - pow(1 - x, 3)
+    def _cerrar_y_lanzar():
+        # Cerrar splash y root ANTES de lanzar el main
+        try:
+            if after_id["id"]:
+                splash.after_cancel(after_id["id"])
+        except Exception:
+            pass
+        try:
+            splash.destroy()
+        except Exception:
+            pass
+        try:
+            root.destroy()
+        except Exception:
+            pass
+        # Lanzar main
+        try:
+            callback()
+        except Exception:
+            pass
 
     def tick():
-        t = time.perf_counter() - start_t
-        prog = min(1.0, t / total_s)
-        pb.set(ease_out_cubic(prog))
-
-        # Anima "Cargando..." con puntos
-        dots_step["i"] = (dots_step["i"] + 1) % 4
-        lbl_loading.config(text="Cargando" + "." * dots_step["i"] + " " * (3 - dots_step["i"]))
-
-        if prog < 1.0:
-            after_id["id"] = splash.after(70, tick)
-        else:
-            # Cerrar splash y root ANTES de lanzar el main
-            try:
-                if after_id["id"]:
-                    splash.after_cancel(after_id["id"])
-            except Exception:
-                pass
-            try:
-                splash.destroy()
-            except Exception:
-                pass
-            try:
-                root.destroy()
-            except Exception:
-                pass
-            # Lanzar main
-            try:
-                callback()
-            except Exception:
-                pass
-
-    # Mostrar y arrancar animación
+        # La barra alcanza al avance real en pocos cuadros (sin saltos), nunca lo adelanta
+        real = warmup.progreso()
+        mostrado["v"] += (real - mostrado["v"]) * 0.5
+        pb.set(mostrado["v"])
+        actual = warmup.actual()
+        lbl_loading.config(text=f"Cargando {actual.lower()}…" if actual else "Cargando…")
+
+        listo = warmup.terminado() and real - mostrado["v"] < 0.02
+        if listo or time.perf_counter() - start_t > limite_s:
+            if not warmup.terminado():
+                print(f"[SPLASH] arranque incompleto tras {limite_s:.0f}s; se continúa en frío")
+            pb.set(1.0)
+            _cerrar_y_lanzar()
+            return
+        after_id["id"] = splash.after(30, tick)
+
+    # Mostrar y arrancar sondeo
     root.after(0, splash.deiconify)
     tick()
     try:
@@ -1,39 +1,122 @@
-# Navegación segura a Inicio (Main)
+# Navegación: un solo root (CTk) para toda la app y un router que intercambia vistas (frames)
+import importlib
 import tkinter as tk
 import customtkinter as ctk
 from tkinter import messagebox
+from typing import Callable, Dict, Optional, Union
 
-def go_home(win: tk.Toplevel, parent: ctk.CTk | tk.Tk, after_ids: list[str] | None = None):
+from core.paths import version_archivos
+
+# Además del ledger (core.storage.version_ledger), lo que deja viejas a las vistas ya construidas
+_ARCHIVOS_DATOS = ("user_profile.json", "categorias.json")
+
+# rutas:     nombre → (construir(parent) -> frame o "módulo:función", título de la ventana)
+# vistas:    nombre → {"frame", "version"}; a lo más una por ruta, así la memoria no crece al navegar
+# refrescar: ruta del widget (str(frame)) → función que actualiza la vista en su lugar
+_NAV: Dict[str, object] = {"root": None, "rutas": {}, "vistas": {}, "refrescar": {}, "actual": None}
+
+
+def _version_datos() -> tuple:
+    """Ledger + (mtime, tamaño) de perfil y categorías: si no cambió, las vistas en caché siguen vigentes."""
+    from core.storage import version_ledger   # el warmup ya lo importó; el menú arranca sin él
+    return (version_ledger(),) + version_archivos(_ARCHIVOS_DATOS)
+
+
+def iniciar(root: ctk.CTk) -> None:
+    """Root de larga vida: las vistas se construyen dentro de él y nunca se crea otro CTk."""
+    _NAV.update(root=root, vistas={}, refrescar={}, actual=None)
+
+
+def registrar(nombre: str, construir: Union[str, Callable[[ctk.CTk], tk.Misc]], titulo: str) -> None:
+    """
+    construir(parent) arma la vista dentro de un frame (sin empacarlo) y lo devuelve.
+    Con "módulo:función" el módulo se importa hasta que la vista se abre por primera vez.
     """
-    Cancela timers .after() pendientes, destruye la ventana actual y el root oculto,
-    y relanza app.main.main() desde cero para que el logo/imágenes se carguen bien.
+    _NAV["rutas"][nombre] = (construir, titulo)
+
+
+def _constructor(nombre: str) -> Callable[[ctk.CTk], tk.Misc]:
+    construir, titulo = _NAV["rutas"][nombre]
+    if isinstance(construir, str):
+        modulo, funcion = construir.split(":")
+        construir = getattr(importlib.import_module(modulo), funcion)
+        _NAV["rutas"][nombre] = (construir, titulo)
+    return construir
 
-    - win: CTkToplevel/Toplevel de la ventana actual.
-    - parent: root (oculto) que recibió esta Toplevel.
-    - after_ids: lista con ids devueltos por .after(...) a cancelar.
+
+def al_volver(vista: tk.Misc, refrescar: Callable[[], None]) -> None:
     """
-    # 1) Cancelar timers
-    if after_ids:
-        for aid in list(after_ids):
-            try:
-                win.after_cancel(aid)
-            except Exception:
-                pass
-        after_ids.clear()
-
-    # 2) Cerrar UI actual
-    try:
-        win.destroy()
-    except Exception:
-        pass
+    Cómo actualizar `vista` sin reconstruirla cuando los datos cambiaron mientras estaba oculta.
+    Las vistas sin esta función se reconstruyen en ese caso.
+    """
+    _NAV["refrescar"][str(vista)] = refrescar
+
+
+def _descartar(nombre: str) -> None:
+    v = _NAV["vistas"].pop(nombre, None)
+    if v is None:
+        return
+    _NAV["refrescar"].pop(str(v["frame"]), None)
     try:
-        parent.destroy()
+        v["frame"].destroy()
     except Exception:
         pass
 
-    # 3) Relanzar Main
-    try:
-        from app.main import main as launch_main
-        launch_main()
-    except Exception as e:
-        messagebox.showerror("Error", f"No fue posible abrir Inicio:\n{e}")
+
+def ir_a(nombre: str) -> None:
+    """Oculta la vista actual y muestra `nombre`: la construye la primera vez, después solo la empaca."""
+    root = _NAV["root"]
+    actual = _NAV["actual"]
+    if actual == nombre and nombre in _NAV["vistas"]:
+        return
+    if actual in _NAV["vistas"]:
+        v = _NAV["vistas"][actual]
+        v["frame"].pack_forget()
+        v["version"] = _version_datos()   # lo que la vista misma guardó no cuenta como cambio externo
+
+    titulo = _NAV["rutas"][nombre][1]
+    v = _NAV["vistas"].get(nombre)
+    if v is not None and v["version"] != _version_datos():
+        refrescar = _NAV["refrescar"].get(str(v["frame"]))
+        try:
+            if refrescar is None:
+                raise LookupError(nombre)
+            refrescar()
+        except Exception:
+            _descartar(nombre)
+            v = None
+    if v is None:
+        try:
+            frame = _constructor(nombre)(root)
+        except Exception as e:
+            messagebox.showerror("Error", f"No fue posible abrir «{titulo}»:\n{e}")
+            if actual in _NAV["vistas"]:
+                _NAV["vistas"][actual]["frame"].pack(fill="both", expand=True)
+            return
+        v = _NAV["vistas"][nombre] = {"frame": frame, "version": None}
+
+    v["frame"].pack(fill="both", expand=True)
+    root.title(titulo)
+    _NAV["actual"] = nombre
+
+
+def recargar(nombre: Optional[str] = None) -> None:
+    """Reconstruye la vista (por omisión, la actual) con los datos de disco."""
+    nombre = nombre or _NAV["actual"]
+    if nombre is None:
+        return
+    _descartar(nombre)
+    if nombre == _NAV["actual"]:
+        _NAV["actual"] = None
+        ir_a(nombre)
+
+
+def go_home() -> None:
+    """Regresa al menú de Inicio (la vista 'inicio' registrada por app.main)."""
+    ir_a("inicio")
+
+
+def salir() -> None:
+    root = _NAV["root"]
+    if root is not None:
+        root.destroy()
@@ -0,0 +1,56 @@
+# Selector de periodo para los reportes (win_table / win_reco)
+import customtkinter as ctk
+from tkinter import messagebox
+
+from core.fechas import PERIODOS, periodo, rango_personalizado
+
+TEXT       = "#111827"
+SEPARATOR  = "#E5E7EB"
+
+
+def selector_periodo(parent, al_cambiar, font_size: int = 12) -> ctk.CTkFrame:
+    """
+    Frame con el menú de periodos (Todo / Este mes / Últimos 3 meses / Rango personalizado).
+    Con "Rango personalizado" aparecen dos campos de fecha (inclusivas) y el botón Aplicar.
+    al_cambiar(desde, hasta, etiqueta) recibe fechas ISO (hasta exclusivo; None = sin límite),
+    listas para load_gastos(desde, hasta) / totales_por_categoria(desde, hasta).
+    """
+    font = ctk.CTkFont("Segoe UI", font_size)
+    por_etiqueta = {v: k for k, v in PERIODOS.items()}
+
+    frame = ctk.CTkFrame(parent, fg_color="transparent")
+    ctk.CTkLabel(frame, text="Periodo:", text_color=TEXT, font=font).pack(side="left", padx=(0, 6))
+
+    rango = ctk.CTkFrame(frame, fg_color="transparent")
+    ent_desde = ctk.CTkEntry(rango, width=110, placeholder_text="Desde AAAA-MM-DD")
+    ent_hasta = ctk.CTkEntry(rango, width=110, placeholder_text="Hasta AAAA-MM-DD")
+    ent_desde.pack(side="left", padx=2)
+    ent_hasta.pack(side="left", padx=2)
+
+    def _aplicar_rango():
+        try:
+            desde, hasta = rango_personalizado(ent_desde.get(), ent_hasta.get())
+        except ValueError as e:
+            messagebox.showwarning("Periodo", str(e))
+            return
+        etiqueta = f"{(ent_desde.get() or '…').strip()} – {(ent_hasta.get() or '…').strip()}"
+        al_cambiar(desde, hasta, etiqueta)
+
+    ctk.CTkButton(rango, text="Aplicar", width=70,
+                  fg_color="white", hover_color="#F8FAFF",
+                  text_color=TEXT, border_color=SEPARATOR, border_width=2,
+                  corner_radius=8, command=_aplicar_rango).pack(side="left", padx=(4, 0))
+
+    def _elegir(etiqueta: str):
+        clave = por_etiqueta[etiqueta]
+        if clave == "rango":
+            rango.pack(side="left", padx=(6, 0))
+            return
+        rango.pack_forget()
+        desde, hasta = periodo(clave)
+        al_cambiar(desde, hasta, etiqueta)
+
+    menu = ctk.CTkOptionMenu(frame, values=list(PERIODOS.values()), command=_elegir, font=font)
+    menu.set(PERIODOS["todo"])
+    menu.pack(side="left")   # el rango se empaca después: queda a la derecha del menú
+    return frame
@@ -0,0 +1,153 @@
+# Tabla virtual: un Treeview que solo tiene las filas visibles; las demás se formatean al llegar a ellas
+from functools import lru_cache
+from tkinter import ttk
+from typing import Callable, Dict, Optional, Sequence, Tuple
+
+Columna = Tuple[str, str, int, str]   # (id, encabezado, ancho, alineación)
+
+_CACHE_FILAS = 512   # filas ya formateadas que se conservan (ir y volver sin formatear otra vez)
+_PASO_RUEDA = 3      # filas por paso de la rueda del ratón
+
+
+def tabla_virtual(parent, columnas: Sequence[Columna], alto_filas: int = 15,
+                  al_ordenar: Optional[Callable[[str, bool], None]] = None, ordenables: Sequence[str] = ()
+                  ) -> Tuple[ttk.Treeview, Callable[[int, Optional[Callable[[int], tuple]]], None]]:
+    """
+    Coloca en `parent` (grid 0,0 y 0,1) un Treeview con scrollbar que nunca tiene más items que
+    filas en pantalla: al desplazarse se reutilizan los mismos items con otros valores.
+    Devuelve (tree, mostrar); mostrar(n, fila) cambia el contenido a n filas, donde fila(i)
+    da los valores de la fila i y solo se llama para las que entran en pantalla.
+    Los encabezados de `ordenables` llaman a al_ordenar(columna, descendente) al hacer clic
+    (un segundo clic en la misma columna invierte el orden) y muestran ▲/▼.
+    """
+    tree = ttk.Treeview(parent, columns=[c[0] for c in columnas], show="headings",
+                        height=alto_filas, selectmode="browse")
+    for col, text, width, anchor in columnas:
+        tree.heading(col, text=text)
+        tree.column(col, width=width, anchor=anchor)
+        if al_ordenar and col in ordenables:
+            tree.heading(col, command=lambda c=col: _ordenar(c))
+    tree.grid(row=0, column=0, sticky="nsew")
+    sb = ttk.Scrollbar(parent, orient="vertical")
+    sb.grid(row=0, column=1, sticky="ns")
+
+    # inicio: fila del ledger en el primer item; sel: fila seleccionada (índice absoluto, no item)
+    # orden: (columna, descendente) del último clic en un encabezado
+    est: Dict[str, object] = {"n": 0, "fila": None, "inicio": 0, "visibles": alto_filas,
+                              "sel": None, "pendiente": False, "orden": None}
+
+    def _ordenar(col: str):
+        desc = est["orden"] == (col, False)
+        est["orden"] = (col, desc)
+        for c, text, _, _ in columnas:
+            tree.heading(c, text=text + ((" ▼" if desc else " ▲") if c == col else ""))
+        al_ordenar(col, desc)
+
+    def _pintar():
+        est["pendiente"] = False
+        if not tree.winfo_exists():
+            return
+        n, vis = est["n"], est["visibles"]
+        inicio = est["inicio"] = max(0, min(est["inicio"], n - vis))
+        cuantos = max(0, min(vis, n - inicio))
+
+        items = tree.get_children()
+        if len(items) > cuantos:
+            tree.delete(*items[cuantos:])
+        for k in range(len(items), cuantos):
+            tree.insert("", "end", iid=f"v{k}")
+        fila = est["fila"]
+        for k in range(cuantos):
+            tree.item(f"v{k}", values=fila(inicio + k))
+
+        sel = est["sel"]
+        if sel is not None and inicio <= sel < inicio + cuantos:
+            tree.selection_set(f"v{sel - inicio}")
+            tree.focus(f"v{sel - inicio}")
+        elif tree.selection():
+            tree.selection_remove(*tree.selection())
+        if n:
+            sb.set(inicio / n, (inicio + cuantos) / n)
+        else:
+            sb.set(0.0, 1.0)
+
+    def _programar():
+        # Varios eventos de scroll seguidos (arrastrar la barra) se pintan una sola vez
+        if not est["pendiente"]:
+            est["pendiente"] = True
+            tree.after_idle(_pintar)
+
+    def _mover(inicio: int):
+        inicio = max(0, min(inicio, est["n"] - est["visibles"]))
+        if inicio != est["inicio"]:
+            est["inicio"] = inicio
+            _programar()
+
+    def _yview(*args):
+        if args[0] == "moveto":
+            _mover(int(round(float(args[1]) * est["n"])))
+        elif args[0] == "scroll":
+            paso = int(args[1]) * (est["visibles"] if args[2] == "pages" else 1)
+            _mover(est["inicio"] + paso)
+
+    def _rueda(event):
+        if event.num in (4, 5):          # X11
+            pasos = -1 if event.num == 4 else 1
+        elif abs(event.delta) >= 120:    # Windows
+            pasos = -int(event.delta / 120)
+        else:                            # macOS
+            pasos = -event.delta
+        _mover(est["inicio"] + pasos * _PASO_RUEDA)
+        return "break"
+
+    def _ir_a_fila(sel: int):
+        n = est["n"]
+        if not n:
+            return "break"
+        sel = est["sel"] = max(0, min(sel, n - 1))
+        if sel < est["inicio"]:
+            est["inicio"] = sel
+        elif sel >= est["inicio"] + est["visibles"]:
+            est["inicio"] = sel - est["visibles"] + 1
+        _programar()
+        return "break"
+
+    def _seleccion(_):
+        s = tree.selection()
+        if s:
+            est["sel"] = est["inicio"] + tree.index(s[0])
+
+    def _ajustar(_=None):
+        # Cuántas filas completas caben con el alto actual (la última a medias haría que el Treeview se desplace solo)
+        caja = tree.bbox("v0") if tree.winfo_exists() and tree.exists("v0") else None
+        if not caja:
+            return
+        encabezado, alto = caja[1], caja[3]
+        vis = max(1, (tree.winfo_height() - encabezado) // max(1, alto))
+        if vis != est["visibles"]:
+            est["visibles"] = vis
+            _programar()
+
+    def _sel_actual() -> int:
+        return est["sel"] if est["sel"] is not None else est["inicio"] - 1
+
+    sb.configure(command=_yview)
+    tree.bind("<MouseWheel>", _rueda)
+    tree.bind("<Button-4>", _rueda)
+    tree.bind("<Button-5>", _rueda)
+    tree.bind("<<TreeviewSelect>>", _seleccion)
+    tree.bind("<Configure>", _ajustar)
+    tree.bind("<Up>", lambda e: _ir_a_fila(_sel_actual() - 1))
+    tree.bind("<Down>", lambda e: _ir_a_fila(_sel_actual() + 1))
+    tree.bind("<Prior>", lambda e: _ir_a_fila(_sel_actual() - est["visibles"]))
+    tree.bind("<Next>", lambda e: _ir_a_fila(_sel_actual() + est["visibles"]))
+    tree.bind("<Home>", lambda e: _ir_a_fila(0))
+    tree.bind("<End>", lambda e: _ir_a_fila(est["n"] - 1))
+
+    def mostrar(n: int, fila: Optional[Callable[[int], tuple]] = None) -> None:
+        est.update(n=n if fila else 0, inicio=0, sel=None,
+                   fila=lru_cache(maxsize=_CACHE_FILAS)(fila) if fila else None)
+        _pintar()
+        tree.after_idle(_ajustar)   # con los items ya dibujados se conoce el alto de fila
+
+    return tree, mostrar
@@ -2,11 +2,12 @@
 import customtkinter as ctk
 import tkinter as tk
 from tkinter import messagebox
-import re
 
 from core.classifier import classify_user
 
 from core.profile import load_profile, save_profile
+from core.money import parse_money_strict   # parser estricto compartido (centavos exactos)
+from app.utils import nav
 
 # Paleta coherente (azul)
 PRIMARY_BLUE       = "#2563EB"
@@ -17,35 +18,7 @@ TEXT               = "#111827"
 TEXT_MUTED         = "#6B7280"
 SEPARATOR          = "#E5E7EB"
 
-# ---- Parser estricto de dinero + formateo -----------------------------------
-_MONEY_CLEAN_RE = re.compile(r"[,\s]")
-
-def parse_money_strict(txt: str) -> float | None:
-    """
-    Acepta: 1234, 1,234.56, $1,234.56, 1 234,56
-    Rechaza letras u otros símbolos (salvo $ , . y espacios).
-    Devuelve float o None si inválido.
-    """
-    if txt is None:
-        return None
-    s = str(txt).strip()
-    if s == "":
-        return None
-    if re.search(r"[A-Za-z]", s):
-        return None
-    s = s.replace("$", "")
-    s = _MONEY_CLEAN_RE.sub("", s)  # quita comas y espacios
-    # normaliza coma decimal estilo EU
-    if not re.fullmatch(r"-?\d+(\.\d+)?", s):
-        if re.fullmatch(r"-?\d+(,\d+)?", s):
-            s = s.replace(",", ".")
-        else:
-            return None
-    try:
-        return float(s)
-    except Exception:
-        return None
-
+# ---- Formateo de dinero -----------------------------------------------------
 def fmt_money(v: float | int | str) -> str:
     try:
         return f"{float(v):,.2f}"
@@ -54,14 +27,8 @@ def fmt_money(v: float | int | str) -> str:
 
 
 def open_win_form(parent: ctk.CTk):
-    # Ventana secundaria
-    win = ctk.CTkToplevel(parent)
-    win.title("Ingresos")
-    try:
-        win.state("zoomed")
-    except Exception:
-        win.geometry("1280x800")
-    win.minsize(1280, 720)
+    # Vista del router (se construye una vez y se reutiliza)
+    win = ctk.CTkFrame(parent, fg_color=BG, corner_radius=0)
 
     # ---------- Escalado adaptable ----------
     sw, sh = win.winfo_screenwidth(), win.winfo_screenheight()
@@ -296,18 +263,8 @@ def open_win_form(parent: ctk.CTk):
             if not messagebox.askyesno("Volver a inicio",
                                        "Algunos datos no son válidos y no se guardarán.\n¿Volver a inicio de todas formas?"):
                 return
-        # 2) cerrar esta ventana y el root oculto
-        try:
-            win.destroy()
-        except Exception:
-            pass
-        try:
-            parent.destroy()
-        except Exception:
-            pass
-        # 3) relanzar Main
-        from app.main import main as launch_main
-        launch_main()
+        # 2) volver al menú (esta vista queda en caché)
+        nav.go_home()
 
     # Botonera
     btns = ctk.CTkFrame(card, fg_color=CARD_BG)
@@ -332,7 +289,8 @@ def open_win_form(parent: ctk.CTk):
                   fg_color="white", hover_color="#F8FAFF",
                   text_color=TEXT, border_color=SEPARATOR, border_width=2,
                   corner_radius=8, height=btn_h, font=ctk.CTkFont("Segoe UI", font_btn),
-                  command=win.destroy).grid(row=0, column=2, sticky="e")
+                  command=nav.salir).grid(row=0, column=2, sticky="e")
     # Atajos prácticos
     ent_var_concepto.bind("<Return>", lambda _e: ent_var_monto.focus_set())
     ent_var_monto.bind("<Return>", lambda _e: _agregar_var())
+    return win
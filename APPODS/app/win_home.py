@@ -2,11 +2,11 @@
 import customtkinter as ctk
 import tkinter as tk
 from tkinter import messagebox
-import re
 
 from core.profile import load_profile, save_profile, is_valid_email, to_float, to_int
 from core.classifier import classify_user
-from app.utils.nav import go_home   # <-- NUEVO
+from core.money import parse_money_strict
+from app.utils import nav
 
 # Paleta (azul)
 PRIMARY_BLUE       = "#2563EB"
@@ -19,29 +19,6 @@ SEPARATOR          = "#E5E7EB"
 ERROR_RED          = "#DC2626"
 BORDER_DEFAULT     = "#D1D5DB"
 
-# --------- Parser de dinero estricto ---------
-_MONEY_CLEAN_RE = re.compile(r"[,\s]")
-def parse_money_strict(txt: str) -> float | None:
-    if txt is None:
-        return None
-    s = str(txt).strip()
-    if s == "":
-        return None
-    if re.search(r"[A-Za-z]", s):
-        return None
-    s = s.replace("$", "")
-    s = _MONEY_CLEAN_RE.sub("", s)
-    if not re.fullmatch(r"-?\d+(\.\d+)?", s):
-        if re.fullmatch(r"-?\d+(,\d+)?", s):
-            s = s.replace(",", ".")
-        else:
-            return None
-    try:
-        return float(s)
-    except Exception:
-        return None
-
-
 class ErrorInline:
     def __init__(self):
         self._labels = {}  # entry -> (parent_frame, label_widget)
@@ -91,13 +68,7 @@ class ErrorInline:
 
 
 def open_win_home(parent: ctk.CTk):
-    win = ctk.CTkToplevel(parent)
-    win.title("Perfil de Usuario")
-    try:
-        win.state("zoomed")
-    except Exception:
-        win.geometry("1280x800")
-    win.minsize(1280, 720)
+    win = ctk.CTkFrame(parent, fg_color=BG, corner_radius=0)
 
     sw, sh = win.winfo_screenwidth(), win.winfo_screenheight()
     scale = min(sw/1920, sh/1080)
@@ -284,8 +255,7 @@ def open_win_home(parent: ctk.CTk):
     def _go_home():
         if not _save_for_nav():
             return
-        # Usa la utilidad unificada (evita ImportErrors y pyimage...)
-        go_home(win, parent)
+        nav.go_home()
 
     btn_inicio = ctk.CTkButton(
         main, text="⟵ Inicio",
@@ -675,9 +645,10 @@ def open_win_home(parent: ctk.CTk):
     ctk.CTkButton(btns, text="Cerrar",
                   fg_color="white", hover_color="#F8FAFF",
                   text_color=TEXT, border_color=SEPARATOR, border_width=2,
-                  corner_radius=8, command=win.destroy)\
+                  corner_radius=8, command=nav.salir)\
         .pack(side="right", padx=6)
 
     # ---------- Inicializar ----------
     state = load_profile()
     _load_to_widgets()
+    return win
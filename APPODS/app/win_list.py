@@ -1,18 +1,19 @@
 # win_list.py — ZAVE (Registro de Gastos con IA/CSV + edición + botón Inicio + eliminación persistente)
 import customtkinter as ctk
 import tkinter as tk
-from tkinter import messagebox
-import json
+from tkinter import messagebox, filedialog
+from datetime import datetime
+import threading
 
 # Persistencia CSV
-from core.storage import append_gasto, load_gastos, clear_gastos, save_all_gastos
+from core.storage import append_gasto, load_gastos, clear_gastos, update_gasto, delete_gasto, actualizar_categoria
 
-# IA: primero Gemini, luego OpenAI (ai.py). Si ambas fallan, ai.py cae a local.
-from core.ai_gemini import clasificar_texto_gemini
-from core.ai import clasificar_texto as clasificar_texto_openai
-
-# Utilidad para ubicar data/
-from core.paths import get_data_dir
+# Clasificación: keymap local → caché → Gemini → OpenAI (la IA corre en hilos de fondo)
+from core.money import parse_money_strict, to_float
+from core.categorizer import clasificar_rapido, clasificar_en_segundo_plano, CATEGORIA_PENDIENTE
+from core.importer import importar
+from core.categories import categorias
+from app.utils import nav
 
 # Paleta coherente (Versión A, primario AZUL)
 PRIMARY_BLUE       = "#2563EB"
@@ -24,41 +25,8 @@ TEXT_MUTED         = "#6B7280"
 SEPARATOR          = "#E5E7EB"
 
 
-def _load_categorias_list() -> list[str]:
-    """Carga la lista de categorías desde data/categorias.json (o un fallback)."""
-    try:
-        with open(get_data_dir() / "categorias.json", "r", encoding="utf-8") as f:
-            data = json.load(f)
-            cats = data.get("categorias")
-            if isinstance(cats, list) and cats:
-                return cats
-    except Exception:
-        pass
-    return [
-        "Alimentos y Bebidas > Supermercado",
-        "Alimentos y Bebidas > Restaurante / Comida rápida",
-        "Alimentos y Bebidas > Cafetería / Snacks",
-        "Transporte > Gasolina / Ride-hailing",
-        "Transporte > Público / Estacionamiento",
-        "Vivienda y Servicios > Renta / Hogar",
-        "Vivienda y Servicios > Servicios básicos (luz, agua, internet)",
-        "Salud y Bienestar > Medicinas / Consultas",
-        "Compras Personales > Ropa / Electrónica / Hogar",
-        "Mascotas > Alimento / Cuidado",
-        "Entretenimiento y Ocio > Cine / Streaming / Eventos",
-        "Finanzas y Trámites > Ahorro / Pagos / Impuestos",
-        "Otros"
-    ]
-
-
 def open_win_list(parent: ctk.CTk):
-    win = ctk.CTkToplevel(parent)
-    win.title("Registro de Gastos")
-    try:
-        win.state("zoomed")
-    except Exception:
-        win.geometry("1280x800")
-    win.minsize(1280, 720)
+    win = ctk.CTkFrame(parent, fg_color=BG, corner_radius=0)
 
     # ---------- Escalado adaptable ----------
     sw, sh = win.winfo_screenwidth(), win.winfo_screenheight()
@@ -116,10 +84,14 @@ def open_win_list(parent: ctk.CTk):
     actions.grid(row=4, column=0, columnspan=4, sticky="ew", pady=6, padx=pad_card)
     actions.grid_columnconfigure(0, weight=1)  # para empujar botones a la derecha
 
-    # Estado interno: mapeo 1:1 lista ↔ CSV
-    # lb_items[i] = {"csv_index", "desc", "cat", "monto", "fecha"}
+    # Estado interno: mapeo 1:1 lista ↔ CSV (por id estable de cada gasto)
+    # lb_items[i] = {"id", "desc", "cat", "monto", "fecha"}
     lb_items: list[dict] = []
-    CATS = _load_categorias_list()
+    CATS = categorias()
+
+    # Clasificaciones en curso (Futures) + id del sondeo .after()
+    pendientes: list = []
+    sondeo = {"id": None}
 
     def _format_row_text(desc: str, cat: str, monto_val: float) -> str:
         return f"{desc}  —  [{cat}]  —  ${monto_val:,.2f}"
@@ -128,17 +100,13 @@ def open_win_list(parent: ctk.CTk):
         lb.delete(0, "end")
         lb_items.clear()
         rows = load_gastos()
-        for idx, r in enumerate(rows):
+        for r in rows:
             desc  = (r.get("descripcion") or "").strip()
             cat   = (r.get("categoria") or "Otros").strip()
-            monto_txt = (r.get("monto") or "0").strip()
-            try:
-                monto_val = float(monto_txt.replace(",", "")) if monto_txt else 0.0
-            except ValueError:
-                monto_val = 0.0
+            monto_val = to_float(r.get("monto"))
             lb.insert("end", _format_row_text(desc, cat, monto_val))
             lb_items.append({
-                "csv_index": idx,
+                "id": r.get("id") or "",
                 "desc": desc,
                 "cat": cat,
                 "monto": monto_val,
@@ -151,19 +119,20 @@ def open_win_list(parent: ctk.CTk):
             messagebox.showwarning("Aviso", "Escribe la descripción del gasto.")
             return
         monto_txt = (ent_monto.get() or "").strip()
-        try:
-            monto_val = float(monto_txt) if monto_txt else 0.0
-        except ValueError:
+        monto_val = parse_money_strict(monto_txt) if monto_txt else 0.0
+        if monto_val is None:
             messagebox.showwarning("Aviso", "Monto inválido. Usa un número (ej. 120.50).")
             return
 
-        # IA: Gemini → OpenAI → Local
-        cat = clasificar_texto_gemini(desc)
-        if cat == "Otros":
-            cat = clasificar_texto_openai(desc)
+        # Keymap/caché al instante; si no alcanza, se guarda con categoría provisional
+        # y la IA la completa en segundo plano.
+        cat = clasificar_rapido(desc)
+        fecha = datetime.now().isoformat(timespec="seconds")
 
         # Persistir (al final del CSV)
-        append_gasto(descripcion=desc, categoria=cat, monto=monto_val)
+        gasto_id = append_gasto(descripcion=desc, categoria=cat or CATEGORIA_PENDIENTE, monto=monto_val, fecha=fecha)
+        if not cat:
+            _clasificar_en_fondo(gasto_id, desc)
 
         # Recargar mapeo/visualización
         _reload_rows_meta_from_csv()
@@ -171,6 +140,28 @@ def open_win_list(parent: ctk.CTk):
         # Limpiar campos
         ent_desc.delete(0, "end")
         ent_monto.delete(0, "end")
+        ent_desc.focus_set()
+
+    def _clasificar_en_fondo(gasto_id: str, desc: str):
+        # _persistir corre en el hilo del pool: el CSV se corrige aunque la ventana ya esté cerrada
+        def _persistir(cat: str):
+            actualizar_categoria(gasto_id, cat, anterior=CATEGORIA_PENDIENTE)
+
+        pendientes.append(clasificar_en_segundo_plano(desc, al_terminar=_persistir))
+        if sondeo["id"] is None:
+            sondeo["id"] = win.after(150, _sondear_pendientes)
+
+    def _sondear_pendientes():
+        sondeo["id"] = None
+        if not win.winfo_exists():
+            return
+        listos = [f for f in pendientes if f.done()]
+        if listos:
+            for f in listos:
+                pendientes.remove(f)
+            _reload_rows_meta_from_csv()
+        if pendientes:
+            sondeo["id"] = win.after(150, _sondear_pendientes)
 
     def eliminar():
         sel = lb.curselection()
@@ -179,21 +170,17 @@ def open_win_list(parent: ctk.CTk):
             return
         i = sel[0]
         meta = lb_items[i]
-        csv_idx = meta.get("csv_index", -1)
 
         if not messagebox.askyesno("Confirmar", "¿Eliminar el gasto seleccionado de forma permanente?"):
             return
 
-        # Eliminar en CSV y recargar
-        rows = load_gastos()
-        if 0 <= csv_idx < len(rows):
-            try:
-                del rows[csv_idx]
-                save_all_gastos(rows)    # guarda con encabezado
-            except Exception as e:
-                messagebox.showerror("Error", f"No se pudo eliminar del archivo:\n{e}")
-                return
-        else:
+        # Eliminar por id (una línea en la bitácora, sin reescribir el CSV) y recargar
+        try:
+            ok = delete_gasto(meta["id"])
+        except Exception as e:
+            messagebox.showerror("Error", f"No se pudo eliminar del archivo:\n{e}")
+            return
+        if not ok:
             # índice inesperado; recargar por seguridad
             messagebox.showwarning("Aviso", "No se encontró el registro en el archivo. Se recargará la lista.")
         _reload_rows_meta_from_csv()
@@ -267,24 +254,17 @@ def open_win_list(parent: ctk.CTk):
             if not new_desc:
                 messagebox.showwarning("Aviso", "La descripción no puede estar vacía.")
                 return
-            try:
-                new_monto = float(new_monto_txt.replace(",", "")) if new_monto_txt else 0.0
-            except ValueError:
+            new_monto = parse_money_strict(new_monto_txt) if new_monto_txt else 0.0
+            if new_monto is None:
                 messagebox.showwarning("Aviso", "Monto inválido.")
                 return
 
-            # 1) Actualizar CSV
-            rows = load_gastos()
-            csv_idx = meta["csv_index"]
-            if 0 <= csv_idx < len(rows):
-                rows[csv_idx]["descripcion"] = new_desc
-                rows[csv_idx]["categoria"] = new_cat
-                rows[csv_idx]["monto"] = f"{new_monto:.2f}"
-                try:
-                    save_all_gastos(rows)
-                except Exception as e:
-                    messagebox.showerror("Error", f"No se pudo guardar el cambio:\n{e}")
-                    return
+            # 1) Actualizar CSV (solo la fila editada, por id)
+            try:
+                update_gasto(meta["id"], descripcion=new_desc, categoria=new_cat, monto=new_monto)
+            except Exception as e:
+                messagebox.showerror("Error", f"No se pudo guardar el cambio:\n{e}")
+                return
 
             # 2) Refrescar UI
             _reload_rows_meta_from_csv()
@@ -330,6 +310,59 @@ def open_win_list(parent: ctk.CTk):
         command=editar
     ).grid(row=0, column=2, sticky="w", padx=6)
 
+    # ---- Importar estado de cuenta (CSV / OFX / QIF) en un hilo; el avance se sondea con .after() ----
+    importacion = {"hilo": None, "avance": None, "resultado": None, "error": None}
+
+    def importar_archivo():
+        if importacion["hilo"] is not None:
+            messagebox.showinfo("Importar", "Ya hay una importación en curso.")
+            return
+        path = filedialog.askopenfilename(
+            parent=win, title="Importar estado de cuenta",
+            filetypes=[("Estados de cuenta", "*.csv *.ofx *.qfx *.qif"), ("Todos", "*.*")])
+        if not path:
+            return
+
+        def _tarea():
+            try:
+                importacion["resultado"] = importar(path, progreso=lambda a: importacion.update(avance=a))
+            except Exception as e:
+                importacion["error"] = e
+
+        importacion.update(avance=None, resultado=None, error=None)
+        importacion["hilo"] = threading.Thread(target=_tarea, name="zave-importar", daemon=True)
+        importacion["hilo"].start()
+        lbl_import.configure(text="Importando…")
+        win.after(200, _sondear_importacion)
+
+    def _sondear_importacion():
+        if not win.winfo_exists():
+            return
+        a = importacion["avance"]
+        if importacion["hilo"].is_alive():
+            if a is not None:
+                pct = 100 * a.bytes_leidos / a.bytes_totales if a.bytes_totales else 0
+                lbl_import.configure(text=f"Importando… {pct:.0f}%  ({a.nuevos} nuevos, {a.duplicados} duplicados)")
+            win.after(200, _sondear_importacion)
+            return
+        importacion["hilo"] = None
+        lbl_import.configure(text="")
+        if importacion["error"] is not None:
+            messagebox.showerror("Importar", f"No se pudo importar el archivo:\n{importacion['error']}")
+            return
+        r = importacion["resultado"]
+        _reload_rows_meta_from_csv()
+        messagebox.showinfo("Importar", f"{r.nuevos} gastos nuevos.\n{r.duplicados} ya estaban registrados.\n"
+                                        f"{r.descartados} movimientos omitidos (abonos o sin monto/fecha).")
+
+    ctk.CTkButton(
+        actions, text="Importar estado de cuenta…",
+        fg_color="white", hover_color="#F8FAFF",
+        text_color=TEXT, border_color=SEPARATOR, border_width=2,
+        height=btn_h, corner_radius=radius, font=ctk.CTkFont("Segoe UI", font_btn),
+        command=importar_archivo
+    ).grid(row=0, column=4, sticky="e", padx=6)
+
     # ---------- Lista ----------
     list_container = ctk.CTkFrame(card, fg_color=BG, corner_radius=radius)
     list_container.grid(row=5, column=0, columnspan=4, sticky="nsew", padx=pad_card, pady=(8, 0))
@@ -346,8 +379,11 @@ def open_win_list(parent: ctk.CTk):
     sb.grid(row=0, column=1, sticky="ns")
     lb.config(yscrollcommand=sb.set)
 
-    # Cargar CSV al abrir
+    # Cargar CSV al abrir (y retomar filas que quedaron sin clasificar en una sesión anterior)
     _reload_rows_meta_from_csv()
+    for meta in list(lb_items):
+        if meta["cat"] == CATEGORIA_PENDIENTE:
+            _clasificar_en_fondo(meta["id"], meta["desc"])
 
     # Enter = agregar directo
     ent_desc.bind("<Return>", lambda e: agregar())
@@ -356,23 +392,11 @@ def open_win_list(parent: ctk.CTk):
     ctk.CTkFrame(card, fg_color=SEPARATOR, height=2)\
         .grid(row=98, column=0, columnspan=4, sticky="ew", padx=pad_sep_x, pady=(int(14 * scale), int(12 * scale)))
 
-    # Lógica Inicio (cierra ventana + root oculto y relanza Main)
-    def _go_home():
-        try:
-            win.destroy()
-        except Exception:
-            pass
-        try:
-            parent.destroy()
-        except Exception:
-            pass
-        from app.main import main as launch_main
-        launch_main()
-
     footer = ctk.CTkFrame(card, fg_color=CARD_BG)
     footer.grid(row=99, column=0, columnspan=4, sticky="ew", padx=pad_card, pady=(0, pad_card))
     footer.grid_columnconfigure(0, weight=1)
     footer.grid_columnconfigure(1, weight=0)
+    footer.grid_columnconfigure(2, weight=0)
 
     # ⟵ Inicio (izquierda)
     ctk.CTkButton(
@@ -380,14 +404,22 @@ def open_win_list(parent: ctk.CTk):
         fg_color="white", hover_color="#F8FAFF",
         text_color=PRIMARY_BLUE, border_color=PRIMARY_BLUE, border_width=2,
         height=btn_h, corner_radius=radius, font=ctk.CTkFont("Segoe UI", font_btn),
-        command=_go_home
+        command=nav.go_home
     ).grid(row=0, column=0, sticky="w")
 
+    # Avance de la importación (vacío si no hay ninguna en curso)
+    lbl_import = ctk.CTkLabel(footer, text="", text_color=TEXT_MUTED, font=ctk.CTkFont("Segoe UI", font_lbl))
+    lbl_import.grid(row=0, column=1, sticky="e", padx=6)
+
     # Cerrar (derecha)
     ctk.CTkButton(
         footer, text="Cerrar",
         fg_color="white", hover_color="#F8FAFF",
         text_color=TEXT, border_color=SEPARATOR, border_width=2,
         height=btn_h, corner_radius=radius, font=ctk.CTkFont("Segoe UI", font_btn),
-        command=win.destroy
-    ).grid(row=0, column=1, sticky="e", padx=(6, 0))
+        command=nav.salir
+    ).grid(row=0, column=2, sticky="e", padx=(6, 0))
+
+    # Vista en caché del router (una importación puede seguir mientras está oculta): solo se recarga la lista
+    nav.al_volver(win, _reload_rows_meta_from_csv)
+    return win
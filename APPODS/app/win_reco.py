@@ -6,10 +6,14 @@ from tkinter import ttk, messagebox, filedialog
 
 from core.profile import load_profile, save_profile
 from core.classifier import classify_user
-from core.storage import load_gastos
+from core.storage import totales_por_categoria
+from core.analytics import por_principal, porcentajes
+from core.fechas import PERIODOS
+from core.reports import build_recos, build_markdown, exportar, fmt_money as _fmt_money, pct_text as _pct_text
 
 # NUEVO: navegación unificada a Inicio
-from app.utils.nav import go_home
+from app.utils import nav
+from app.utils.periodo import selector_periodo
 
 # Paleta
 PRIMARY_BLUE       = "#2563EB"
@@ -23,42 +27,10 @@ OK_GREEN           = "#16A34A"
 WARN_AMBER         = "#F59E0B"
 DANGER_RED         = "#DC2626"
 
-def _pct_text(x: float) -> str:
-    try: return f"{x*100:.1f}%"
-    except: return "0%"
-
-def _fmt_money(x) -> str:
-    try: return f"${float(x):,.2f}"
-    except: return "$0.00"
-
-def _split_categoria(cat: str) -> tuple[str, str]:
-    if not cat: return "Otros", ""
-    s = str(cat)
-    if ">" in s:
-        p, sub = s.split(">", 1)
-        return p.strip(), sub.strip()
-    if "/" in s:
-        p, sub = s.split("/", 1)
-        return p.strip(), sub.strip()
-    return s.strip(), ""
-
-def _totales_por_categoria():
-    """Suma por categoría principal desde CSV para recomendaciones específicas."""
-    cats = {}
-    total = 0.0
-    for r in load_gastos():
-        raw = r.get("monto", 0) or 0
-        try:
-            s = str(raw).replace("$","").replace(",","").strip()
-            v = float(s) if s else 0.0
-        except:
-            v = 0.0
-        p,_ = _split_categoria(r.get("categoria","Otros") or "Otros")
-        cats[p] = cats.get(p, 0.0) + v
-        total += v
-    ordered = sorted(cats.items(), key=lambda kv: kv[1], reverse=True)
-    with_pct = [(k, v, (v/total if total>0 else 0.0)) for k,v in ordered]
-    return with_pct, total
+def _totales_por_categoria(desde: str | None = None, hasta: str | None = None):
+    """Suma por categoría principal del periodo para recomendaciones específicas (agregado en el backend)."""
+    total, por_cat = totales_por_categoria(desde, hasta)
+    return porcentajes(por_principal(por_cat)), total
 
 def _chip(parent, text, bg="#EEF2FF", fg=TEXT, pad=6):
     lbl = ctk.CTkLabel(parent, text=text, text_color=fg, fg_color=bg,
@@ -83,92 +55,8 @@ def _bar_row(parent, label, value_pct: float, right_txt: str):
                  font=ctk.CTkFont("Segoe UI", 11)).pack(side="left", padx=6)
     return row
 
-def _build_recos(cls: dict, state: dict, topcats: list[tuple[str,float,float]]):
-    rec_corto, rec_med, rec_largo = [], [], []
-
-    m   = cls.get("metrics", {})
-    lab = cls.get("labels", {})
-    consumo = cls.get("perfil_consumo", {})
-    metas   = cls.get("metas", {}) or {}
-
-    imt     = float(m.get("ingreso_total_mensual", 0.0))
-    cv      = float(m.get("carga_vivienda", 0.0))
-    dsr     = float(m.get("carga_deuda", 0.0))
-    cf      = float(m.get("carga_fijos", 0.0))
-    ca_mxn  = float(m.get("capacidad_ahorro_mxn", 0.0))
-    ca_pct  = float(m.get("capacidad_ahorro_pct", 0.0))
-    igd     = float(m.get("IGD", 0.0))
-
-    ess = max(0.0, imt * (cv + cf + dsr))
-
-    # --- Corto plazo (0–30 días) ---
-    if ca_pct <= 0:
-        rec_corto.append("Detén la fuga de caja: congela gastos discrecionales por 30 días (comer fuera, café, compras online).")
-    if cv >= 0.30:
-        rec_corto.append("Revisa contrato de vivienda: renegocia renta/servicios o considera roommate para bajar la carga < 30%.")
-    if dsr >= 0.20:
-        rec_corto.append("Define estrategia de deudas (avalancha o bola de nieve) y evita nuevos créditos.")
-    if topcats:
-        rec_corto.append("Ataca primero las categorías más altas con metas de reducción concretas (10–20%):")
-        for k, v, p in topcats[:5]:
-            rec_corto.append(f"• {k}: hoy {_fmt_money(v)} ({_pct_text(p)} del total). Propón tope mensual = {_fmt_money(v*0.85)}.")
-
-    # --- Mediano plazo (1–6 meses) ---
-    est = (lab.get("estabilidad_ingreso","Fijo") or "").lower()
-    dependientes = int(state.get("situacion",{}).get("dependientes",0) or 0)
-    base_months = 6 if ("alta" in est or "media" in est) else 3
-    if dependientes>0: base_months += 3
-    fondo_meta = base_months * ess
-    rec_med.append(f"Fondo de emergencia: {base_months} meses de esenciales ≈ {_fmt_money(fondo_meta)}. Aporta automático: {_fmt_money(max(0.0, fondo_meta/ max(1, base_months*2)))}+/mes.")
-
-    meta_p = metas.get("principal","Ahorro de emergencia")
-    ratio  = float(m.get("ratio_aporte", 0.0))
-    aporte_lbl = metas.get("aporte_label","Aporte insuficiente")
-    if meta_p and meta_p != "N/D":
-        rec_med.append(f"Meta: {meta_p} — estado: {aporte_lbl}. Ajusta aportación para estar ≥100% del requerido (hoy {ratio*100:.0f}%).")
-
-    if igd >= 60:
-        rec_med.append("Tope discrecional: fija presupuestos envelope (comer/café/online) para no exceder 15–20% del ingreso.")
-    if cv >= 0.45:
-        rec_med.append("Plan de mudanza (3–6 meses): busca opciones para llevar vivienda < 30% del ingreso.")
-    if cf >= 0.50:
-        rec_med.append("Audita servicios y suscripciones: baja fijos a < 35% (renegocia internet/luz, cancela duplicados).")
-
-    # --- Largo plazo (6–24 meses) ---
-    if ca_pct >= 0.10:
-        rec_largo.append("Automatiza inversión del 10–20% del ingreso (tras cumplir fondo de emergencia).")
-    else:
-        rec_largo.append("Primero consolida fondo y reduce cargas; luego invierte de forma automática.")
-    if dsr >= 0.35:
-        rec_largo.append("Consolida deudas costosas si es viable (sin alargar plazo total) y libera flujo para metas.")
-    if lab.get("segmento_ingreso") in ("Medio alto","Alto"):
-        rec_largo.append("Optimiza impuestos y formaliza objetivos (AFORE/planes personales, inversión diversificada).")
-
-    tags = set((consumo or {}).get("tags", []))
-    if "Foodie" in tags:
-        rec_med.append("Batch cooking y menú semanal para recortar 15–25% en ‘comer fuera’.")
-    if "Café lover" in tags:
-        rec_corto.append("Sustituye 50% de cafés fuera por termo en casa; reinvierte el ahorro a tu meta.")
-    if "Onliner" in tags:
-        rec_corto.append("Carrito 24h + regla 30 días para compras no esenciales; desactiva ‘comprar en 1 clic’.")
-
-    return {
-        "Corto plazo (0–30 días)": rec_corto,
-        "Mediano plazo (1–6 meses)": rec_med,
-        "Largo plazo (6–24 meses)": rec_largo,
-    }
-
 def open_win_reco(parent: ctk.CTk):
-    win = ctk.CTkToplevel(parent)
-    win.title("Recomendaciones personalizadas")
-    try:
-        win.state("zoomed")
-    except Exception:
-        win.geometry("1400x900")
-    win.minsize(1280, 720)
-
-    # Lista de afters por si agregas animaciones (evita pyimageX al cerrar)
-    _afters: list[str] = []
+    win = ctk.CTkFrame(parent, fg_color=BG, corner_radius=0)
 
     # Escala
     sw, sh = win.winfo_screenwidth(), win.winfo_screenheight()
@@ -200,15 +88,11 @@ def open_win_reco(parent: ctk.CTk):
     ctk.CTkLabel(header, text="Recomendaciones personalizadas", text_color=TEXT,
                  font=ctk.CTkFont("Segoe UI Semibold", font_h1)).pack(side="left")
 
-    # Botón Inicio (lógica unificada)
-    def _go_home():
-        go_home(win, parent, after_ids=_afters)
-
     ctk.CTkButton(
         header, text="⟵ Inicio",
         fg_color="white", hover_color="#F8FAFF",
         text_color=PRIMARY_BLUE, border_color=PRIMARY_BLUE, border_width=2,
-        corner_radius=8, command=_go_home
+        corner_radius=8, command=nav.go_home
     ).pack(side="right")
 
     # Subheader
@@ -280,21 +164,33 @@ def open_win_reco(parent: ctk.CTk):
     ctk.CTkLabel(box_top, text="Top categorías de gasto", text_color=TEXT,
                  font=ctk.CTkFont("Segoe UI Semibold", font_h2)).pack(anchor="w", padx=pad, pady=(12,6))
 
-    topcats, total_g = _totales_por_categoria()
-    if not topcats:
-        ctk.CTkLabel(box_top, text="No hay datos en gastos.csv todavía.",
-                     text_color=TEXT_MUTED, font=ctk.CTkFont("Segoe UI", font_lbl)).pack(anchor="w", padx=pad, pady=(0,12))
-    else:
-        for k, v, p in topcats[:8]:
-            row = ctk.CTkFrame(box_top, fg_color=BG, corner_radius=8)
-            row.pack(fill="x", padx=pad, pady=4)
-            ctk.CTkLabel(row, text=k, text_color=TEXT,
-                         font=ctk.CTkFont("Segoe UI", 12)).pack(side="left", padx=10, pady=6)
-            ctk.CTkLabel(row, text=f"{_fmt_money(v)}   ({_pct_text(p)})", text_color=TEXT_MUTED,
-                         font=ctk.CTkFont("Segoe UI", 11)).pack(side="right", padx=10)
+    top_list = ctk.CTkFrame(box_top, fg_color=CARD_BG)
+    top_list.pack(fill="x")
+
+    # Lo que depende del periodo elegido (top categorías → recomendaciones → exportar)
+    datos = {"periodo": PERIODOS["todo"], "topcats": [], "recs": {}}
+
+    def _render_top():
+        for w in top_list.winfo_children():
+            w.destroy()
+        topcats = datos["topcats"]
+        if not topcats:
+            ctk.CTkLabel(top_list, text="No hay gastos en este periodo.",
+                         text_color=TEXT_MUTED, font=ctk.CTkFont("Segoe UI", font_lbl)).pack(anchor="w", padx=pad, pady=(0,12))
+        else:
+            for k, v, p in topcats[:8]:
+                row = ctk.CTkFrame(top_list, fg_color=BG, corner_radius=8)
+                row.pack(fill="x", padx=pad, pady=4)
+                ctk.CTkLabel(row, text=k, text_color=TEXT,
+                             font=ctk.CTkFont("Segoe UI", 12)).pack(side="left", padx=10, pady=6)
+                ctk.CTkLabel(row, text=f"{_fmt_money(v)}   ({_pct_text(p)})", text_color=TEXT_MUTED,
+                             font=ctk.CTkFont("Segoe UI", 11)).pack(side="right", padx=10)
+
+    datos["topcats"], _ = _totales_por_categoria()
+    _render_top()
 
     # ---------- Recomendaciones (corto/mediano/largo) ----------
-    recs = _build_recos(cls, state, topcats)
+    datos["recs"] = build_recos(cls, state, datos["topcats"])
 
     box_recos = ctk.CTkFrame(card, fg_color=CARD_BG, corner_radius=10)
     box_recos.grid(row=4, column=0, columnspan=2, sticky="ew", padx=pad, pady=(0,pad))
@@ -302,9 +198,12 @@ def open_win_reco(parent: ctk.CTk):
     ctk.CTkLabel(box_recos, text="Tu plan de acción", text_color=TEXT,
                  font=ctk.CTkFont("Segoe UI Semibold", font_h2)).grid(row=0, column=0, sticky="w", padx=pad, pady=(12,8))
 
+    secciones: list = []
+
     def _render_section(title: str, items: list[str], r: int):
         sec = ctk.CTkFrame(box_recos, fg_color=BG, corner_radius=10)
         sec.grid(row=r, column=0, sticky="ew", padx=pad, pady=6)
+        secciones.append(sec)
         ctk.CTkLabel(sec, text=title, text_color=TEXT,
                      font=ctk.CTkFont("Segoe UI Semibold", 14)).pack(anchor="w", padx=12, pady=(10,6))
         if not items:
@@ -316,39 +215,44 @@ def open_win_reco(parent: ctk.CTk):
                              font=ctk.CTkFont("Segoe UI", 12), wraplength=1100, justify="left")\
                     .pack(anchor="w", padx=14, pady=2)
 
-    r = 1
-    for title in ("Corto plazo (0–30 días)", "Mediano plazo (1–6 meses)", "Largo plazo (6–24 meses)"):
-        _render_section(title, recs.get(title, []), r)
-        r += 1
+    def _render_recos():
+        while secciones:
+            secciones.pop().destroy()
+        r = 1
+        for title in ("Corto plazo (0–30 días)", "Mediano plazo (1–6 meses)", "Largo plazo (6–24 meses)"):
+            _render_section(title, datos["recs"].get(title, []), r)
+            r += 1
 
-    # ---------- Acciones rápidas + Recalcular + Exportar ----------
-    actions = ctk.CTkFrame(card, fg_color=CARD_BG)
-    actions.grid(row=5, column=0, columnspan=2, sticky="e", padx=pad, pady=(0,pad))
+    _render_recos()
 
-    def _open_home():
-        from app.win_home import open_win_home
-        open_win_home(parent)
+    # Cambiar de periodo: los totales salen de core.storage por rango (rollups / índice de fechas)
+    def _cambiar_periodo(desde, hasta, etiqueta):
+        datos["periodo"] = etiqueta
+        datos["topcats"], _ = _totales_por_categoria(desde, hasta)
+        datos["recs"] = build_recos(cls, state, datos["topcats"])
+        _render_top()
+        _render_recos()
+        win.update_idletasks()
+        canvas.configure(scrollregion=canvas.bbox("all"))
 
-    def _open_form():
-        from app.win_form import open_win_form
-        open_win_form(parent)
+    selector_periodo(header, _cambiar_periodo, font_size=font_lbl).pack(side="right", padx=(0, 12))
 
-    def _open_list():
-        from app.win_list import open_win_list
-        open_win_list(parent)
+    # ---------- Acciones rápidas + Recalcular + Exportar ----------
+    actions = ctk.CTkFrame(card, fg_color=CARD_BG)
+    actions.grid(row=5, column=0, columnspan=2, sticky="e", padx=pad, pady=(0,pad))
 
     ctk.CTkButton(actions, text="Editar Perfil",
                   fg_color="white", hover_color="#F8FAFF",
                   text_color=PRIMARY_BLUE, border_color=PRIMARY_BLUE, border_width=2,
-                  corner_radius=8, command=_open_home).pack(side="left", padx=6)
+                  corner_radius=8, command=lambda: nav.ir_a("perfil")).pack(side="left", padx=6)
     ctk.CTkButton(actions, text="Actualizar Ingresos",
                   fg_color="white", hover_color="#F8FAFF",
                   text_color=PRIMARY_BLUE, border_color=PRIMARY_BLUE, border_width=2,
-                  corner_radius=8, command=_open_form).pack(side="left", padx=6)
+                  corner_radius=8, command=lambda: nav.ir_a("ingresos")).pack(side="left", padx=6)
     ctk.CTkButton(actions, text="Ver Gastos",
                   fg_color="white", hover_color="#F8FAFF",
                   text_color=PRIMARY_BLUE, border_color=PRIMARY_BLUE, border_width=2,
-                  corner_radius=8, command=_open_list).pack(side="left", padx=6)
+                  corner_radius=8, command=lambda: nav.ir_a("gastos")).pack(side="left", padx=6)
 
     def _refresh():
         s = load_profile()
@@ -358,52 +262,17 @@ def open_win_reco(parent: ctk.CTk):
         except Exception as e:
             messagebox.showerror("Error", f"No se pudo recalcular:\n{e}")
             return
-        messagebox.showinfo("Listo", "Recomendaciones recalculadas. Vuelve a abrir esta ventana para ver cambios.")
+        messagebox.showinfo("Listo", "Recomendaciones recalculadas.")
+        win.after_idle(nav.recargar)   # la vista se rearma con la clasificación nueva
 
     ctk.CTkButton(actions, text="Recalcular",
                   fg_color=PRIMARY_BLUE, hover_color=PRIMARY_BLUE_DARK, text_color="white",
                   corner_radius=8, command=_refresh).pack(side="left", padx=6)
 
     # ------- Exportar (MD/HTML/PDF) -------
-    def _build_markdown(cls: dict, state: dict, topcats, recs) -> str:
-        u = state.get("usuario", {})
-        m = (cls or {}).get("metrics", {}) or {}
-        lbl = (cls or {}).get("labels", {}) or {}
-
-        lines = []
-        lines.append("# Recomendaciones ZAVE\n")
-        lines.append(f"**Persona**: {cls.get('persona','N/D')}\n")
-        lines.append(f"**Nombre**: {u.get('nombre','N/D')} | **Edad**: {u.get('edad','N/D')} | **Ciudad**: {state.get('usuario',{}).get('ubicacion',{}).get('ciudad','')}\n")
-        lines.append(f"**Segmento**: {lbl.get('segmento_ingreso','N/D')}  |  **Estabilidad**: {lbl.get('estabilidad_ingreso','N/D')}  |  **Ahorro**: {lbl.get('capacidad_ahorro','N/D')}\n")
-        lines.append("\n---\n")
-        lines.append("## Métricas\n")
-        lines.append(f"- Ingreso total mensual: {_fmt_money(m.get('ingreso_total_mensual',0))}")
-        lines.append(f"- Capacidad de ahorro: {_pct_text(float(m.get('capacidad_ahorro_pct',0)))} ({_fmt_money(m.get('capacidad_ahorro_mxn',0))}/mes)")
-        lines.append(f"- Carga vivienda: {_pct_text(float(m.get('carga_vivienda',0)))}")
-        lines.append(f"- Carga deudas: {_pct_text(float(m.get('carga_deuda',0)))}")
-        lines.append(f"- Gastos fijos: {_pct_text(float(m.get('carga_fijos',0)))}")
-        lines.append(f"- IGD (discrecional): {float(m.get('IGD',0)):.0f}/100\n")
-        lines.append("## Top categorías de gasto\n")
-        if not topcats:
-            lines.append("- (Sin datos)\n")
-        else:
-            for k, v, p in topcats[:10]:
-                lines.append(f"- {k}: {_fmt_money(v)} ({_pct_text(p)})")
-            lines.append("")
-        for title in ("Corto plazo (0–30 días)", "Mediano plazo (1–6 meses)", "Largo plazo (6–24 meses)"):
-            lines.append(f"## {title}")
-            arr = recs.get(title, [])
-            if not arr:
-                lines.append("- (Sin acciones por ahora)")
-            else:
-                for t in arr:
-                    lines.append(f"- {t}")
-            lines.append("")
-        return "\n".join(lines)
-
     def _export():
         try:
-            md = _build_markdown(cls, state, topcats, recs)
+            md = build_markdown(cls, state, datos["topcats"], datos["recs"], datos["periodo"])
             path = filedialog.asksaveasfilename(
                 defaultextension=".md",
                 filetypes=[("Markdown", "*.md"), ("HTML", "*.html"), ("Texto", "*.txt"), ("PDF", "*.pdf")],
@@ -411,43 +280,9 @@ def open_win_reco(parent: ctk.CTk):
             )
             if not path:
                 return
-            lname = path.lower()
-            if lname.endswith(".md") or lname.endswith(".txt"):
-                with open(path, "w", encoding="utf-8") as f:
-                    f.write(md)
-            elif lname.endswith(".html"):
-                safe = (md.replace("&","&amp;").replace("<","&lt;").replace(">","&gt;"))
-                html = (
-                    "<!DOCTYPE html><html><head><meta charset='utf-8'>"
-                    "<title>Recomendaciones ZAVE</title>"
-                    "<style>body{font-family: system-ui,Segoe UI,Arial,sans-serif; line-height:1.5; padding:24px;}"
-                    "pre{white-space:pre-wrap;}</style></head><body>"
-                    "<pre>"+ safe + "</pre></body></html>"
-                )
-                with open(path, "w", encoding="utf-8") as f:
-                    f.write(html)
-            elif lname.endswith(".pdf"):
-                try:
-                    from reportlab.lib.pagesizes import letter
-                    from reportlab.pdfgen import canvas as rlcanvas
-                    from reportlab.lib.units import inch
-                    from textwrap import wrap
-                    c = rlcanvas.Canvas(path, pagesize=letter)
-                    width, height = letter
-                    y = height - 1*inch
-                    for line in md.splitlines():
-                        for chunk in wrap(line, 95):
-                            c.drawString(0.75*inch, y, chunk)
-                            y -= 14
-                            if y < 0.75*inch:
-                                c.showPage(); y = height - 1*inch
-                    c.save()
-                except Exception as e:
-                    messagebox.showwarning("PDF no disponible", f"No se pudo exportar a PDF: {e}\nSe guardará como Markdown.")
-                    alt = path.rsplit(".",1)[0] + ".md"
-                    with open(alt, "w", encoding="utf-8") as f:
-                        f.write(md)
-                    path = alt
+            path, aviso = exportar(md, path)
+            if aviso:
+                messagebox.showwarning("PDF no disponible", f"{aviso}\nSe guardó como Markdown.")
             messagebox.showinfo("Exportado", f"Archivo guardado:\n{path}")
         except Exception as e:
             messagebox.showerror("Error", f"No se pudo exportar:\n{e}")
@@ -461,5 +296,4 @@ def open_win_reco(parent: ctk.CTk):
     win.update_idletasks()
     canvas.configure(scrollregion=canvas.bbox("all"))
 
-    # Manejo del cierre por la X (igual que botón Inicio)
-    win.protocol("WM_DELETE_WINDOW", _go_home)
+    return win
@@ -2,7 +2,12 @@
 import customtkinter as ctk
 import tkinter as tk
 from tkinter import ttk
-from core.storage import load_gastos
+from core.storage import load_gastos, totales_por_categoria, version_ledger
+from core.analytics import por_principal
+from core.reports import preparar_tabla, filas_en_orden, COLUMNAS_ORDENABLES, resumen_totales, datos_grafica
+from app.utils.periodo import selector_periodo
+from app.utils.tabla import tabla_virtual
+from app.utils import nav
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import matplotlib.pyplot as plt
 
@@ -15,51 +20,14 @@ TEXT_MUTED         = "#6B7280"
 SEPARATOR          = "#E5E7EB"
 
 # ---------------------- Helpers ----------------------
-def _parse_float_safe(raw) -> float:
-    if raw is None:
-        return 0.0
-    if isinstance(raw, (int, float)):
-        try:
-            return float(raw)
-        except Exception:
-            return 0.0
-    s = str(raw).strip()
-    if not s:
-        return 0.0
-    s = s.replace("$", "").replace("€", "").replace("MXN", "").replace("USD", "").replace(" ", "")
-    if "," in s and "." not in s:
-        s = s.replace(".", "")
-        s = s.replace(",", ".")
-    else:
-        parts = s.split(".")
-        if len(parts) > 2:
-            s = "".join(parts[:-1]) + "." + parts[-1]
-        s = s.replace(",", "")
-    try:
-        return float(s)
-    except Exception:
-        return 0.0
-
-def _split_categoria(cat: str) -> tuple[str, str]:
-    if not cat:
-        return "Otros", ""
-    txt = str(cat)
-    if ">" in txt:
-        p, s = txt.split(">", 1)
-        return p.strip(), s.strip()
-    if "/" in txt:
-        parts = txt.split("/", 1)
-        return parts[0].strip(), parts[1].strip()
-    return txt.strip(), ""
+def _totales_por_principal(desde: str | None = None, hasta: str | None = None) -> dict:
+    """Suma por categoría principal del periodo sin recorrer filas (la agregación la hace core.storage)."""
+    _, por_cat = totales_por_categoria(desde, hasta)
+    return por_principal(por_cat)
 
 # ---------------------- Ventana principal ----------------------
 def open_win_table(parent: ctk.CTk):
-    win = ctk.CTkToplevel(parent)
-    win.title("Reporte de Gastos")
-    try:
-        win.state("zoomed")
-    except Exception:
-        win.geometry("1400x900")
+    win = ctk.CTkFrame(parent, fg_color=BG, corner_radius=0)
 
     sw, sh = win.winfo_screenwidth(), win.winfo_screenheight()
     scale = min(sw / 1920, sh / 1080)
@@ -117,24 +85,28 @@ def open_win_table(parent: ctk.CTk):
     table_frame.grid_rowconfigure(0, weight=1)
     table_frame.grid_columnconfigure(0, weight=1)
 
-    columns = ("cat_principal", "subcategoria", "descripcion", "monto", "fecha", "acumulado")
-    tree = ttk.Treeview(table_frame, columns=columns, show="headings", height=15)
+    # Filas del periodo en columnas (con sus permutaciones de orden en caché) y la versión
+    # del ledger con la que se armaron: solo se rehacen si cambia el ledger o el periodo
+    tabla_sel = {"datos": None, "clave": None, "columna": None, "desc": False}
+
+    def _mostrar_en_orden():
+        datos = tabla_sel["datos"]
+        mostrar_filas(len(datos.rows), filas_en_orden(datos, tabla_sel["columna"], tabla_sel["desc"]))
 
-    for col, text, width, anchor in [
+    def _ordenar(columna, desc):
+        tabla_sel.update(columna=columna, desc=desc)
+        if tabla_sel["datos"] is not None:
+            _mostrar_en_orden()
+
+    # Virtual: el Treeview solo tiene las filas en pantalla, sin importar el tamaño del ledger
+    tree, mostrar_filas = tabla_virtual(table_frame, [
         ("cat_principal", "Categoría", 260, "w"),
         ("subcategoria", "Subcategoría", 240, "w"),
         ("descripcion", "Descripción", 460, "w"),
         ("monto", "Monto", 140, "e"),
         ("fecha", "Fecha", 180, "center"),
         ("acumulado", "Acumulado", 160, "e"),
-    ]:
-        tree.heading(col, text=text)
-        tree.column(col, width=width, anchor=anchor)
-
-    tree.grid(row=0, column=0, sticky="nsew")
-    sb = ttk.Scrollbar(table_frame, orient="vertical", command=tree.yview)
-    sb.grid(row=0, column=1, sticky="ns")
-    tree.configure(yscrollcommand=sb.set)
+    ], alto_filas=15, al_ordenar=_ordenar, ordenables=COLUMNAS_ORDENABLES)
 
     # ---------------- Totales + Botones ----------------
     footer = ctk.CTkFrame(card, fg_color=CARD_BG)
@@ -148,6 +120,16 @@ def open_win_table(parent: ctk.CTk):
     btns = ctk.CTkFrame(footer, fg_color=CARD_BG)
     btns.grid(row=0, column=1, sticky="e")
 
+    # Periodo del reporte (ISO, hasta exclusivo); None = todo el historial
+    periodo_sel = {"desde": None, "hasta": None}
+
+    def _cambiar_periodo(desde, hasta, _etiqueta):
+        periodo_sel.update(desde=desde, hasta=hasta)
+        cargar_tabla()
+
+    selector_periodo(footer, _cambiar_periodo, font_size=font_lbl)\
+        .grid(row=1, column=0, columnspan=2, sticky="w", pady=(8, 0))
+
     # ------------- Gráfica integrada (barras/pastel) -------------
     chart_visible = tk.BooleanVar(value=False)
     chart_type = tk.StringVar(value="bar")  # "bar" o "pie"
@@ -182,10 +164,7 @@ def open_win_table(parent: ctk.CTk):
                          text_color=TEXT_MUTED, font=ctk.CTkFont("Segoe UI", font_lbl)).pack(padx=pad, pady=pad)
             return
 
-        items = sorted(por_principal.items(), key=lambda kv: kv[1], reverse=True)
-        cats = [c for c, _ in items]
-        vals = [v for _, v in items]
-        total = sum(vals) if vals else 1.0
+        cats, vals, total = datos_grafica(por_principal)
 
         if chart_type.get() == "bar":
             height = max(3.8, min(7.0, len(cats) * 0.48))
@@ -244,13 +223,7 @@ def open_win_table(parent: ctk.CTk):
         if not chart_visible.get():
             chart_visible.set(True)
             chart_frame.grid(row=3, column=0, columnspan=2, sticky="ew", padx=pad, pady=(0, pad))
-            rows = load_gastos()
-            por_principal = {}
-            for r in rows:
-                monto = _parse_float_safe(r.get("monto", 0))
-                principal, _ = _split_categoria(r.get("categoria", "Otros") or "Otros")
-                por_principal[principal] = por_principal.get(principal, 0.0) + monto
-            _build_chart(por_principal)
+            _build_chart(_totales_por_principal(periodo_sel["desde"], periodo_sel["hasta"]))
             btn_chart.configure(text="Ocultar gráfica")
             btn_switch.configure(text="Cambiar a pastel" if chart_type.get() == "bar" else "Cambiar a barras")
             btn_switch.pack(side="left", padx=6)
@@ -267,59 +240,24 @@ def open_win_table(parent: ctk.CTk):
     def switch_chart_type():
         chart_type.set("pie" if chart_type.get() == "bar" else "bar")
         if chart_visible.get():
-            rows = load_gastos()
-            por_principal = {}
-            for r in rows:
-                monto = _parse_float_safe(r.get("monto", 0))
-                principal, _ = _split_categoria(r.get("categoria", "Otros") or "Otros")
-                por_principal[principal] = por_principal.get(principal, 0.0) + monto
-            _build_chart(por_principal)
+            _build_chart(_totales_por_principal(periodo_sel["desde"], periodo_sel["hasta"]))
         btn_switch.configure(text="Cambiar a barras" if chart_type.get() == "pie" else "Cambiar a pastel")
         win.update_idletasks()
         canvas_main.configure(scrollregion=canvas_main.bbox("all"))
 
     # ------------- Tabla / Totales -------------
     def cargar_tabla():
-        for row_id in tree.get_children():
-            tree.delete(row_id)
-
-        rows = load_gastos()
-        total_general = 0.0
-        por_principal = {}
-        por_subcat = {}
-        acumulado = 0.0
-
-        for r in rows:
-            monto = _parse_float_safe(r.get("monto", 0))
-            acumulado += monto
-            total_general += monto
-            cat_txt = r.get("categoria", "Otros") or "Otros"
-            principal, sub = _split_categoria(cat_txt)
-            desc  = r.get("descripcion", "") or ""
-            fecha = r.get("fecha", "") or ""
-
-            tree.insert("", "end", values=(
-                principal,
-                sub,
-                desc,
-                f"${monto:,.2f}",
-                fecha,
-                f"${acumulado:,.2f}"
-            ))
-
-            por_principal[principal] = por_principal.get(principal, 0.0) + monto
-            key_sub = f"{principal} > {sub}" if sub else principal
-            por_subcat[key_sub] = por_subcat.get(key_sub, 0.0) + monto
-
-        bloques = [f"Total general: ${total_general:,.2f}"]
-        if por_principal and total_general > 0:
-            orden_principal = sorted(por_principal.items(), key=lambda kv: kv[1], reverse=True)
-            texto_principal = " | ".join([
-                f"{c}: ${v:,.2f} ({(v/total_general)*100:.1f}%)"
-                for c, v in orden_principal
-            ])
-            bloques.append(f"[Por categoría] {texto_principal}")
-        lbl_totales.configure(text="   ".join(bloques))
+        # Con periodo, load_gastos resuelve el rango con bisect sobre el índice de fechas;
+        # los textos de cada fila se arman hasta que la fila entra en pantalla
+        clave = (periodo_sel["desde"], periodo_sel["hasta"], version_ledger())
+        if tabla_sel["clave"] != clave:
+            rows = load_gastos(periodo_sel["desde"], periodo_sel["hasta"])
+            tabla_sel.update(datos=preparar_tabla(rows), clave=clave)
+        _mostrar_en_orden()
+
+        # Totales desde los rollups de core.storage (no vuelven a recorrer las filas)
+        por_principal = _totales_por_principal(periodo_sel["desde"], periodo_sel["hasta"])
+        lbl_totales.configure(text=resumen_totales(por_principal))
 
         if chart_visible.get():
             _build_chart(por_principal)
@@ -328,8 +266,8 @@ def open_win_table(parent: ctk.CTk):
         canvas_main.configure(scrollregion=canvas_main.bbox("all"))
 
     def limpiar_tabla():
-        for row_id in tree.get_children():
-            tree.delete(row_id)
+        tabla_sel.update(datos=None, clave=None)
+        mostrar_filas(0)
         lbl_totales.configure(text="")
         if chart_visible.get():
             _destroy_chart()
@@ -354,19 +292,6 @@ def open_win_table(parent: ctk.CTk):
     ctk.CTkFrame(card, fg_color=SEPARATOR, height=2)\
         .grid(row=98, column=0, columnspan=2, sticky="ew", padx=pad, pady=(int(14 * scale), int(12 * scale)))
 
-    def _go_home():
-        # Cierra esta ventana y el root oculto, y relanza Main
-        try:
-            win.destroy()
-        except Exception:
-            pass
-        try:
-            parent.destroy()
-        except Exception:
-            pass
-        from app.main import main as launch_main
-        launch_main()
-
     footer2 = ctk.CTkFrame(card, fg_color=CARD_BG)
     footer2.grid(row=99, column=0, columnspan=2, sticky="ew", padx=pad, pady=(0, pad))
     footer2.grid_columnconfigure(0, weight=1)
@@ -376,17 +301,21 @@ def open_win_table(parent: ctk.CTk):
         footer2, text="⟵ Inicio",
         fg_color="white", hover_color="#F8FAFF",
         text_color=PRIMARY_BLUE, border_color=PRIMARY_BLUE, border_width=2,
-        corner_radius=8, command=_go_home
+        corner_radius=8, command=nav.go_home
     ).grid(row=0, column=0, sticky="w")
 
     ctk.CTkButton(
         footer2, text="Cerrar",
         fg_color="white", hover_color="#F8FAFF",
         text_color=TEXT, border_color=SEPARATOR, border_width=2,
-        corner_radius=8, command=win.destroy
+        corner_radius=8, command=nav.salir
     ).grid(row=0, column=1, sticky="e", padx=(6, 0))
 
     # Primera carga
     cargar_tabla()
     win.update_idletasks()
     canvas_main.configure(scrollregion=canvas_main.bbox("all"))
+
+    # Vista en caché del router: si el ledger cambió mientras estaba oculta, solo se recarga la tabla
+    nav.al_volver(win, cargar_tabla)
+    return win
@@ -0,0 +1 @@
+# benchmarks/ — mediciones de rendimiento (python -m benchmarks.<modulo> desde APPODS/)
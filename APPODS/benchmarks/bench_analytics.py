@@ -0,0 +1,111 @@
+# benchmarks/bench_analytics.py — ciclos por fila vs core.analytics (NumPy) con 1e5–1e6 gastos
+from __future__ import annotations
+import argparse, random, time
+
+import numpy as np
+
+from core import analytics
+from core.money import a_centavos, parse_amounts
+
+CATEGORIAS = [
+    "Alimentos y Bebidas > Supermercado",
+    "Alimentos y Bebidas > Restaurante / Comida rápida",
+    "Alimentos y Bebidas > Cafetería / Snacks",
+    "Transporte > Gasolina / Ride-hailing",
+    "Vivienda y Servicios > Renta / Hogar",
+    "Vivienda y Servicios > Servicios básicos (luz, agua, internet)",
+    "Salud y Bienestar > Medicinas / Consultas",
+    "Entretenimiento y Ocio > Cine / Streaming / Eventos",
+    "Compras Personales > Ropa / Electrónica / Hogar",
+    "Finanzas y Trámites > Ahorro / Pagos / Impuestos",
+    "Otros",
+]
+
+
+def _filas(n: int, seed: int = 7):
+    rnd = random.Random(seed)
+    return [{"categoria": rnd.choice(CATEGORIAS), "monto": f"{rnd.uniform(10, 3000):.2f}"} for _ in range(n)]
+
+
+def _to_float_antiguo(x: str) -> float:
+    """El parseo por fila que tenían storage.totals / win_table antes de core.money."""
+    s = (x or "").strip()
+    if not s:
+        return 0.0
+    s = s.replace("$", "").replace("MXN", "").replace("USD", "").replace("€", "").replace(" ", "")
+    if "," in s and "." not in s:
+        s = s.replace(".", "").replace(",", ".")
+    else:
+        s = s.replace(",", "")
+    try:
+        return float(s)
+    except Exception:
+        return 0.0
+
+
+def _split(cat: str):
+    if ">" in cat:
+        p, s = cat.split(">", 1)
+        return p.strip(), s.strip()
+    return cat.strip(), ""
+
+
+def por_fila(rows):
+    """Lo que hacían win_table.cargar_tabla / toggle_chart antes: parseo y split en cada fila."""
+    total, acum = 0.0, 0.0
+    por_principal, por_sub, acumulados = {}, {}, []
+    for r in rows:
+        monto = _to_float_antiguo(r.get("monto", "0"))
+        acum += monto
+        acumulados.append(acum)
+        total += monto
+        p, s = _split(r.get("categoria") or "Otros")
+        por_principal[p] = por_principal.get(p, 0.0) + monto
+        k = f"{p} > {s}" if s else p
+        por_sub[k] = por_sub.get(k, 0.0) + monto
+    return total, por_principal, por_sub, acumulados
+
+
+def vectorizado(cols):
+    _, pp = analytics.totales_por_principal(cols)
+    _, ps = analytics.totales_por_subcategoria(cols)
+    return pp, ps, analytics.acumulado(cols), analytics.porcentajes(pp)
+
+
+def _t(fn, *a, rep: int = 3) -> float:
+    mejor = float("inf")
+    for _ in range(rep):
+        t0 = time.perf_counter()
+        fn(*a)
+        mejor = min(mejor, time.perf_counter() - t0)
+    return mejor
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--n", type=int, nargs="*", default=[100_000, 1_000_000])
+    args = ap.parse_args()
+
+    print(f"{'filas':>10} {'por fila':>10} {'filas→col':>10} {'agregar':>10} {'speedup agg':>12}")
+    for n in args.n:
+        rows = _filas(n)
+        cols = analytics.desde_filas(rows)
+        t_loop = _t(por_fila, rows)
+        t_conv = _t(analytics.desde_filas, rows, rep=1)
+        t_vec = _t(vectorizado, cols)
+        # Verificación: mismos totales (centavos exactos vs. suma flotante)
+        _, pp_loop, _, _ = por_fila(rows)
+        pp_vec = vectorizado(cols)[0]
+        assert all(abs(pp_loop[k] - pp_vec[k]) < 0.01 * max(1, n / 1e5) for k in pp_loop)
+        print(f"{n:>10,} {t_loop:>9.3f}s {t_conv:>9.3f}s {t_vec:>9.4f}s {t_loop / t_vec:>11.0f}x")
+
+    print(f"\n{'montos':>10} {'escalar':>10} {'parse_amounts':>14}")
+    for n in args.n:
+        textos = [r["monto"] for r in _filas(n)]
+        t_esc = _t(lambda: [a_centavos(t) for t in textos], rep=1)
+        t_lote = _t(parse_amounts, textos)
+        print(f"{n:>10,} {t_esc:>9.3f}s {t_lote:>13.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+# benchmarks/bench_import.py — presupuesto de tiempo de importación del menú (python -X importtime)
+"""
+Uso (desde APPODS/):
+    python -m benchmarks.bench_import                       # app.main, presupuesto por omisión
+    python -m benchmarks.bench_import --modulo app.start --presupuesto-ms 400 --json importtime.json
+
+Importa el módulo en un intérprete nuevo con -X importtime y falla (código 1) si el tiempo
+acumulado pasa del presupuesto o si se cargó alguno de los módulos pesados que solo deben
+importarse al abrir su pantalla (matplotlib, SDKs de IA, ventanas, importador).
+"""
+from __future__ import annotations
+import argparse, json, os, re, subprocess, sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+APPODS_DIR = Path(__file__).resolve().parents[1]
+
+# Prefijos que no deben aparecer al importar el menú
+PESADOS = (
+    "matplotlib", "google.genai", "openai", "reportlab",
+    "app.win_reco", "app.win_home", "app.win_form", "app.win_list", "app.win_table",
+    "core.importer", "core.categorizer",
+)
+
+_LINEA_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$")
+
+
+def medir(modulo: str) -> Tuple[Dict[str, Tuple[int, int]], str]:
+    """{módulo: (self µs, acumulado µs)} al importar `modulo` en un proceso limpio, y el stderr restante."""
+    env = {**os.environ, "PYTHONDONTWRITEBYTECODE": "1"}
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {modulo}"],
+                          cwd=APPODS_DIR, env=env, capture_output=True, text=True)
+    tiempos: Dict[str, Tuple[int, int]] = {}
+    otros: List[str] = []
+    for linea in proc.stderr.splitlines():
+        m = _LINEA_RE.match(linea)
+        if m:
+            tiempos[m.group(4)] = (int(m.group(1)), int(m.group(2)))
+        elif not linea.startswith("import time:"):
+            otros.append(linea)
+    if proc.returncode != 0:
+        raise RuntimeError(f"No se pudo importar {modulo}:\n" + "\n".join(otros[-15:]))
+    return tiempos, "\n".join(otros)
+
+
+def pesados_cargados(tiempos: Dict[str, Tuple[int, int]]) -> List[str]:
+    return sorted(m for m in tiempos if any(m == p or m.startswith(p + ".") for p in PESADOS))
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Presupuesto de tiempo de importación (python -X importtime).")
+    ap.add_argument("--modulo", default="app.main")
+    ap.add_argument("--presupuesto-ms", type=float, default=500.0)
+    ap.add_argument("--top", type=int, default=15, help="módulos más lentos (acumulado) a mostrar")
+    ap.add_argument("--json", type=Path, default=None, help="guardar los tiempos en este archivo")
+    args = ap.parse_args()
+
+    try:
+        tiempos, _ = medir(args.modulo)
+    except RuntimeError as e:
+        print(f"[IMPORT] {e}", file=sys.stderr)
+        sys.exit(2)
+
+    total_ms = tiempos.get(args.modulo, (0, 0))[1] / 1000
+    pesados = [m for m in pesados_cargados(tiempos) if m != args.modulo]
+
+    print(f"{'acumulado':>10} {'propio':>9}  módulo")
+    for m, (propio, acum) in sorted(tiempos.items(), key=lambda kv: kv[1][1], reverse=True)[:args.top]:
+        print(f"{acum / 1000:>8.1f}ms {propio / 1000:>7.1f}ms  {m}")
+    print(f"\n[IMPORT] {args.modulo}: {total_ms:.1f} ms (presupuesto {args.presupuesto_ms:.0f} ms), "
+          f"{len(tiempos)} módulos")
+
+    if args.json:
+        args.json.write_text(json.dumps({
+            "modulo": args.modulo,
+            "total_ms": round(total_ms, 3),
+            "presupuesto_ms": args.presupuesto_ms,
+            "pesados": pesados,
+            "modulos": {m: {"propio_us": p, "acumulado_us": a} for m, (p, a) in tiempos.items()},
+        }, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    fallas = []
+    if pesados:
+        fallas.append("se importaron módulos que deben cargarse al abrir su pantalla: " + ", ".join(pesados))
+    if total_ms > args.presupuesto_ms:
+        fallas.append(f"{total_ms:.1f} ms > {args.presupuesto_ms:.0f} ms")
+    for f in fallas:
+        print(f"[IMPORT] ❌ {f}", file=sys.stderr)
+    if fallas:
+        sys.exit(1)
+    print("[IMPORT] ✅ dentro del presupuesto")
+
+
+if __name__ == "__main__":
+    main()
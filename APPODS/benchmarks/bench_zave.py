@@ -0,0 +1,152 @@
+# benchmarks/bench_zave.py — tiempos de punta a punta (carga, totales, perfil, recomendaciones, tabla, gráfica, exportar) en JSON
+"""
+Uso (desde APPODS/):
+    python -m benchmarks.bench_zave --n 1000 10000 100000 --perfiles 200 --salida bench.json
+
+Trabaja en una carpeta temporal (ZAVE_DATA_DIR): nunca toca data/ del repo. Con ZAVE_STORAGE
+se mide el backend elegido (csv, sqlite o particionado). Los tiempos son el mejor de --rep.
+"""
+from __future__ import annotations
+import argparse, json, os, platform, shutil, sys, tempfile, time
+from datetime import datetime
+from pathlib import Path
+
+from core.paths import get_repo_root
+
+# Archivos del ledger CSV que se regeneran entre tamaños (categorias.json se queda;
+# sqlite/particionado se reemplazan con importar_csv)
+_DERIVADOS = ("gastos.csv", "gastos.log", "gastos.rollup.json")
+
+
+def _t(fn, *a, rep: int = 3, antes=None) -> float:
+    mejor = float("inf")
+    for _ in range(rep):
+        if antes:
+            antes()
+        t0 = time.perf_counter()
+        fn(*a)
+        mejor = min(mejor, time.perf_counter() - t0)
+    return mejor
+
+
+def _limpiar(data: Path) -> None:
+    for nombre in _DERIVADOS:
+        (data / nombre).unlink(missing_ok=True)
+    shutil.rmtree(data / "gastos.col", ignore_errors=True)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark de ZAVE con gastos y perfiles sintéticos.")
+    ap.add_argument("--n", type=int, nargs="*", default=[1_000, 10_000, 100_000])
+    ap.add_argument("--perfiles", type=int, default=200)
+    ap.add_argument("--rep", type=int, default=3)
+    ap.add_argument("--seed", type=int, default=7)
+    ap.add_argument("--salida", type=Path, default=None, help="archivo JSON (por omisión, a stdout)")
+    args = ap.parse_args()
+
+    data = Path(tempfile.mkdtemp(prefix="zave_bench_"))
+    shutil.copy(get_repo_root() / "data" / "categorias.json", data / "categorias.json")
+    os.environ["ZAVE_DATA_DIR"] = str(data)
+
+    # core.storage y compañía fijan DATA_DIR al importarse: van después de ZAVE_DATA_DIR
+    import numpy as np
+    from core import storage
+    from core.analytics import por_principal, porcentajes
+    from core.classifier import classify_user
+    from core.fechas import PERIODOS
+    from core.reports import build_recos, build_markdown, exportar, filas_tabla, resumen_totales, datos_grafica
+    from core.reports import preparar_tabla, fila_tabla, orden_tabla, filas_en_orden, COLUMNAS_ORDENABLES
+    from benchmarks.generador import generar_gastos, generar_perfiles
+
+    perfiles = generar_perfiles(args.perfiles, args.seed)
+    salida = {
+        "meta": {
+            "fecha": datetime.now().isoformat(timespec="seconds"),
+            "python": sys.version.split()[0],
+            "numpy": np.__version__,
+            "plataforma": platform.platform(),
+            "backend": storage.BACKEND,
+            "perfiles": args.perfiles,
+            "rep": args.rep,
+            "seed": args.seed,
+        },
+        "resultados": [],
+    }
+
+    try:
+        for n in args.n:
+            _limpiar(data)
+            csv_path = data / "gastos.csv"
+            t0 = time.perf_counter()
+            tam = generar_gastos(n, csv_path, args.seed)
+            t_gen = time.perf_counter() - t0
+            if storage.BACKEND != "csv":
+                storage.importar_csv(csv_path)
+            print(f"[BENCH] {n:,} gastos ({tam / 1e6:.1f} MB)", file=sys.stderr)
+
+            tiempos = {}
+            tiempos["load_gastos_frio"] = _t(storage.load_gastos, rep=args.rep, antes=storage._reset_ledger)
+            tiempos["load_gastos"] = _t(storage.load_gastos, rep=args.rep)
+            rows = storage.load_gastos()
+            tiempos["totals"] = _t(storage.totals, rows, rep=args.rep)
+            tiempos["totales_por_categoria"] = _t(storage.totales_por_categoria, rep=args.rep)
+
+            _, por_cat = storage.totales_por_categoria()
+            topcats = porcentajes(por_principal(por_cat))
+            clasificados = [classify_user(p) for p in perfiles]
+            # Por perfil: classify_user y build_recos son O(1) en filas, importa el costo unitario
+            tiempos["classify_user_por_perfil"] = _t(lambda: [classify_user(p) for p in perfiles],
+                                                     rep=args.rep) / max(1, len(perfiles))
+            tiempos["build_recos_por_perfil"] = _t(
+                lambda: [build_recos(c, p, topcats) for c, p in zip(clasificados, perfiles)],
+                rep=args.rep) / max(1, len(perfiles))
+
+            tiempos["tabla_filas"] = _t(filas_tabla, rows, rep=args.rep)
+            # Lo que paga la tabla virtual al abrir: columnas + una pantalla de filas formateadas
+            tiempos["tabla_primera_pantalla"] = _t(
+                lambda: [fila_tabla(d, i) for d in [preparar_tabla(rows)] for i in range(min(40, len(rows)))],
+                rep=args.rep)
+            # Primer clic en cada encabezado (argsort) y cambio de dirección (permutación en caché al revés)
+            datos = preparar_tabla(rows)
+            for col in COLUMNAS_ORDENABLES:
+                tiempos[f"ordenar_{col}"] = _t(orden_tabla, datos, col, rep=args.rep, antes=datos.ordenes.clear)
+            tiempos["ordenar_invertir"] = _t(lambda: filas_en_orden(datos, "monto", True)(0), rep=args.rep)
+            tiempos["tabla_totales"] = _t(lambda: resumen_totales(por_principal(storage.totales_por_categoria()[1])),
+                                          rep=args.rep)
+            tiempos["grafica_datos"] = _t(lambda: datos_grafica(por_principal(storage.totales_por_categoria()[1])),
+                                          rep=args.rep)
+
+            recs = build_recos(clasificados[0], perfiles[0], topcats) if perfiles else {}
+            cls0, perfil0 = (clasificados[0], perfiles[0]) if perfiles else ({}, {})
+            md = build_markdown(cls0, perfil0, topcats, recs, PERIODOS["todo"])
+            tiempos["markdown"] = _t(build_markdown, cls0, perfil0, topcats, recs, PERIODOS["todo"], rep=args.rep)
+            avisos = {}
+            for ext in ("md", "html", "pdf"):
+                destino = str(data / f"reporte.{ext}")
+                _, aviso = exportar(md, destino)
+                if aviso:
+                    avisos[ext] = aviso
+                    tiempos[f"exportar_{ext}"] = None
+                    continue
+                tiempos[f"exportar_{ext}"] = _t(exportar, md, destino, rep=args.rep)
+
+            salida["resultados"].append({
+                "filas": n,
+                "bytes_csv": tam,
+                "generar_s": round(t_gen, 4),
+                "tiempos_s": {k: (round(v, 6) if v is not None else None) for k, v in tiempos.items()},
+                "avisos": avisos,
+            })
+    finally:
+        shutil.rmtree(data, ignore_errors=True)
+
+    texto = json.dumps(salida, ensure_ascii=False, indent=2)
+    if args.salida:
+        args.salida.write_text(texto, encoding="utf-8")
+        print(f"[BENCH] resultados → {args.salida}", file=sys.stderr)
+    else:
+        print(texto)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+# benchmarks/generador.py — gastos.csv y user_profile.json sintéticos con datos realistas de México
+from __future__ import annotations
+import argparse, copy, json, random, uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+from core.paths import get_data_dir
+from core.profile import _default_profile
+
+CATS_JSON = get_data_dir() / "categorias.json"
+LOTE = 100_000   # filas por bloque: 1e7 filas se escriben sin tenerlas en memoria
+
+# Comercios además de los del keymap (algunas categorías no tienen palabra clave)
+COMERCIOS_EXTRA = {
+    "Alimentos y Bebidas > Supermercado": ["walmart", "soriana", "chedraui", "la comer", "bodega aurrera", "heb"],
+    "Alimentos y Bebidas > Restaurante / Comida rápida": ["tacos el güero", "vips", "sanborns", "little caesars", "toks", "el fogoncito"],
+    "Alimentos y Bebidas > Cafetería / Snacks": ["cafe punta del cielo", "7-eleven", "italian coffee", "tim hortons"],
+    "Transporte > Gasolina / Ride-hailing": ["gasolinera bp", "shell", "cabify", "g500"],
+    "Transporte > Público / Estacionamiento": ["metrobus", "tarjeta mi", "estacionamiento", "caseta capufe"],
+    "Vivienda y Servicios > Renta / Hogar": ["renta depto", "home depot", "mantenimiento condominio"],
+    "Vivienda y Servicios > Servicios básicos (luz, agua, internet)": ["telmex", "totalplay", "sacmex agua", "naturgy gas"],
+    "Salud y Bienestar > Medicinas / Consultas": ["farmacias guadalajara", "farmacia del ahorro", "similares consulta", "laboratorio chopo"],
+    "Compras Personales > Ropa / Electrónica / Hogar": ["liverpool", "coppel", "mercado libre", "amazon mx", "zara", "elektra"],
+    "Mascotas > Alimento / Cuidado": ["petco", "+kota", "veterinaria"],
+    "Entretenimiento y Ocio > Cine / Streaming / Eventos": ["cinepolis", "cinemex", "netflix", "spotify", "ticketmaster"],
+    "Finanzas y Trámites > Ahorro / Pagos / Impuestos": ["pago tarjeta bbva", "sat", "cetes directo", "banorte"],
+    "Otros": ["regalo", "propina", "varios"],
+}
+
+# (peso en número de movimientos, monto mínimo, monto máximo) en MXN
+PERFIL_GASTO = {
+    "Alimentos y Bebidas > Supermercado": (14, 120, 3500),
+    "Alimentos y Bebidas > Restaurante / Comida rápida": (12, 80, 1200),
+    "Alimentos y Bebidas > Cafetería / Snacks": (16, 25, 180),
+    "Transporte > Gasolina / Ride-hailing": (10, 60, 1200),
+    "Transporte > Público / Estacionamiento": (10, 5, 120),
+    "Vivienda y Servicios > Renta / Hogar": (2, 3500, 18000),
+    "Vivienda y Servicios > Servicios básicos (luz, agua, internet)": (4, 150, 1500),
+    "Salud y Bienestar > Medicinas / Consultas": (4, 60, 2500),
+    "Compras Personales > Ropa / Electrónica / Hogar": (8, 150, 9000),
+    "Mascotas > Alimento / Cuidado": (3, 150, 1800),
+    "Entretenimiento y Ocio > Cine / Streaming / Eventos": (8, 99, 1500),
+    "Finanzas y Trámites > Ahorro / Pagos / Impuestos": (3, 500, 12000),
+    "Otros": (6, 20, 2000),
+}
+
+CIUDADES = ["CDMX", "Guadalajara", "Monterrey", "Puebla", "Querétaro", "Mérida", "Tijuana", "León", "Toluca", "Oaxaca"]
+NOMBRES = ["Ana", "Luis", "María", "José", "Fernanda", "Diego", "Sofía", "Carlos", "Valeria", "Jorge"]
+
+
+def _taxonomia(cats_json: Path = CATS_JSON) -> Tuple[List[str], Dict[str, List[str]]]:
+    """Categorías oficiales y comercios por categoría (keymap de categorias.json + COMERCIOS_EXTRA)."""
+    with open(cats_json, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    cats = [c for c in data.get("categorias") or [] if isinstance(c, str)]
+    comercios = {c: list(COMERCIOS_EXTRA.get(c, [])) for c in cats}
+    for kw, cat in (data.get("keymap") or {}).items():
+        if cat in comercios:
+            comercios[cat].append(kw)
+    return cats, {c: v or ["varios"] for c, v in comercios.items()}
+
+
+def generar_gastos(n: int, path: Path, seed: int = 7, meses: int = 24, cats_json: Path = CATS_JSON) -> int:
+    """
+    Escribe `n` gastos en `path` con el formato de gastos.csv (con id), en orden de fecha
+    a lo largo de los últimos `meses`. Devuelve los bytes escritos.
+    """
+    rng = np.random.default_rng(seed)
+    cats, comercios = _taxonomia(cats_json)
+    pesos = np.array([PERFIL_GASTO.get(c, (1, 20, 500))[0] for c in cats], dtype=np.float64)
+    pesos /= pesos.sum()
+    minimos = np.array([PERFIL_GASTO.get(c, (1, 20, 500))[1] for c in cats], dtype=np.float64)
+    maximos = np.array([PERFIL_GASTO.get(c, (1, 20, 500))[2] for c in cats], dtype=np.float64)
+    n_comercios = np.array([len(comercios[c]) for c in cats])
+
+    fin = datetime.now().replace(microsecond=0)
+    inicio = fin - timedelta(days=30 * meses)
+    paso = (fin - inicio).total_seconds() / max(1, n)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        f.write("id,fecha,descripcion,categoria,monto\n")
+        hechos, t = 0, 0.0
+        while hechos < n:
+            k = min(LOTE, n - hechos)
+            ci = rng.choice(len(cats), size=k, p=pesos)
+            # Montos sesgados a la izquierda (muchos tickets chicos, pocos grandes), redondeados a centavos
+            montos = np.round(minimos[ci] + (maximos[ci] - minimos[ci]) * rng.beta(1.3, 4.0, size=k), 2)
+            comercio = (rng.random(k) * n_comercios[ci]).astype(np.int64)
+            saltos = np.cumsum(rng.exponential(paso, size=k)) + t
+            t = float(saltos[-1])
+            fechas = (np.datetime64(inicio, "s") + saltos.astype("timedelta64[s]")).astype(str)
+            f.write("".join(
+                f"{uuid.uuid4().hex[:12]},{fechas[j]},{comercios[cats[c]][comercio[j]]},\"{cats[c]}\",{montos[j]:.2f}\n"
+                for j, c in enumerate(ci.tolist())))
+            hechos += k
+        return f.tell()
+
+
+def generar_perfiles(n: int, seed: int = 7) -> List[Dict[str, Any]]:
+    """`n` variantes de user_profile.json (ingresos, vivienda, deudas, hábitos y metas distintos)."""
+    rnd = random.Random(seed)
+    perfiles = []
+    for i in range(n):
+        p = copy.deepcopy(_default_profile())
+        fijo = round(rnd.lognormvariate(9.8, 0.6), 2)   # mediana ≈ $18k MXN
+        u, ing, sit, meta = p["usuario"], p["ingresos"], p["situacion"], p["metas"]
+        u.update(nombre=f"{rnd.choice(NOMBRES)} {i}", edad=rnd.randint(18, 70),
+                 email=f"usuario{i}@ejemplo.mx")
+        u["ubicacion"]["ciudad"] = rnd.choice(CIUDADES)
+        ing["fijo_mensual"] = fijo
+        ing["variables"] = [{"fuente": "Freelance", "monto": round(rnd.uniform(0, 0.6) * fijo, 2)}
+                            for _ in range(rnd.randint(0, 2))]
+        sit["ocupacion"] = rnd.choice(["Estudiante", "Empleado", "Independiente", "Empresario", "Desempleado"])
+        sit["dependientes"] = rnd.choice([0, 0, 0, 1, 2, 3])
+        sit["vivienda"] = {"tipo": rnd.choice(["Renta", "Propia", "Familiar", "Hipoteca"]),
+                           "gasto_mensual": round(fijo * rnd.uniform(0, 0.6), 2)}
+        sit["transporte"] = rnd.choice(["Público", "Auto propio", "Bicicleta", "Ride-hailing"])
+        sit["mascotas"] = {"tiene": rnd.random() < 0.4, "tipo": rnd.choice(["", "Perro", "Gato"])}
+        sit["gasto_fijo_mensual"] = round(fijo * rnd.uniform(0.05, 0.5), 2)
+        deuda = rnd.random() < 0.5
+        sit["deudas"] = {"tiene": deuda,
+                         "tipos": rnd.sample(["Tarjeta de crédito", "Préstamo personal", "Automotriz"], rnd.randint(1, 2)) if deuda else [],
+                         "pago_mensual_total": round(fijo * rnd.uniform(0.05, 0.45), 2) if deuda else 0.0}
+        sit["habitos"] = {k: rnd.randint(0, 5) for k in ("comer_fuera", "cafe_fuera", "compras_online")}
+        meta.update(principal=rnd.choice(["Ahorro de emergencia", "Viaje", "Enganche de casa", "Auto", "Retiro", "Pagar deudas"]),
+                    monto_objetivo=round(rnd.uniform(5_000, 500_000), 2),
+                    horizonte_meses=rnd.choice([3, 6, 12, 24, 36, 60]),
+                    aportacion_mensual=round(fijo * rnd.uniform(0, 0.3), 2),
+                    fondo_emergencia_meses=rnd.choice([3, 6]))
+        p["ultima_actualizacion"] = datetime.now().isoformat(timespec="seconds")
+        perfiles.append(p)
+    return perfiles
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Genera gastos.csv y perfiles sintéticos para los benchmarks.")
+    ap.add_argument("--filas", type=int, default=100_000)
+    ap.add_argument("--salida", type=Path, default=Path("gastos_bench.csv"))
+    ap.add_argument("--perfiles", type=int, default=0, help="además, N user_profile_XXXX.json junto al CSV")
+    ap.add_argument("--seed", type=int, default=7)
+    args = ap.parse_args()
+
+    tam = generar_gastos(args.filas, args.salida, args.seed)
+    print(f"[BENCH] {args.filas:,} gastos → {args.salida} ({tam / 1e6:.1f} MB)")
+    for i, p in enumerate(generar_perfiles(args.perfiles, args.seed)):
+        with open(args.salida.parent / f"user_profile_{i:04d}.json", "w", encoding="utf-8") as f:
+            json.dump(p, f, ensure_ascii=False, indent=2)
+    if args.perfiles:
+        print(f"[BENCH] {args.perfiles} perfiles → {args.salida.parent}")
+
+
+if __name__ == "__main__":
+    main()
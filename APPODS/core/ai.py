@@ -1,24 +1,33 @@
 # APPODS/core/ai.py
 from __future__ import annotations
-import os, json, re
-from typing import List, Optional, Tuple
-from .paths import get_data_dir
+import os, json, re, threading
+from typing import Dict, List, Optional, Tuple
+from . import categories
 
-CATS_JSON = get_data_dir() / "categorias.json"
+MODEL = "gpt-4o-mini"
 
-def _load_categorias() -> List[str]:
-    if CATS_JSON.exists():
-        try:
-            data = json.load(open(CATS_JSON, "r", encoding="utf-8"))
-            cats = data.get("categorias")
-            if isinstance(cats, list) and cats:
-                return cats
-        except Exception:
-            pass
-    return [
-        "Comida y Bebidas", "Transporte", "Entretenimiento", "Salud",
-        "Educación", "Hogar y Servicios", "Compras", "Otros"
-    ]
+# Un solo cliente OpenAI por proceso: su pool httpx mantiene keep-alive/TLS entre llamadas
+_CLIENT_LOCK = threading.Lock()
+_CLIENT: Dict[str, object] = {"api_key": None, "client": None}
+
+def _get_client(api_key: str):
+    with _CLIENT_LOCK:
+        if _CLIENT["client"] is None or _CLIENT["api_key"] != api_key:
+            # pip install -U openai
+            from openai import OpenAI
+            _CLIENT["client"] = OpenAI(api_key=api_key)
+            _CLIENT["api_key"] = api_key
+        return _CLIENT["client"]
+
+def precalentar() -> None:
+    """Crea el cliente y abre la conexión con una llamada ligera (metadatos del modelo)."""
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        return
+    try:
+        _get_client(api_key).models.retrieve(MODEL, timeout=10)
+    except Exception as e:
+        print(f"[OPENAI] precalentamiento falló: {e}")
 
 def _build_prompt(texto: str, categorias: List[str], modo_json: bool) -> str:
     lista = "\n".join(f"- {c}" for c in categorias)
@@ -87,21 +96,19 @@ def _parse_openai_text(raw: str) -> str:
     return line
 
 def clasificar_texto(texto: str) -> str:
-    categorias = _load_categorias()
+    categorias = categories.categorias()
     api_key = os.getenv("OPENAI_API_KEY")
     if not api_key:
         return "Otros"
 
     try:
-        # pip install -U openai
-        from openai import OpenAI
-        client = OpenAI(api_key=api_key)
+        client = _get_client(api_key)
 
         # Primer intento con JSON mode (si el SDK lo soporta)
         try:
             prompt = _build_prompt(texto, categorias, modo_json=True)
             chat = client.chat.completions.create(
-                model="gpt-4o-mini",
+                model=MODEL,
                 messages=[
                     {"role":"system","content":"Devuelve JSON válido con la clave 'categoria'."},
                     {"role":"user","content": prompt}
@@ -117,7 +124,7 @@ def clasificar_texto(texto: str) -> str:
             # SDK sin response_format
             prompt = _build_prompt(texto, categorias, modo_json=True)
             chat = client.chat.completions.create(
-                model="gpt-4o-mini",
+                model=MODEL,
                 messages=[
                     {"role":"system","content":"Devuelve JSON válido con la clave 'categoria'."},
                     {"role":"user","content": prompt}
@@ -134,7 +141,7 @@ def clasificar_texto(texto: str) -> str:
             prompt2 = _build_prompt(texto, categorias, modo_json=False) + \
                       "\n\nResponde ESTRICTAMENTE con una etiqueta exacta de la lista (sin explicación)."
             chat2 = client.chat.completions.create(
-                model="gpt-4o-mini",
+                model=MODEL,
                 messages=[{"role":"user","content": prompt2}],
                 temperature=0,
                 timeout=15,
@@ -149,3 +156,109 @@ def clasificar_texto(texto: str) -> str:
     except Exception as e:
         print(f"[OPENAI] error: {e}")
         return "Otros"
+
+# ---------- Lotes (varios gastos por solicitud) ----------
+LOTE_MAX_TOKENS = 3000   # presupuesto aprox. para la parte variable del prompt
+LOTE_MAX_ITEMS  = 80
+
+def _tokens_aprox(texto: str) -> int:
+    # ~4 caracteres por token + overhead de numeración/comillas
+    return len(texto) // 4 + 6
+
+def partir_en_lotes(textos: List[str], max_tokens: int = LOTE_MAX_TOKENS,
+                    max_items: int = LOTE_MAX_ITEMS) -> List[List[int]]:
+    """Agrupa índices de `textos` en lotes que respetan el presupuesto de tokens."""
+    lotes: List[List[int]] = []
+    actual: List[int] = []
+    usados = 0
+    for i, t in enumerate(textos):
+        costo = _tokens_aprox(t)
+        if actual and (usados + costo > max_tokens or len(actual) >= max_items):
+            lotes.append(actual)
+            actual, usados = [], 0
+        actual.append(i)
+        usados += costo
+    if actual:
+        lotes.append(actual)
+    return lotes
+
+def parse_respuesta_lote(raw: str, n: int, categorias: List[str]) -> List[str]:
+    """
+    Interpreta {"resultados":[{"id":0,"categoria":"..."}...]} (o la lista directa)
+    y devuelve n categorías alineadas a la entrada; lo faltante/ inválido queda "Otros".
+    """
+    out = ["Otros"] * n
+    try:
+        obj = json.loads(raw or "")
+    except Exception:
+        return out
+    items = obj.get("resultados", []) if isinstance(obj, dict) else obj
+    if not isinstance(items, list):
+        return out
+    for pos, it in enumerate(items):
+        if not isinstance(it, dict):
+            continue
+        try:
+            idx = int(it.get("id", pos))
+        except (TypeError, ValueError):
+            continue
+        if 0 <= idx < n:
+            match = _normalize_to_set(str(it.get("categoria") or ""), categorias)
+            if match:
+                out[idx] = match
+    return out
+
+def _build_prompt_lote(textos: List[str], categorias: List[str]) -> str:
+    lista = "\n".join(f"- {c}" for c in categorias)
+    gastos = "\n".join(f"{i}. {json.dumps(t, ensure_ascii=False)}" for i, t in enumerate(textos))
+    return f"""
+Clasifica CADA gasto en EXACTAMENTE UNA categoría de la lista. No inventes categorías nuevas.
+
+Lista:
+{lista}
+
+Gastos:
+{gastos}
+
+Devuelve SOLO JSON: {{"resultados":[{{"id":<número del gasto>,"categoria":"<una de la lista>"}}, ...]}} con un elemento por gasto.
+"""
+
+def clasificar_lote(textos: List[str]) -> List[str]:
+    """Clasifica varios textos con OpenAI (JSON mode), en pocas solicitudes. Alineado a `textos`."""
+    textos = list(textos)
+    out = ["Otros"] * len(textos)
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not textos or not api_key:
+        return out
+    categorias = categories.categorias()
+    try:
+        client = _get_client(api_key)
+    except Exception as e:
+        print(f"[OPENAI] error: {e}")
+        return out
+
+    for idxs in partir_en_lotes(textos):
+        sub = [textos[i] for i in idxs]
+        mensajes = [
+            {"role":"system","content":"Devuelve JSON válido con la clave 'resultados'."},
+            {"role":"user","content": _build_prompt_lote(sub, categorias)}
+        ]
+        try:
+            try:
+                chat = client.chat.completions.create(
+                    model=MODEL, messages=mensajes, temperature=0,
+                    response_format={"type":"json_object"}, timeout=30,
+                )
+            except TypeError:
+                # SDK sin response_format (igual que clasificar_texto)
+                chat = client.chat.completions.create(
+                    model=MODEL, messages=mensajes, temperature=0, timeout=30,
+                )
+            cats = parse_respuesta_lote(chat.choices[0].message.content or "", len(sub), categorias)
+        except Exception as e:
+            print(f"[OPENAI] error en lote de {len(sub)}: {e}")
+            continue
+        for i, c in zip(idxs, cats):
+            out[i] = c
+        print(f"[OPENAI] lote de {len(sub)} clasificado")
+    return out
@@ -3,63 +3,33 @@ from __future__ import annotations
 import os
 import json
 import re
-from typing import List, Optional
-from pathlib import Path
-
-# Se asume que google-genai ya está instalado
-try:
-    from google import genai
-    from google.genai import types
-except ImportError:
-    print("Por favor, instala el SDK de Gemini: pip install google-genai")
-    genai = None
-    types = None
-
-# --- Configuración y Carga de Categorías ---
-
-# Implementación placeholder para Path (ajusta esto a tu estructura real)
-def get_data_dir() -> Path:
-    """Devuelve el directorio de datos de la aplicación."""
-    # En un entorno real, esto podría ser Path.home() / ".appods"
-    return Path(os.environ.get("APP_DATA_DIR", "."))
-
-CATS_JSON = get_data_dir() / "categorias.json"
-
-def _load_categorias() -> List[str]:
-    """Carga categorías desde JSON o usa un fallback por defecto."""
-    if CATS_JSON.exists():
-        try:
-            with open(CATS_JSON, "r", encoding="utf-8") as f:
-                data = json.load(f)
-            cats = data.get("categorias")
-            if isinstance(cats, list) and cats:
-                return cats
-        except Exception:
-            pass
-    
-    # Fallback por defecto
-    return [
-        "Alimentos y Bebidas > Supermercado",
-        "Alimentos y Bebidas > Restaurante / Comida rápida",
-        "Alimentos y Bebidas > Cafetería / Snacks",
-        "Transporte > Gasolina / Ride-hailing",
-        "Transporte > Público / Estacionamiento",
-        "Vivienda y Servicios > Renta / Hogar",
-        "Vivienda y Servicios > Servicios básicos (luz, agua, internet)",
-        "Salud y Bienestar > Medicinas / Consultas",
-        "Compras Personales > Ropa / Electrónica / Hogar",
-        "Mascotas > Alimento / Cuidado",
-        "Entretenimiento y Ocio > Cine / Streaming / Eventos",
-        "Finanzas y Trámites > Ahorro / Pagos / Impuestos",
-        "Otros"
-    ]
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from .ai import partir_en_lotes, parse_respuesta_lote
+from . import categories
+
+# google-genai tarda en importarse: se carga la primera vez que se usa (no al abrir el menú)
+_SDK_LOCK = threading.Lock()
+_SDK: Dict[str, object] = {"cargado": False, "genai": None, "types": None}
+
+def _sdk():
+    """(genai, types) del SDK de Gemini, o (None, None) si no está instalado."""
+    if not _SDK["cargado"]:
+        with _SDK_LOCK:
+            if not _SDK["cargado"]:
+                try:
+                    from google import genai
+                    from google.genai import types
+                    _SDK.update(genai=genai, types=types)
+                except ImportError:
+                    print("Por favor, instala el SDK de Gemini: pip install google-genai")
+                _SDK["cargado"] = True
+    return _SDK["genai"], _SDK["types"]
 
 # --- Construcción del Prompt y Normalización ---
 
-def _build_prompt(texto: str, categorias: List[str]) -> str:
-    """Construye el prompt de usuario con ejemplos y la lista de categorías."""
-    lista = "\n".join(f"- {c}" for c in categorias)
-    ejemplos = """
+_EJEMPLOS = """
 Ejemplos:
 - "Costco compra quincenal" -> "Alimentos y Bebidas > Supermercado"
 - "Starbucks latte" -> "Alimentos y Bebidas > Cafetería / Snacks"
@@ -71,17 +41,53 @@ Ejemplos:
 - "Botella de tequila (para casa)" -> "Alimentos y Bebidas > Supermercado"
 - "Centenario Plata" -> "Alimentos y Bebidas > Supermercado"
 - "Despensa del mes" -> "Alimentos y Bebidas > Supermercado"
-    """.strip()
+""".strip()
 
+SYSTEM_INSTRUCTION = """
+ACTÚA COMO UN CLASIFICADOR DE GASTOS ESTRICTO. Debes clasificar el siguiente gasto en EXACTAMENTE UNA categoría de la lista. ESTÁ PROHIBIDO inventar o modificar categorías. SIEMPRE elige la opción más cercana.
+
+Reglas de decisión:
+- Víveres, ingredientes, y **bebidas alcohólicas para consumo en casa (ej: tequila, vino, cerveza)** ⇒ Supermercado.
+- Comida preparada para consumo inmediato ⇒ Restaurante / Comida rápida.
+- Café/bebidas de cafetería/snacks ⇒ Cafetería / Snacks.
+- Transporte por app o gasolina ⇒ Gasolina / Ride-hailing.
+- Transporte público/peajes/estacionamiento ⇒ Público / Estacionamiento.
+- Servicios del hogar (luz/agua/internet) ⇒ Servicios básicos.
+- Renta/mantenimiento del inmueble ⇒ Renta / Hogar.
+- Salud humana (consultas, medicinas) ⇒ Medicinas / Consultas.
+- Artículos (ropa/electrónica/hogar) ⇒ Compras Personales.
+- Mascotas ⇒ Mascotas > Alimento / Cuidado.
+- Streaming/eventos/cine ⇒ Entretenimiento.
+- Ahorro/pagos bancarios/impuestos ⇒ Finanzas/Trámites.
+- En caso de duda razonable (no hay opción cercana), utiliza la categoría "Otros".
+"""
+
+def _build_prompt(texto: str, categorias: List[str]) -> str:
+    """Construye el prompt de usuario con ejemplos y la lista de categorías."""
+    lista = "\n".join(f"- {c}" for c in categorias)
     return f"""
 Lista de categorías válidas:
 {lista}
 
-{ejemplos}
+{_EJEMPLOS}
 
 Clasifica el siguiente gasto: "{texto}"
 """
 
+def _build_prompt_lote(textos: List[str], categorias: List[str]) -> str:
+    """Prompt con varios gastos numerados; la respuesta se alinea por "id"."""
+    lista = "\n".join(f"- {c}" for c in categorias)
+    gastos = "\n".join(f"{i}. {json.dumps(t, ensure_ascii=False)}" for i, t in enumerate(textos))
+    return f"""
+Lista de categorías válidas:
+{lista}
+
+{_EJEMPLOS}
+
+Clasifica CADA uno de los siguientes gastos. Devuelve un elemento por gasto con su "id":
+{gastos}
+"""
+
 def _normalize_to_set(cat: str, allowed: List[str]) -> Optional[str]:
     """Normaliza la salida del modelo a una categoría válida."""
     if not cat:
@@ -100,6 +106,77 @@ def _normalize_to_set(cat: str, allowed: List[str]) -> Optional[str]:
             
     return None
 
+# --- Cliente y configuración reutilizables ---
+# Un solo genai.Client por proceso (reutiliza el pool HTTP/TLS entre llamadas) y los
+# Schema/GenerateContentConfig se arman una vez por versión de la lista de categorías.
+
+MODEL = "gemini-2.5-flash"
+
+_CLIENT_LOCK = threading.Lock()
+_CLIENT: Dict[str, object] = {"api_key": None, "client": None}
+_CONFIGS: Dict[Tuple[str, Tuple[str, ...]], object] = {}
+
+def _get_client(api_key: str):
+    with _CLIENT_LOCK:
+        if _CLIENT["client"] is None or _CLIENT["api_key"] != api_key:
+            _CLIENT["client"] = _sdk()[0].Client(api_key=api_key)
+            _CLIENT["api_key"] = api_key
+        return _CLIENT["client"]
+
+def _build_schema(tipo: str, categorias: List[str]):
+    _, types = _sdk()
+    categoria = types.Schema(
+        type=types.Type.STRING,
+        description="La categoría exacta del gasto elegida de la lista.",
+        enum=categorias,
+    )
+    if tipo == "unico":
+        return types.Schema(type=types.Type.OBJECT, properties={"categoria": categoria}, required=["categoria"])
+    return types.Schema(
+        type=types.Type.OBJECT,
+        properties={
+            "resultados": types.Schema(
+                type=types.Type.ARRAY,
+                items=types.Schema(
+                    type=types.Type.OBJECT,
+                    properties={
+                        "id": types.Schema(type=types.Type.INTEGER, description="Número del gasto en la lista."),
+                        "categoria": categoria,
+                    },
+                    required=["id", "categoria"],
+                ),
+            )
+        },
+        required=["resultados"],
+    )
+
+def _get_config(tipo: str, categorias: List[str]):
+    """GenerateContentConfig para 'unico' o 'lote', cacheado por lista de categorías."""
+    key = (tipo, tuple(categorias))
+    cfg = _CONFIGS.get(key)
+    if cfg is None:
+        cfg = _sdk()[1].GenerateContentConfig(
+            system_instruction=SYSTEM_INSTRUCTION,
+            response_mime_type="application/json",
+            response_schema=_build_schema(tipo, categorias),
+            temperature=0.0, # Temperatura 0 para ser menos creativo
+        )
+        if len(_CONFIGS) > 8:  # la lista cambia rara vez; evita crecer sin límite
+            _CONFIGS.clear()
+        _CONFIGS[key] = cfg
+    return cfg
+
+def precalentar() -> None:
+    """Crea el cliente y abre la conexión (TLS) con una llamada ligera de metadatos."""
+    api_key = os.getenv("GEMINI_API_KEY")
+    if _sdk()[0] is None or not api_key:
+        return
+    try:
+        _get_config("unico", categories.categorias())
+        _get_client(api_key).models.get(model=MODEL)
+    except Exception as e:
+        print(f"[GEMINI] precalentamiento falló: {e}")
+
 # --- Función Principal con Correcciones y Logging Detallado ---
 
 def clasificar_texto_gemini(texto: str) -> str:
@@ -107,10 +184,10 @@ def clasificar_texto_gemini(texto: str) -> str:
     Clasifica un texto de gasto usando la API de Gemini con Native JSON Mode 
     e imprime el procedimiento detallado en la terminal para depuración.
     """
-    if genai is None or types is None:
+    if _sdk()[0] is None:
         return "Otros" # Fallback si el SDK no está disponible
         
-    categorias = _load_categorias()
+    categorias = categories.categorias()
     api_key = os.getenv("GEMINI_API_KEY")
     final = "Otros" # Fallback inicial
 
@@ -119,41 +196,14 @@ def clasificar_texto_gemini(texto: str) -> str:
         return final
 
     try:
-        client = genai.Client(api_key=api_key)
+        client = _get_client(api_key)
 
-        # 1. Definición del System Instruction (Instrucciones Imperativas)
-        system_instruction = f"""
-ACTÚA COMO UN CLASIFICADOR DE GASTOS ESTRICTO. Debes clasificar el siguiente gasto en EXACTAMENTE UNA categoría de la lista. ESTÁ PROHIBIDO inventar o modificar categorías. SIEMPRE elige la opción más cercana.
+        # 1. System Instruction (Instrucciones Imperativas, constante del módulo)
+        system_instruction = SYSTEM_INSTRUCTION
+
+        # 2. Config con Esquema JSON (ENUM restringe la salida a categorías válidas), cacheada
+        config = _get_config("unico", categorias)
 
-Reglas de decisión:
-- Víveres, ingredientes, y **bebidas alcohólicas para consumo en casa (ej: tequila, vino, cerveza)** ⇒ Supermercado.
-- Comida preparada para consumo inmediato ⇒ Restaurante / Comida rápida.
-- Café/bebidas de cafetería/snacks ⇒ Cafetería / Snacks.
-- Transporte por app o gasolina ⇒ Gasolina / Ride-hailing.
-- Transporte público/peajes/estacionamiento ⇒ Público / Estacionamiento.
-- Servicios del hogar (luz/agua/internet) ⇒ Servicios básicos.
-- Renta/mantenimiento del inmueble ⇒ Renta / Hogar.
-- Salud humana (consultas, medicinas) ⇒ Medicinas / Consultas.
-- Artículos (ropa/electrónica/hogar) ⇒ Compras Personales.
-- Mascotas ⇒ Mascotas > Alimento / Cuidado.
-- Streaming/eventos/cine ⇒ Entretenimiento.
-- Ahorro/pagos bancarios/impuestos ⇒ Finanzas/Trámites.
-- En caso de duda razonable (no hay opción cercana), utiliza la categoría "Otros".
-"""
-        
-        # 2. Definición del Esquema JSON (ENUM restringe la salida a categorías válidas)
-        json_schema = types.Schema(
-            type=types.Type.OBJECT,
-            properties={
-                "categoria": types.Schema(
-                    type=types.Type.STRING,
-                    description="La categoría exacta del gasto elegida de la lista.",
-                    enum=categorias 
-                )
-            },
-            required=["categoria"],
-        )
-        
         # 3. Construcción del Prompt y Logging
         prompt = _build_prompt(texto, categorias)
         
@@ -164,21 +214,16 @@ Reglas de decisión:
         print("--- USER PROMPT (incluye ejemplos) ---")
         print(prompt.strip())
         print("--- CONFIGURATION ---")
-        print(f"Modelo: gemini-2.5-flash | Temperature: 0.0 (Determinista)")
+        print(f"Modelo: {MODEL} | Temperature: 0.0 (Determinista)")
         print(f"JSON Schema Enum (Categorías): {len(categorias)} opciones")
         print("-" * 50)
 
 
         # 4. Llamada a la API
         resp = client.models.generate_content(
-            model="gemini-2.5-flash",
+            model=MODEL,
             contents=prompt,
-            config=types.GenerateContentConfig(
-                system_instruction=system_instruction,
-                response_mime_type="application/json",
-                response_schema=json_schema,
-                temperature=0.0, # Temperatura 0 para ser menos creativo
-            ),
+            config=config,
         )
         
         # 5. Procesamiento y Logging de la Respuesta
@@ -202,4 +247,45 @@ Reglas de decisión:
         
     print(f"[GEMINI RESULTADO] ✅ '{texto}' clasificado como: '{final}'")
     print("=" * 80 + "\n")
-    return final
\ No newline at end of file
+    return final
+
+# --- Lotes: varios gastos por solicitud ---
+
+def clasificar_lote_gemini(textos: List[str]) -> List[str]:
+    """
+    Clasifica varios textos con una sola llamada por lote (esquema ARRAY con el mismo
+    enum de categorías). Devuelve una categoría por texto, en el mismo orden.
+    """
+    textos = list(textos)
+    out = ["Otros"] * len(textos)
+    if not textos or _sdk()[0] is None:
+        return out
+    api_key = os.getenv("GEMINI_API_KEY")
+    if not api_key:
+        print("[GEMINI] ❌ ERROR: GEMINI_API_KEY no configurada. Devolviendo 'Otros'.")
+        return out
+
+    categorias = categories.categorias()
+    try:
+        client = _get_client(api_key)
+        config = _get_config("lote", categorias)
+    except Exception as e:
+        print(f"[GEMINI PROCESO] ❌ ERROR CRÍTICO en la API (Conexión/Auth): {e}")
+        return out
+
+    for idxs in partir_en_lotes(textos):
+        sub = [textos[i] for i in idxs]
+        try:
+            resp = client.models.generate_content(
+                model=MODEL,
+                contents=_build_prompt_lote(sub, categorias),
+                config=config,
+            )
+            cats = parse_respuesta_lote(resp.text, len(sub), categorias)
+        except Exception as e:
+            print(f"[GEMINI PROCESO] ⚠️ ERROR en lote de {len(sub)}: {e}")
+            continue
+        for i, c in zip(idxs, cats):
+            out[i] = c
+        print(f"[GEMINI RESULTADO] ✅ lote de {len(sub)} clasificado")
+    return out
@@ -0,0 +1,104 @@
+# core/analytics.py — agregaciones vectorizadas (NumPy) para totales, porcentajes y acumulados
+from __future__ import annotations
+from typing import Dict, Iterable, List, NamedTuple, Tuple
+
+import numpy as np
+
+from .money import parse_amounts
+from . import categories
+
+
+class Columnas(NamedTuple):
+    """Gastos en columnas: montos en centavos y categoría como índice a `categorias`."""
+    monto_cents: np.ndarray   # int64
+    categoria: np.ndarray     # intp, índice en `categorias`
+    categorias: List[str]     # nombre por índice ("Otros" en lugar de vacío)
+
+
+def desde_filas(rows: Iterable[Dict[str, str]]) -> Columnas:
+    """
+    Convierte filas de load_gastos()/iter_gastos() a columnas (una sola pasada).
+    El índice de categoría es el id de core.categories: un lookup O(1) por fila.
+    """
+    id_of = categories.id_of
+    idx: List[int] = []
+    montos: List[str] = []
+    for r in rows:
+        idx.append(id_of(r.get("categoria")))
+        montos.append(r.get("monto", "0"))
+    return Columnas(parse_amounts(montos), np.array(idx, dtype=np.intp),
+                    [n or "Otros" for n in categories.names()])
+
+
+def desde_columnar(col) -> Columnas:
+    """Columnas sobre un LedgerColumnar (core.columnar) sin copiar los montos."""
+    categorias = [c or "Otros" for c in col.categorias]
+    return Columnas(col.monto_cents, col.categoria.astype(np.intp), categorias)
+
+
+def _agrupar(c: Columnas, claves: List[str]) -> Tuple[float, Dict[str, float]]:
+    """Suma por `claves[i]` (la clave de cada categoría única), con bincount en dos niveles."""
+    if len(c.monto_cents) == 0:
+        return 0.0, {}
+    por_cat = np.bincount(c.categoria, weights=c.monto_cents, minlength=len(c.categorias))
+    usados = np.bincount(c.categoria, minlength=len(c.categorias)) > 0
+    grupos, g_idx = np.unique(np.array(claves, dtype=object), return_inverse=True)
+    sumas = np.bincount(g_idx[usados], weights=por_cat[usados], minlength=len(grupos))
+    presentes = np.bincount(g_idx[usados], minlength=len(grupos)) > 0
+    out = {str(g): float(s) / 100 for g, s, p in zip(grupos, sumas, presentes) if p}
+    return float(c.monto_cents.sum()) / 100, out
+
+
+def totales_por_categoria(c: Columnas) -> Tuple[float, Dict[str, float]]:
+    """(total, {categoría completa: suma}) — lo mismo que storage.totals()."""
+    return _agrupar(c, c.categorias)
+
+
+def totales_por_principal(c: Columnas) -> Tuple[float, Dict[str, float]]:
+    """(total, {categoría principal: suma}); cada categoría se separa una sola vez."""
+    return _agrupar(c, _principales(c.categorias))
+
+
+def totales_por_subcategoria(c: Columnas) -> Tuple[float, Dict[str, float]]:
+    """(total, {'Padre > Sub' o 'Padre': suma})."""
+    p, s = partes_por_categoria(c)
+    return _agrupar(c, [f"{a} > {b}" if b else a for a, b in zip(p, s)])
+
+
+def por_principal(por_cat: Dict[str, float]) -> Dict[str, float]:
+    """Pliega {categoría completa: suma} (p. ej. de storage.totales_por_categoria) por principal."""
+    if not por_cat:
+        return {}
+    cats = list(por_cat)
+    grupos, g_idx = np.unique(np.array(_principales(cats), dtype=object), return_inverse=True)
+    sumas = np.bincount(g_idx, weights=np.fromiter(por_cat.values(), dtype=np.float64, count=len(cats)),
+                        minlength=len(grupos))
+    return {str(g): float(s) for g, s in zip(grupos, sumas)}
+
+
+def porcentajes(totales: Dict[str, float]) -> List[Tuple[str, float, float]]:
+    """[(clave, suma, fracción del total)] de mayor a menor."""
+    if not totales:
+        return []
+    claves = list(totales)
+    vals = np.fromiter(totales.values(), dtype=np.float64, count=len(claves))
+    total = vals.sum()
+    frac = vals / total if total > 0 else np.zeros_like(vals)
+    orden = np.argsort(-vals, kind="stable")
+    return [(claves[i], float(vals[i]), float(frac[i])) for i in orden]
+
+
+def acumulado(c: Columnas) -> np.ndarray:
+    """Suma corrida de los montos en el orden de las filas (columna 'acumulado'), en pesos."""
+    return np.cumsum(c.monto_cents) / 100
+
+
+def _principales(nombres: List[str]) -> List[str]:
+    """Padre de cada nombre, precalculado en core.categories (parent_of es O(1))."""
+    return [categories.parent_of(categories.id_of(n)) for n in nombres]
+
+
+def partes_por_categoria(c: Columnas) -> Tuple[List[str], List[str]]:
+    """Listas (principal, sub) alineadas con c.categorias, para indexar por c.categoria[i]."""
+    ids = [categories.id_of(n) for n in c.categorias]
+    return [categories.parent_of(i) for i in ids], [categories.sub_of(i) for i in ids]
@@ -0,0 +1,149 @@
+# core/categories.py — registro único de categorías: ids enteros, jerarquía Padre > Sub y cadenas internadas
+from __future__ import annotations
+import json, threading
+from typing import Dict, List, Tuple
+from .paths import get_data_dir
+
+CATS_JSON = get_data_dir() / "categorias.json"
+
+# Si categorias.json no existe o viene vacío
+FALLBACK = [
+    "Alimentos y Bebidas > Supermercado",
+    "Alimentos y Bebidas > Restaurante / Comida rápida",
+    "Alimentos y Bebidas > Cafetería / Snacks",
+    "Transporte > Gasolina / Ride-hailing",
+    "Transporte > Público / Estacionamiento",
+    "Vivienda y Servicios > Renta / Hogar",
+    "Vivienda y Servicios > Servicios básicos (luz, agua, internet)",
+    "Salud y Bienestar > Medicinas / Consultas",
+    "Compras Personales > Ropa / Electrónica / Hogar",
+    "Mascotas > Alimento / Cuidado",
+    "Entretenimiento y Ocio > Cine / Streaming / Eventos",
+    "Finanzas y Trámites > Ahorro / Pagos / Impuestos",
+    "Otros",
+]
+
+# Todo nombre visto (de categorias.json, de las filas o de la IA) recibe un id que no cambia
+# mientras dure el proceso: las de categorias.json primero y en su orden, el resto según aparecen.
+# Por id: nombre (la única instancia del texto), padre, sub e id del padre, todo precalculado.
+_LOCK = threading.Lock()
+_REG: Dict[str, object] = {
+    "ids": {}, "nombres": [], "padre": [], "sub": [], "padre_id": [],
+    "padres": [], "padres_ids": {},
+    "version": None, "categorias": [],
+}
+
+
+def split_categoria(cat: str) -> Tuple[str, str]:
+    """'Padre > Sub' (o 'Padre / Sub') → ('Padre', 'Sub'); vacío → ('Otros', '')."""
+    if not cat:
+        return "Otros", ""
+    txt = str(cat)
+    if ">" in txt:
+        p, s = txt.split(">", 1)
+        return p.strip(), s.strip()
+    if "/" in txt:
+        p, s = txt.split("/", 1)
+        return p.strip(), s.strip()
+    return txt.strip(), ""
+
+
+def _registrar(nombre: str) -> int:
+    """Alta de un nombre nuevo (llamar con _LOCK)."""
+    ids = _REG["ids"]
+    if nombre in ids:
+        return ids[nombre]
+    padre, sub = split_categoria(nombre)
+    pid = _REG["padres_ids"].get(padre)
+    if pid is None:
+        pid = _REG["padres_ids"][padre] = len(_REG["padres"])
+        _REG["padres"].append(padre)
+    # Se agregan primero las columnas y al final la llave: quien lea sin lock nunca ve un id a medias
+    _REG["nombres"].append(nombre)
+    _REG["padre"].append(padre)
+    _REG["sub"].append(sub)
+    _REG["padre_id"].append(pid)
+    ids[nombre] = len(_REG["nombres"]) - 1
+    return ids[nombre]
+
+
+def _file_version() -> Tuple[int, int]:
+    try:
+        st = CATS_JSON.stat()
+        return (st.st_mtime_ns, st.st_size)
+    except OSError:
+        return (0, 0)
+
+
+def categorias() -> List[str]:
+    """Lista oficial de categorias.json (o FALLBACK); se vuelve a leer solo si el archivo cambió."""
+    version = _file_version()
+    if _REG["version"] != version:
+        with _LOCK:
+            if _REG["version"] != version:
+                cats: List[str] = []
+                try:
+                    with open(CATS_JSON, "r", encoding="utf-8") as f:
+                        data = json.load(f)
+                    cats = [c.strip() for c in (data.get("categorias") or []) if isinstance(c, str) and c.strip()]
+                except (OSError, ValueError, AttributeError):
+                    pass
+                cats = cats or list(FALLBACK)
+                for c in cats:
+                    _registrar(c)
+                _REG["categorias"] = [_REG["nombres"][_REG["ids"][c]] for c in cats]
+                _REG["version"] = version
+    return list(_REG["categorias"])
+
+
+def id_of(nombre: str) -> int:
+    """Id del nombre (se registra si es nuevo). O(1)."""
+    nombre = nombre.strip() if nombre else ""
+    i = _REG["ids"].get(nombre)
+    if i is None:
+        if _REG["version"] is None:
+            categorias()   # que las de categorias.json tomen los primeros ids
+        with _LOCK:
+            i = _registrar(nombre)
+    return i
+
+
+def intern(nombre: str) -> str:
+    """La instancia única del texto: las filas cargadas comparten un solo str por categoría."""
+    return _REG["nombres"][id_of(nombre)]
+
+
+def name_of(cid: int) -> str:
+    return _REG["nombres"][cid]
+
+
+def parent_of(cid: int) -> str:
+    """Categoría principal ('Padre') del id. O(1)."""
+    return _REG["padre"][cid]
+
+
+def sub_of(cid: int) -> str:
+    return _REG["sub"][cid]
+
+
+def parent_id_of(cid: int) -> int:
+    """Id del padre (índice en parents()); sirve para agrupar con bincount."""
+    return _REG["padre_id"][cid]
+
+
+def names() -> List[str]:
+    """Nombres por id (copia: posición i = id i)."""
+    with _LOCK:
+        return list(_REG["nombres"])
+
+
+def parent_ids() -> List[int]:
+    """Id del padre por id de categoría (copia: posición i = id i)."""
+    with _LOCK:
+        return list(_REG["padre_id"])
+
+
+def parents() -> List[str]:
+    """Categorías principales por id de padre."""
+    with _LOCK:
+        return list(_REG["padres"])
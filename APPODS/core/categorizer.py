@@ -0,0 +1,102 @@
+# core/categorizer.py — punto único para clasificar un gasto (local → caché → Gemini ∥ OpenAI)
+from __future__ import annotations
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from .keymap import clasificar_local
+from . import categories
+from .resolve_cache import get_cache
+from .ai_gemini import clasificar_lote_gemini
+from .ai import clasificar_lote as clasificar_lote_openai
+from .orchestrator import resolver
+
+# Categoría provisional mientras un hilo consulta a los proveedores
+CATEGORIA_PENDIENTE = "Clasificando…"
+
+_POOL: Optional[ThreadPoolExecutor] = None
+
+
+def clasificar_rapido(texto: str) -> Optional[str]:
+    """Solo niveles sin red (keymap y caché). None si hay que preguntar a la IA."""
+    cat = clasificar_local(texto)
+    if cat:
+        print(f"[LOCAL] '{texto}' => '{cat}'")
+        return cat
+    cat = get_cache().get(texto, categories.categorias())
+    if cat:
+        print(f"[CACHE] '{texto}' => '{cat}'")
+    return cat
+
+
+def clasificar_gasto(texto: str) -> str:
+    """
+    1) Keymap/reglas locales (microsegundos, sin red).
+    2) Caché persistente de resoluciones previas (data/resolve_cache.json).
+    3) Gemini y OpenAI vía core.orchestrator (hedge por p95 o carrera).
+    """
+    cat = clasificar_rapido(texto)
+    if cat:
+        return cat
+
+    categorias = categories.categorias()
+    cache = get_cache()
+    cat = resolver(texto, categorias)
+
+    # "Otros" es también lo que devuelven los proveedores ante un error: no se memoriza
+    if cat and cat != "Otros":
+        cache.put(texto, cat, categorias)
+    return cat
+
+
+def clasificar_lote(textos: List[str]) -> List[str]:
+    """
+    Igual que clasificar_gasto para muchos textos: los repetidos y los resueltos por
+    keymap/caché no salen a la red; el resto va en lotes a Gemini y lo que quede en
+    "Otros" en lotes a OpenAI. Devuelve una categoría por texto, en el mismo orden.
+    """
+    textos = list(textos)
+    categorias = categories.categorias()
+    cache = get_cache()
+
+    resueltos: Dict[str, str] = {}
+    faltan: List[str] = []
+    for t in dict.fromkeys(textos):   # únicos, en orden de aparición
+        cat = clasificar_local(t) or cache.get(t, categorias)
+        if cat:
+            resueltos[t] = cat
+        else:
+            faltan.append(t)
+
+    if faltan:
+        cats = clasificar_lote_gemini(faltan)
+        otros = [t for t, c in zip(faltan, cats) if c == "Otros"]
+        resueltos.update(zip(faltan, cats))
+        if otros:
+            resueltos.update(zip(otros, clasificar_lote_openai(otros)))
+        for t in faltan:
+            if resueltos[t] != "Otros":
+                cache.put(t, resueltos[t], categorias)
+
+    return [resueltos[t] for t in textos]
+
+
+def clasificar_en_segundo_plano(texto: str, al_terminar: Optional[Callable[[str], None]] = None) -> Future:
+    """
+    Encola clasificar_gasto(texto) en el pool de clasificación.
+    `al_terminar(categoria)` corre en el mismo hilo ANTES de que el Future quede resuelto,
+    así quien sondea .done() ya ve sus efectos (p. ej. el CSV corregido).
+    """
+    global _POOL
+    if _POOL is None:
+        _POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="zave-clasif")
+
+    def _tarea() -> str:
+        cat = clasificar_gasto(texto)
+        if al_terminar is not None:
+            try:
+                al_terminar(cat)
+            except Exception as e:
+                print(f"[CLASIF] error al guardar '{texto}': {e}")
+        return cat
+
+    return _POOL.submit(_tarea)
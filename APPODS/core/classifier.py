@@ -2,14 +2,7 @@
 
 from __future__ import annotations
 from typing import Dict, Any
-
-def _to_float(x, default=0.0) -> float:
-    try:
-        if x is None: return float(default)
-        if isinstance(x, str): x = x.replace(",", "").replace("$", "").strip()
-        return float(x)
-    except Exception:
-        return float(default)
+from .money import to_float as _to_float
 
 def _to_int(x, default=0) -> int:
     try:
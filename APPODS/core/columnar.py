@@ -0,0 +1,172 @@
+# core/columnar.py — ledger binario por columnas (data/gastos.col/), legible con np.memmap sin copias
+from __future__ import annotations
+import json, os
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from .money import formatear, parse_amounts
+from .fechas import FECHA_NULA, fecha_a_epoch, limite_a_epoch, epoch_a_fecha
+
+# Estructura de la carpeta:
+#   meta.json         {"version", "n", "categorias": [...], "fuente": [...]}
+#   monto.i8          int64  centavos
+#   fecha.i8          int64  segundos epoch de la hora de reloj (fechas.fecha_a_epoch); FECHA_NULA si no parsea
+#   fecha.off / .heap la fecha tal como venía (zona, formato o texto que no parsea): fila() la devuelve intacta
+#   categoria.u2      uint16 código → meta["categorias"][código]
+#   descripcion.off   int64  n+1 offsets dentro de descripcion.heap (UTF-8)
+#   id.off / id.heap  igual para los ids
+VERSION = 3
+# v1 no tiene fecha.heap: fila() reconstruye la fecha desde el epoch. v1/v2 guardaban el epoch
+# en UTC (las fechas con zona se corrían): se pueden importar, pero no sirven como snapshot vigente
+VERSIONES = (1, 2, 3)
+MAX_CATEGORIAS = np.iinfo(np.uint16).max + 1
+
+def _heap(textos: List[str]) -> Tuple[np.ndarray, bytes]:
+    datos = [t.encode("utf-8") for t in textos]
+    off = np.zeros(len(datos) + 1, dtype=np.int64)
+    if datos:
+        np.cumsum([len(b) for b in datos], out=off[1:])
+    return off, b"".join(datos)
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def escribir(rows: List[Dict[str, str]], carpeta: Path, fuente=None) -> int:
+    """Escribe `rows` (formato de load_gastos) en `carpeta`. Devuelve el número de filas."""
+    carpeta = Path(carpeta)
+    carpeta.mkdir(parents=True, exist_ok=True)
+    codigos: Dict[str, int] = {}
+    cat = np.empty(len(rows), dtype=np.uint16)
+    for i, r in enumerate(rows):
+        c = (r.get("categoria") or "").strip()
+        code = codigos.setdefault(c, len(codigos))
+        if code >= MAX_CATEGORIAS:
+            raise ValueError(f"Más de {MAX_CATEGORIAS} categorías distintas")
+        cat[i] = code
+
+    monto = parse_amounts([r.get("monto") for r in rows])
+    fecha = np.fromiter((fecha_a_epoch(r.get("fecha", "")) for r in rows), dtype=np.int64, count=len(rows))
+    desc_off, desc_heap = _heap([r.get("descripcion") or "" for r in rows])
+    id_off, id_heap = _heap([r.get("id") or "" for r in rows])
+    fecha_off, fecha_heap = _heap([r.get("fecha") or "" for r in rows])
+
+    for nombre, data in (("monto.i8", monto.tobytes()), ("fecha.i8", fecha.tobytes()),
+                         ("categoria.u2", cat.tobytes()),
+                         ("descripcion.off", desc_off.tobytes()), ("descripcion.heap", desc_heap),
+                         ("id.off", id_off.tobytes()), ("id.heap", id_heap),
+                         ("fecha.off", fecha_off.tobytes()), ("fecha.heap", fecha_heap)):
+        _write_atomic(carpeta / nombre, data)
+    # meta.json al final: una carpeta a medio escribir no coincide con su "n"
+    meta = {"version": VERSION, "n": len(rows), "categorias": list(codigos), "fuente": fuente}
+    _write_atomic(carpeta / "meta.json", json.dumps(meta, ensure_ascii=False).encode("utf-8"))
+    return len(rows)
+
+
+def _map(path: Path, dtype, n: int) -> np.ndarray:
+    if n == 0:
+        return np.zeros(0, dtype=dtype)   # np.memmap no acepta archivos vacíos
+    return np.memmap(path, dtype=dtype, mode="r", shape=(n,))
+
+
+def _map_bytes(path: Path) -> np.ndarray:
+    if path.stat().st_size == 0:
+        return np.zeros(0, dtype=np.uint8)
+    return np.memmap(path, dtype=np.uint8, mode="r")
+
+
+class LedgerColumnar:
+    """
+    Vista de solo lectura sobre la carpeta columnar. Las columnas son np.memmap: el sistema
+    operativo pagina lo que se toca y nada se copia a la memoria de Python.
+    """
+
+    def __init__(self, carpeta: Path):
+        carpeta = Path(carpeta)
+        with open(carpeta / "meta.json", "r", encoding="utf-8") as f:
+            self.meta = json.load(f)
+        if self.meta.get("version") not in VERSIONES:
+            raise ValueError(f"Versión de ledger columnar no soportada: {self.meta.get('version')}")
+        n = int(self.meta["n"])
+        self.n = n
+        self.categorias: List[str] = list(self.meta.get("categorias") or [])
+        self.monto_cents = _map(carpeta / "monto.i8", np.int64, n)
+        self.fecha = _map(carpeta / "fecha.i8", np.int64, n)
+        self.categoria = _map(carpeta / "categoria.u2", np.uint16, n)
+        self._desc_off = _map(carpeta / "descripcion.off", np.int64, n + 1)
+        self._desc = _map_bytes(carpeta / "descripcion.heap")
+        self._id_off = _map(carpeta / "id.off", np.int64, n + 1)
+        self._id = _map_bytes(carpeta / "id.heap")
+        self.fechas_originales = self.meta["version"] >= 2
+        if self.fechas_originales:
+            self._fecha_off = _map(carpeta / "fecha.off", np.int64, n + 1)
+            self._fecha = _map_bytes(carpeta / "fecha.heap")
+
+    def __len__(self) -> int:
+        return self.n
+
+    @staticmethod
+    def _texto(heap: np.ndarray, off: np.ndarray, i: int) -> str:
+        return heap[off[i]:off[i + 1]].tobytes().decode("utf-8")
+
+    def descripcion(self, i: int) -> str:
+        return self._texto(self._desc, self._desc_off, i)
+
+    def id(self, i: int) -> str:
+        return self._texto(self._id, self._id_off, i)
+
+    def fecha_texto(self, i: int) -> str:
+        if self.fechas_originales:
+            return self._texto(self._fecha, self._fecha_off, i)
+        return epoch_a_fecha(self.fecha[i])
+
+    def fila(self, i: int) -> Dict[str, str]:
+        return {
+            "id": self.id(i),
+            "fecha": self.fecha_texto(i),
+            "descripcion": self.descripcion(i),
+            "categoria": self.categorias[self.categoria[i]],
+            "monto": formatear(self.monto_cents[i]),
+        }
+
+    def filas(self) -> Iterator[Dict[str, str]]:
+        for i in range(self.n):
+            yield self.fila(i)
+
+    def mascara(self, desde: Optional[str] = None, hasta: Optional[str] = None) -> Optional[np.ndarray]:
+        """Filtro booleano desde <= fecha < hasta (ISO); None si no hay límites. Misma regla que storage._cumple."""
+        if not desde and not hasta:
+            return None
+        m = np.ones(self.n, dtype=bool)
+        if desde:
+            m &= self.fecha >= limite_a_epoch(desde)
+        if hasta:
+            m &= self.fecha < limite_a_epoch(hasta)
+        return m
+
+    def totales_por_categoria(self, desde: Optional[str] = None,
+                              hasta: Optional[str] = None) -> Tuple[float, Dict[str, float]]:
+        """Mismo resultado que storage.totals(): bincount de centavos por código de categoría."""
+        m = self.mascara(desde, hasta)
+        cat, monto = (self.categoria, self.monto_cents) if m is None else (self.categoria[m], self.monto_cents[m])
+        sumas = np.bincount(cat, weights=monto, minlength=len(self.categorias))
+        usados = np.bincount(cat, minlength=len(self.categorias)) > 0
+        por_cat: Dict[str, float] = {}
+        for code in np.flatnonzero(usados):
+            nombre = self.categorias[code] or "Otros"
+            por_cat[nombre] = por_cat.get(nombre, 0.0) + float(sumas[code]) / 100
+        return float(monto.sum()) / 100, por_cat
+
+
+def abrir(carpeta: Path) -> Optional[LedgerColumnar]:
+    """LedgerColumnar de `carpeta`, o None si no existe o está incompleta."""
+    try:
+        return LedgerColumnar(carpeta)
+    except (OSError, ValueError, KeyError):
+        return None
@@ -0,0 +1,92 @@
+# core/fechas.py — fechas ISO ↔ segundos epoch y periodos de reporte (este mes, últimos 3 meses, rango)
+from __future__ import annotations
+from datetime import date, datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Optional, Tuple
+
+# Fechas que no se pueden interpretar: quedan antes que cualquier otra (igual que "" al comparar texto)
+FECHA_NULA = -(2 ** 63)
+
+# Periodos que ofrecen los selectores de win_table / win_reco
+PERIODOS = {
+    "todo": "Todo el historial",
+    "mes": "Este mes",
+    "3meses": "Últimos 3 meses",
+    "rango": "Rango personalizado",
+}
+
+_FORMATOS_USUARIO = ("%Y-%m-%d", "%d/%m/%Y", "%d-%m-%Y")
+
+
+def fecha_a_epoch(fecha: str) -> int:
+    """
+    ISO → segundos epoch de la hora de reloj: si trae zona (-06:00) se ignora, así el orden
+    y los periodos coinciden con el mes/día escrito (rollups, particiones); FECHA_NULA si no parsea.
+    """
+    try:
+        dt = datetime.fromisoformat((fecha or "").strip())
+    except ValueError:
+        return FECHA_NULA
+    return int(dt.replace(tzinfo=timezone.utc).timestamp())
+
+
+@lru_cache(maxsize=64)
+def limite_a_epoch(fecha: str) -> int:
+    """Límite de periodo (desde/hasta) → epoch con la misma regla; acepta también "YYYY-MM"."""
+    e = fecha_a_epoch(fecha)
+    if e == FECHA_NULA and len(fecha.strip()) == 7:   # "YYYY-MM"
+        e = fecha_a_epoch(fecha.strip() + "-01")
+    return e
+
+
+def mes_de_fecha(fecha: str) -> str:
+    """"YYYY-MM" de la fecha según fecha_a_epoch; "" si no parsea (queda antes de cualquier mes)."""
+    e = fecha_a_epoch(fecha)
+    return "" if e == FECHA_NULA else epoch_a_fecha(e)[:7]
+
+
+def epoch_a_fecha(s: int) -> str:
+    if s == FECHA_NULA:
+        return ""
+    return datetime.fromtimestamp(int(s), tz=timezone.utc).replace(tzinfo=None).isoformat(timespec="seconds")
+
+
+def _inicio_mes(d: date, meses_atras: int = 0) -> date:
+    m = d.year * 12 + d.month - 1 - meses_atras
+    return date(m // 12, m % 12 + 1, 1)
+
+
+def periodo(nombre: str, hoy: Optional[date] = None) -> Tuple[Optional[str], Optional[str]]:
+    """
+    (desde, hasta) ISO con hasta exclusivo, como lo reciben load_gastos/totales_por_categoria.
+    Los periodos caen en límites de mes, así que los totales salen de los rollups.
+    """
+    hoy = hoy or date.today()
+    if nombre == "mes":
+        return _inicio_mes(hoy).isoformat(), _inicio_mes(hoy, -1).isoformat()
+    if nombre == "3meses":
+        return _inicio_mes(hoy, 2).isoformat(), _inicio_mes(hoy, -1).isoformat()
+    if nombre == "todo":
+        return None, None
+    raise ValueError(f"Periodo desconocido: {nombre}")
+
+
+def _fecha_usuario(txt: str) -> Optional[date]:
+    txt = (txt or "").strip()
+    if not txt:
+        return None
+    for fmt in _FORMATOS_USUARIO:
+        try:
+            return datetime.strptime(txt, fmt).date()
+        except ValueError:
+            continue
+    raise ValueError(f"Fecha inválida: '{txt}' (usa AAAA-MM-DD o DD/MM/AAAA)")
+
+
+def rango_personalizado(desde_txt: str, hasta_txt: str) -> Tuple[Optional[str], Optional[str]]:
+    """Fechas que captura el usuario (ambas inclusivas, vacías = sin límite) → (desde, hasta exclusivo)."""
+    desde, hasta = _fecha_usuario(desde_txt), _fecha_usuario(hasta_txt)
+    if desde and hasta and hasta < desde:
+        raise ValueError("La fecha final es anterior a la inicial.")
+    return (desde.isoformat() if desde else None,
+            (hasta + timedelta(days=1)).isoformat() if hasta else None)
@@ -0,0 +1,417 @@
+# core/importer.py — importación de estados de cuenta (CSV con mapeo de columnas, OFX, QIF)
+from __future__ import annotations
+import csv, hashlib, json, os, re
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from .paths import get_data_dir
+from .money import a_centavos, formatear
+from .keymap import normalizar
+
+# Puntos de reanudación: <clave>.json (avance) + <clave>.jsonl (filas ya clasificadas, sin guardar)
+CHECKPOINT_DIR = get_data_dir() / "importaciones"
+
+LOTE = 5000   # registros por lote de parseo / clasificación / checkpoint
+
+FORMATOS_FECHA = ("%Y-%m-%d", "%d/%m/%Y", "%d/%m/%y", "%d-%m-%Y", "%Y/%m/%d", "%d.%m.%Y")
+FORMATOS_FECHA_QIF = ("%m/%d/%Y", "%m/%d/%y", "%d/%m/%Y", "%Y-%m-%d")   # QIF es M/D/A por norma
+
+# Sinónimos de encabezado (normalizados) para cuando no se da un mapeo explícito
+_SINONIMOS = {
+    "fecha": ("fecha", "fecha operacion", "fecha de operacion", "fecha movimiento", "date", "posted date"),
+    "descripcion": ("descripcion", "concepto", "detalle", "description", "movimiento", "referencia"),
+    "monto": ("monto", "importe", "cantidad", "amount"),
+    "cargo": ("cargo", "cargos", "retiro", "retiros", "debito", "debit"),
+}
+
+_OFX_TRN_RE = re.compile(rb"<STMTTRN>(.*?)</STMTTRN>", re.S | re.I)
+_OFX_CAMPO_RE = re.compile(rb"<(TRNAMT|DTPOSTED|NAME|MEMO)>([^<\r\n]*)", re.I)
+
+
+class Avance(NamedTuple):
+    """Lo que recibe el callback `progreso` tras cada lote."""
+    etapa: str            # "leyendo" | "guardando" | "listo"
+    leidos: int           # registros del archivo procesados
+    nuevos: int
+    duplicados: int
+    descartados: int      # abonos, sin monto o sin fecha interpretable
+    bytes_leidos: int
+    bytes_totales: int
+
+
+class Resultado(NamedTuple):
+    leidos: int
+    nuevos: int
+    duplicados: int
+    descartados: int
+    ids: List[str]
+
+
+# ---------- Lectura cruda por formato: (fecha, descripcion, monto) + posición en bytes ----------
+def _lineas(path: Path) -> Iterator[Tuple[str, int]]:
+    """Líneas decodificadas (UTF-8 y, si falla, cp1252 como exportan muchos bancos) con el byte final."""
+    pos = 0
+    with open(path, "rb") as f:
+        for raw in f:
+            if pos == 0:
+                raw = raw.removeprefix(b"\xef\xbb\xbf")   # BOM de Excel
+            pos += len(raw)
+            try:
+                linea = raw.decode("utf-8")
+            except UnicodeDecodeError:
+                linea = raw.decode("cp1252", errors="replace")
+            yield linea, pos
+
+
+def _columna(encabezado: List[str], nombre) -> Optional[int]:
+    if nombre is None or isinstance(nombre, int):
+        return nombre
+    norm = [normalizar(h) for h in encabezado]
+    try:
+        return norm.index(normalizar(nombre))
+    except ValueError:
+        raise ValueError(f"La columna '{nombre}' no está en el encabezado: {encabezado}")
+
+
+def _mapeo_auto(encabezado: List[str]) -> Dict[str, int]:
+    norm = [normalizar(h) for h in encabezado]
+    mapeo = {}
+    for campo, sinonimos in _SINONIMOS.items():
+        for i, h in enumerate(norm):
+            if h in sinonimos:
+                mapeo[campo] = i
+                break
+    if "fecha" not in mapeo or "descripcion" not in mapeo or not ({"monto", "cargo"} & set(mapeo)):
+        raise ValueError(f"No se reconocieron las columnas fecha/descripcion/monto en: {encabezado}")
+    return mapeo
+
+
+def _leer_csv(path: Path, mapeo: Optional[Dict[str, object]],
+              delimitador: Optional[str]) -> Iterator[Tuple[Tuple[str, str, str], int]]:
+    """
+    `mapeo` = {"fecha": col, "descripcion": col, "monto": col} con col = nombre o índice;
+    en lugar de "monto" puede ir "cargo" (estados con columnas Cargo/Abono: se toma solo el cargo).
+    Sin mapeo se reconocen los encabezados comunes (Fecha, Concepto, Importe, Cargo…).
+    """
+    lineas = _lineas(path)
+    pos = {"bytes": 0}
+
+    def _texto():
+        for linea, p in lineas:
+            pos["bytes"] = p
+            yield linea
+
+    texto = _texto()
+    primera = next(texto, "")
+    if delimitador is None:
+        delimitador = max(",;\t|", key=primera.count)
+    filas = csv.reader(_encadenar(primera, texto), delimiter=delimitador)
+    encabezado = next(filas, [])
+    cols = ({k: _columna(encabezado, v) for k, v in mapeo.items()} if mapeo else _mapeo_auto(encabezado))
+    elegidas = (cols["fecha"], cols["descripcion"], cols.get("cargo", cols.get("monto")))
+    for fila in filas:
+        if not any(c.strip() for c in fila):
+            continue
+        yield tuple(fila[c].strip() if c is not None and c < len(fila) else "" for c in elegidas), pos["bytes"]
+
+
+def _encadenar(primera: str, resto: Iterator[str]) -> Iterator[str]:
+    yield primera
+    yield from resto
+
+
+def _fecha_ofx(txt: str) -> str:
+    # AAAAMMDD[HHMMSS[.XXX]][TZ] → solo la fecha (la hora de OFX suele ser la del corte, no la del cargo)
+    return txt.strip()[:8]
+
+
+def _leer_ofx(path: Path) -> Iterator[Tuple[Tuple[str, str, str], int]]:
+    """Bloques <STMTTRN>; funciona tanto con OFX 1.x (SGML, sin cierres) como con OFX 2 (XML)."""
+    buf, base = b"", 0
+    with open(path, "rb") as f:
+        while True:
+            trozo = f.read(1 << 20)
+            buf += trozo
+            fin = 0
+            for m in _OFX_TRN_RE.finditer(buf):
+                campos = {k.upper().decode(): v.strip() for k, v in _OFX_CAMPO_RE.findall(m.group(1))}
+                dec = lambda k: campos.get(k, b"").decode("utf-8", errors="replace")
+                desc = dec("NAME") or dec("MEMO")
+                fin = m.end()
+                yield (_fecha_ofx(dec("DTPOSTED")), desc, dec("TRNAMT")), base + fin
+            buf, base = buf[fin:], base + fin
+            if not trozo:
+                break
+
+
+def _leer_qif(path: Path) -> Iterator[Tuple[Tuple[str, str, str], int]]:
+    """Registros D (fecha), T/U (monto), P (beneficiario), M (memo) terminados en '^'."""
+    reg: Dict[str, str] = {}
+    for linea, pos in _lineas(path):
+        linea = linea.rstrip("\r\n")
+        if not linea or linea.startswith("!"):
+            continue
+        tipo, valor = linea[0], linea[1:].strip()
+        if tipo == "^":
+            if reg:
+                fecha = reg.get("D", "").replace("'", "/").replace(" ", "")
+                yield (fecha, reg.get("P") or reg.get("M", ""), reg.get("T") or reg.get("U", "")), pos
+            reg = {}
+        elif tipo in "DTUPM":
+            reg.setdefault(tipo, valor)
+
+
+# ---------- Normalización (corre en el pool de procesos si se pide) ----------
+def clave(fecha: str, cents: int, descripcion: str) -> int:
+    """
+    Llave de duplicados (día, centavos, descripción normalizada). Se usa blake2b y no hash():
+    el hash de str cambia entre procesos y las llaves se calculan en los workers del pool.
+    """
+    txt = f"{(fecha or '')[:10]}|{cents}|{normalizar(descripcion)}".encode("utf-8")
+    return int.from_bytes(hashlib.blake2b(txt, digest_size=8).digest(), "little")
+
+
+def _parse_fecha(txt: str, formatos: Sequence[str]) -> Optional[str]:
+    txt = (txt or "").strip()
+    if not txt:
+        return None
+    for fmt in formatos:
+        try:
+            return datetime.strptime(txt, fmt).isoformat(timespec="seconds")
+        except ValueError:
+            continue
+    try:
+        return datetime.fromisoformat(txt).isoformat(timespec="seconds")
+    except ValueError:
+        return None
+
+
+def _normalizar_lote(args) -> List[Optional[Tuple[str, str, int, int]]]:
+    """Lote crudo → [(fecha ISO, descripcion, centavos, clave) | None si se descarta]."""
+    lote, formatos, cargos_negativos = args
+    out: List[Optional[Tuple[str, str, int, int]]] = []
+    for fecha_txt, desc, monto_txt in lote:
+        fecha = _parse_fecha(fecha_txt, formatos)
+        cents = a_centavos(monto_txt, None)
+        if fecha is None or not cents:
+            out.append(None)
+            continue
+        if cargos_negativos:
+            if cents > 0:          # abono / depósito: no es gasto
+                out.append(None)
+                continue
+            cents = -cents
+        desc = " ".join(desc.split())
+        out.append((fecha, desc, cents, clave(fecha, cents, desc)))
+    return out
+
+
+def _lotes(registros: Iterator[Tuple[Tuple[str, str, str], int]]) -> Iterator[Tuple[list, int]]:
+    lote, pos = [], 0
+    for reg, pos in registros:
+        lote.append(reg)
+        if len(lote) >= LOTE:
+            yield lote, pos
+            lote = []
+    if lote:
+        yield lote, pos
+
+
+def _normalizados(lotes: Iterator[Tuple[list, int]], formatos, cargos_negativos: bool,
+                  procesos: int) -> Iterator[Tuple[list, int]]:
+    """Lotes normalizados en orden; con procesos > 1 se reparten entre workers (a lo más 2 por worker en vuelo)."""
+    if procesos <= 1:
+        for lote, pos in lotes:
+            yield _normalizar_lote((lote, formatos, cargos_negativos)), pos
+        return
+    with ProcessPoolExecutor(max_workers=procesos) as pool:
+        en_vuelo: deque = deque()
+        for lote, pos in lotes:
+            en_vuelo.append((pool.submit(_normalizar_lote, (lote, formatos, cargos_negativos)), pos))
+            if len(en_vuelo) >= 2 * procesos:
+                fut, p = en_vuelo.popleft()
+                yield fut.result(), p
+        while en_vuelo:
+            fut, p = en_vuelo.popleft()
+            yield fut.result(), p
+
+
+# ---------- Índice de duplicados y checkpoints ----------
+def indice_existentes() -> Counter:
+    """Cuántas veces aparece cada llave en el ledger (un cargo repetido legítimo cuenta dos veces)."""
+    # storage/categorizer se importan dentro de las funciones: los workers del pool solo necesitan el parseo
+    from .storage import iter_gastos
+    idx: Counter = Counter()
+    for r in iter_gastos():
+        idx[clave(r.get("fecha", ""), a_centavos(r.get("monto")), r.get("descripcion", ""))] += 1
+    return idx
+
+
+def _id_checkpoint(path: Path, opciones: dict) -> str:
+    st = path.stat()
+    firma = json.dumps([str(path.resolve()), st.st_size, st.st_mtime_ns, opciones], sort_keys=True, default=str)
+    return hashlib.blake2b(firma.encode("utf-8"), digest_size=10).hexdigest()
+
+
+def _leer_checkpoint(meta_path: Path) -> Optional[dict]:
+    try:
+        with open(meta_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _guardar_checkpoint(meta_path: Path, estado: dict) -> None:
+    tmp = meta_path.with_suffix(".json.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(estado, f)
+    os.replace(tmp, meta_path)
+
+
+def detectar_formato(path) -> str:
+    ext = Path(path).suffix.lower()
+    if ext in (".ofx", ".qfx"):
+        return "ofx"
+    if ext == ".qif":
+        return "qif"
+    return "csv"
+
+
+# ---------- API ----------
+def importar(path, formato: Optional[str] = None, mapeo: Optional[Dict[str, object]] = None, *,
+             delimitador: Optional[str] = None, formato_fecha: Optional[str] = None,
+             cargos_negativos: Optional[bool] = None, procesos: int = 0,
+             progreso: Optional[Callable[[Avance], None]] = None, reanudar: bool = True) -> Resultado:
+    """
+    Importa un estado de cuenta al ledger:
+      1) parseo por lotes de LOTE registros (en `procesos` workers si > 1),
+      2) descarta lo que ya está en el ledger (misma fecha, monto y descripción normalizada),
+      3) clasifica las descripciones nuevas con categorizer.clasificar_lote (únicas, por lote),
+      4) guarda todo con un solo append_gastos al final.
+    Tras cada lote clasificado se escribe un checkpoint en data/importaciones/; si el proceso
+    se interrumpe, volver a llamar con el mismo archivo retoma desde ahí sin reclasificar.
+    `cargos_negativos`: los cargos vienen con signo menos y los positivos son abonos (por
+    defecto sí en OFX/QIF y no en CSV).
+    """
+    from .storage import append_gastos
+
+    path = Path(path)
+    formato = (formato or detectar_formato(path)).lower()
+    if formato == "csv":
+        registros = _leer_csv(path, mapeo, delimitador)
+    elif formato == "ofx":
+        registros = _leer_ofx(path)
+    elif formato == "qif":
+        registros = _leer_qif(path)
+    else:
+        raise ValueError(f"Formato de importación no soportado: {formato}")
+    if cargos_negativos is None:
+        cargos_negativos = formato != "csv"
+    if formato_fecha:
+        formatos: Sequence[str] = (formato_fecha,)
+    else:
+        formatos = {"ofx": ("%Y%m%d",), "qif": FORMATOS_FECHA_QIF}.get(formato, FORMATOS_FECHA)
+
+    opciones = {"formato": formato, "mapeo": mapeo, "delimitador": delimitador,
+                "formatos": list(formatos), "cargos_negativos": cargos_negativos}
+    CHECKPOINT_DIR.mkdir(parents=True, exist_ok=True)
+    cid = _id_checkpoint(path, opciones)
+    meta_path, filas_path = CHECKPOINT_DIR / f"{cid}.json", CHECKPOINT_DIR / f"{cid}.jsonl"
+
+    estado = {"archivo": str(path), "leidos": 0, "nuevos": 0, "duplicados": 0, "descartados": 0, "bytes_filas": 0}
+    previo = _leer_checkpoint(meta_path) if reanudar else None
+    if previo:
+        estado.update(previo)
+        print(f"[IMPORT] retomando {path.name} desde el registro {estado['leidos']}")
+    total_bytes = path.stat().st_size
+
+    def _avisar(etapa: str, bytes_leidos: int) -> None:
+        if progreso is not None:
+            progreso(Avance(etapa, estado["leidos"], estado["nuevos"], estado["duplicados"],
+                            estado["descartados"], bytes_leidos, total_bytes))
+
+    if not estado.get("guardando"):
+        _leer_y_clasificar(registros, formatos, cargos_negativos, procesos,
+                           estado, meta_path, filas_path, _avisar)
+
+    _avisar("guardando", total_bytes)
+    with open(filas_path, "r", encoding="utf-8") as f:
+        filas = [json.loads(linea) for linea in f]
+    claves = [clave(r["fecha"], a_centavos(r["monto"]), r["descripcion"]) for r in filas]
+    ya = indice_existentes()
+    if estado.get("guardando"):
+        # Se cortó durante el append: de cada llave se saltan tantas filas como las que el ledger
+        # ganó desde el checkpoint ("previas", contadas antes de escribir). Los cargos repetidos
+        # que ya estaban en el ledger siguen siendo nuevos; sin "previas" se cuenta todo el ledger.
+        previas = estado.get("previas") or {}
+        escritas = Counter({k: ya[k] - previas.get(str(k), 0) for k in set(claves)})
+        quedan = []
+        for r, k in zip(filas, claves):
+            if escritas[k] > 0:
+                escritas[k] -= 1
+            else:
+                quedan.append(r)
+        filas = quedan
+    else:
+        estado["previas"] = {str(k): ya[k] for k in set(claves)}
+        estado["guardando"] = True
+        _guardar_checkpoint(meta_path, estado)
+    ids = append_gastos(filas) if filas else []
+    for p in (meta_path, filas_path):
+        try:
+            p.unlink()
+        except OSError:
+            pass
+    print(f"[IMPORT] {path.name}: {len(ids)} nuevos, {estado['duplicados']} duplicados, "
+          f"{estado['descartados']} descartados de {estado['leidos']} registros")
+    _avisar("listo", total_bytes)
+    return Resultado(estado["leidos"], len(ids), estado["duplicados"], estado["descartados"], ids)
+
+
+def _leer_y_clasificar(registros, formatos, cargos_negativos: bool, procesos: int, estado: dict,
+                       meta_path: Path, filas_path: Path, avisar: Callable[[str, int], None]) -> None:
+    """Parseo + duplicados + clasificación por lote; cada lote termina en un checkpoint."""
+    from .categorizer import clasificar_lote
+
+    reanudado_hasta = estado["leidos"]
+    # Lo que quedó escrito después del último checkpoint no cuenta
+    with open(filas_path, "ab") as f:
+        f.truncate(estado["bytes_filas"])
+
+    existentes = indice_existentes()
+    categorias: Dict[str, str] = {}
+    leidos = 0
+    for lote, pos in _normalizados(_lotes(registros), formatos, cargos_negativos, procesos):
+        aceptadas = []
+        for i, reg in enumerate(lote, start=leidos):
+            if reg is None:
+                if i >= reanudado_hasta:
+                    estado["descartados"] += 1
+                continue
+            # Lo anterior al checkpoint solo se repasa para consumir las mismas llaves del índice
+            if existentes[reg[3]] > 0:
+                existentes[reg[3]] -= 1
+                if i >= reanudado_hasta:
+                    estado["duplicados"] += 1
+            elif i >= reanudado_hasta:
+                aceptadas.append(reg)
+        leidos += len(lote)
+        if leidos <= reanudado_hasta:
+            continue
+
+        faltan = list(dict.fromkeys(d for _, d, _, _ in aceptadas if d not in categorias))
+        if faltan:
+            categorias.update(zip(faltan, clasificar_lote(faltan)))
+        with open(filas_path, "a", encoding="utf-8") as f:
+            for fecha, desc, cents, _ in aceptadas:
+                f.write(json.dumps({"fecha": fecha, "descripcion": desc,
+                                    "categoria": categorias[desc], "monto": formatear(cents)},
+                                   ensure_ascii=False) + "\n")
+            estado["bytes_filas"] = f.tell()
+        estado["leidos"] = leidos
+        estado["nuevos"] += len(aceptadas)
+        _guardar_checkpoint(meta_path, estado)
+        avisar("leyendo", pos)
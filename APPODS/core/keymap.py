@@ -0,0 +1,94 @@
+# core/keymap.py — clasificador local por palabras clave (keymap de categorias.json + reglas del usuario)
+from __future__ import annotations
+import json, re, unicodedata
+from typing import Dict, Optional, Tuple
+from .paths import get_data_dir
+from . import categories
+
+CATS_JSON   = categories.CATS_JSON
+REGLAS_JSON = get_data_dir() / "reglas_usuario.json"   # opcional: {"palabra": "Categoría > Sub"}
+
+# Palabras cortas (sat, cfe, izzi…) exigen palabra completa para no disparar dentro de otras
+# ("satisfecho"); las largas aceptan prefijo ("super" → "supermercado").
+_MIN_PREFIJO = 4
+
+# Matcher compilado + versión de los archivos con la que se construyó
+_MATCHER: Dict[str, object] = {"version": None, "regex": None, "destino": {}}
+
+
+def normalizar(texto: str) -> str:
+    """minúsculas, sin acentos y con espacios colapsados."""
+    s = unicodedata.normalize("NFKD", str(texto or "").lower())
+    s = "".join(ch for ch in s if not unicodedata.combining(ch))
+    return " ".join(s.split())
+
+
+def _file_version(path) -> Tuple[int, int]:
+    try:
+        st = path.stat()
+        return (st.st_mtime_ns, st.st_size)
+    except OSError:
+        return (0, 0)
+
+
+def _read_json(path) -> dict:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else {}
+    except Exception:
+        return {}
+
+
+def _compile(reglas: Dict[str, str]):
+    """Una sola expresión regular con todas las palabras (las más largas primero)."""
+    if not reglas:
+        return None
+    partes = []
+    for kw in sorted(reglas, key=len, reverse=True):
+        pat = r"\s+".join(re.escape(tok) for tok in kw.split())
+        if len(kw) < _MIN_PREFIJO:
+            pat += r"(?![a-z0-9])"
+        partes.append(pat)
+    return re.compile(r"(?<![a-z0-9])(?:" + "|".join(partes) + ")")
+
+
+def _build() -> None:
+    data = _read_json(CATS_JSON)
+    permitidas = set(categories.categorias())
+
+    destino: Dict[str, str] = {}
+    fuentes = [data.get("keymap") or {}, _read_json(REGLAS_JSON)]  # las reglas del usuario ganan
+    for fuente in fuentes:
+        for kw, cat in fuente.items():
+            kw_n = normalizar(kw)
+            if not kw_n or not isinstance(cat, str):
+                continue
+            if cat.strip() not in permitidas:
+                continue
+            destino[kw_n] = categories.intern(cat)
+
+    _MATCHER["regex"] = _compile(destino)
+    _MATCHER["destino"] = destino
+
+
+def _ensure_matcher():
+    version = (_file_version(CATS_JSON), _file_version(REGLAS_JSON))
+    if _MATCHER["version"] != version:
+        _build()
+        _MATCHER["version"] = version
+    return _MATCHER["regex"], _MATCHER["destino"]
+
+
+def clasificar_local(texto: str) -> Optional[str]:
+    """
+    Devuelve la categoría del keymap/reglas si alguna palabra clave aparece en el texto,
+    o None si no hay coincidencia (el llamador escala a los proveedores de IA).
+    """
+    regex, destino = _ensure_matcher()
+    if regex is None:
+        return None
+    m = regex.search(normalizar(texto))
+    if not m:
+        return None
+    return destino.get(" ".join(m.group(0).split()))
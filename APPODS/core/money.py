@@ -0,0 +1,122 @@
+# core/money.py — montos como centavos enteros: un solo parseo (escalar y por lote) y formato
+from __future__ import annotations
+import re
+from decimal import Decimal, InvalidOperation, ROUND_HALF_EVEN
+from typing import Any, Optional, Sequence
+
+# "1234", "-12.5", "1234.56": el formato con el que storage escribe gastos.csv
+_CANONICO_RE = re.compile(r"-?\d+(\.\d{1,2})?")
+_SIMBOLOS_RE = re.compile(r"\$|MXN|USD|€|\s")
+_LETRAS_RE = re.compile(r"[A-Za-z]")
+_PERMITIDOS_RE = re.compile(r"[\d$,.\s-]+")
+
+_LOTE = 4096   # filas por intento vectorizado en parse_amounts
+
+
+def _normalizar(s: str) -> str:
+    """
+    Quita símbolos de moneda/espacios y deja un solo punto decimal:
+      1.234,56 / 1,234.56 → 1234.56   (el último separador es el decimal)
+      1234,5 / 1234,56    → 1234.56   (una coma con 1–2 dígitos es decimal)
+      1,234 / 1,234,567   → miles;  1.234.567 → miles
+    """
+    s = _SIMBOLOS_RE.sub("", s)
+    coma, punto = s.rfind(","), s.rfind(".")
+    if coma >= 0 and punto >= 0:
+        dec = max(coma, punto)
+        return s[:dec].replace(",", "").replace(".", "") + "." + s[dec + 1:]
+    if coma >= 0:
+        if s.count(",") == 1 and 1 <= len(s) - coma - 1 <= 2:
+            return s.replace(",", ".")
+        return s.replace(",", "")
+    if s.count(".") > 1:
+        return s.replace(".", "")
+    return s
+
+
+def _canonico_a_centavos(s: str) -> int:
+    ent, _, dec = s.partition(".")
+    cents = abs(int(ent)) * 100 + int((dec + "00")[:2])
+    return -cents if s.startswith("-") else cents
+
+
+def a_centavos(x: Any, default: Optional[int] = 0) -> Optional[int]:
+    """
+    Monto → centavos (int). Acepta números y textos como "$1,234.56", "1.234,56 MXN".
+    Devuelve `default` si no se puede interpretar.
+    """
+    if x is None:
+        return default
+    if isinstance(x, int):
+        return x * 100
+    if isinstance(x, float):
+        return int(round(x * 100)) if x == x else default
+    s = str(x).strip()
+    if _CANONICO_RE.fullmatch(s):            # camino rápido: sin limpieza ni Decimal
+        return _canonico_a_centavos(s)
+    s = _normalizar(s)
+    if not s:
+        return default
+    if _CANONICO_RE.fullmatch(s):
+        return _canonico_a_centavos(s)
+    try:
+        d = Decimal(s)
+    except InvalidOperation:
+        return default
+    if not d.is_finite():
+        return default
+    return int(d.scaleb(2).to_integral_value(ROUND_HALF_EVEN))
+
+
+def a_pesos(cents: int) -> float:
+    return cents / 100
+
+
+def to_float(x: Any, default: float = 0.0) -> float:
+    """Igual que a_centavos pero en pesos (float), para quien guarda montos como número."""
+    c = a_centavos(x, None)
+    return float(default) if c is None else c / 100
+
+
+def formatear(cents: int) -> str:
+    """Centavos → '1234.56' (formato de la columna monto)."""
+    signo = "-" if cents < 0 else ""
+    q, r = divmod(abs(int(cents)), 100)
+    return f"{signo}{q}.{r:02d}"
+
+
+def parse_money_strict(txt: Any) -> float | None:
+    """
+    Para campos que captura el usuario. Acepta: 1234, 1,234.56, $1,234.56, 1 234,56
+    Rechaza letras u otros símbolos (salvo $ , . - y espacios).
+    Devuelve float o None si inválido.
+    """
+    if txt is None:
+        return None
+    s = str(txt).strip()
+    if s == "" or _LETRAS_RE.search(s) or not _PERMITIDOS_RE.fullmatch(s):
+        return None
+    c = a_centavos(s, None)
+    return None if c is None else c / 100
+
+
+def parse_amounts(textos: Sequence[Any]):
+    """
+    Lote de montos → np.ndarray[int64] de centavos (0 si no se puede interpretar).
+    Los tramos con formato numérico simple se convierten en C (astype); solo los tramos
+    con símbolos, comas o vacíos pasan por el camino escalar.
+    """
+    import numpy as np
+
+    n = len(textos)
+    out = np.empty(n, dtype=np.int64)
+    for ini in range(0, n, _LOTE):
+        tramo = textos[ini:ini + _LOTE]
+        try:
+            vals = np.asarray(tramo, dtype=np.str_).astype(np.float64)
+            if not np.isfinite(vals).all():
+                raise ValueError
+            out[ini:ini + len(tramo)] = np.rint(vals * 100)
+        except ValueError:
+            out[ini:ini + len(tramo)] = [a_centavos(t) for t in tramo]
+    return out
@@ -0,0 +1,127 @@
+# core/orchestrator.py — consulta Gemini y OpenAI en paralelo (carrera) o con "hedge" por latencia p95
+from __future__ import annotations
+import os, threading, time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+from .ai import _normalize_to_set, precalentar as precalentar_openai
+from .ai_gemini import clasificar_texto_gemini, precalentar as precalentar_gemini
+from .ai import clasificar_texto as clasificar_texto_openai
+
+# "hedge": arranca el 2.º proveedor solo si el 1.º tarda más que su p95 (o falla).
+# "race":  arranca ambos a la vez y se queda con la primera respuesta válida.
+MODO = os.getenv("ZAVE_IA_MODO", "hedge")
+
+HEDGE_DEFAULT_S = 1.5          # hasta tener suficientes muestras
+HEDGE_MIN_S, HEDGE_MAX_S = 0.3, 8.0
+MIN_MUESTRAS = 5
+
+# Orden de preferencia: el primero es el que se lanza siempre
+PROVEEDORES: List[Tuple[str, Callable[[str], str]]] = [
+    ("gemini", clasificar_texto_gemini),
+    ("openai", clasificar_texto_openai),
+]
+
+_LAT_LOCK = threading.Lock()
+_LATENCIAS: Dict[str, Deque[float]] = {}
+_POOL: Optional[ThreadPoolExecutor] = None
+_PRECALENTADO = False
+
+
+def _pool() -> ThreadPoolExecutor:
+    global _POOL
+    if _POOL is None:
+        _POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix="zave-ia")
+    return _POOL
+
+
+def precalentar_en_segundo_plano() -> None:
+    """Abre las conexiones de ambos proveedores en hilos daemon (una vez por proceso)."""
+    global _PRECALENTADO
+    if _PRECALENTADO or os.getenv("ZAVE_PRECALENTAR_IA", "1") == "0":
+        return
+    _PRECALENTADO = True
+    for fn in (precalentar_gemini, precalentar_openai):
+        threading.Thread(target=fn, name=f"zave-warm-{fn.__module__}", daemon=True).start()
+
+
+def registrar_latencia(nombre: str, segundos: float) -> None:
+    with _LAT_LOCK:
+        _LATENCIAS.setdefault(nombre, deque(maxlen=100)).append(segundos)
+
+
+def p95(nombre: str) -> Optional[float]:
+    with _LAT_LOCK:
+        muestras = sorted(_LATENCIAS.get(nombre, ()))
+    if len(muestras) < MIN_MUESTRAS:
+        return None
+    return muestras[min(len(muestras) - 1, int(0.95 * len(muestras)))]
+
+
+def hedge_delay(nombre: str) -> float:
+    d = p95(nombre)
+    if d is None:
+        d = HEDGE_DEFAULT_S
+    return max(HEDGE_MIN_S, min(HEDGE_MAX_S, d))
+
+
+def _lanzar(nombre: str, fn: Callable[[str], str], texto: str, categorias: List[str]) -> Future:
+    def _medido() -> str:
+        t0 = time.perf_counter()
+        cat = fn(texto)
+        # Solo las respuestas reales cuentan para el p95: el "Otros" de un error (sin llave,
+        # auth, red) llega casi al instante y haría que el hedge saliera siempre de inmediato
+        if _normalize_to_set(cat, categorias) not in (None, "Otros"):
+            registrar_latencia(nombre, time.perf_counter() - t0)
+        return cat
+    return _pool().submit(_medido)
+
+
+def resolver(texto: str, categorias: List[str], modo: Optional[str] = None) -> str:
+    """
+    Devuelve la primera categoría válida (dentro de `categorias` y distinta de "Otros")
+    que entregue algún proveedor; "Otros" si ninguno la da.
+    Los hilos de Python no se pueden interrumpir: al perdedor se le cancela si aún no
+    arrancó y, si ya corre, su respuesta simplemente se descarta.
+    """
+    modo = modo or MODO
+    pendientes: Dict[Future, str] = {}
+    cola = list(PROVEEDORES)
+
+    nombre, fn = cola.pop(0)
+    pendientes[_lanzar(nombre, fn, texto, categorias)] = nombre
+    if modo == "race":
+        while cola:
+            nombre, fn = cola.pop(0)
+            pendientes[_lanzar(nombre, fn, texto, categorias)] = nombre
+    limite = time.monotonic() + hedge_delay(PROVEEDORES[0][0])
+
+    try:
+        while pendientes or cola:
+            espera = None
+            if cola:
+                espera = max(0.0, limite - time.monotonic())
+            listos, _ = wait(list(pendientes), timeout=espera, return_when=FIRST_COMPLETED) \
+                if pendientes else (set(), set())
+
+            for f in listos:
+                nombre = pendientes.pop(f)
+                try:
+                    cat = _normalize_to_set(f.result(), categorias)
+                except Exception as e:
+                    print(f"[IA] {nombre} falló: {e}")
+                    cat = None
+                if cat and cat != "Otros":
+                    print(f"[IA] '{texto}' => '{cat}' (gana {nombre})")
+                    return cat
+
+            # Hedge: el siguiente proveedor entra si se venció el p95 o si ya no queda nadie corriendo
+            if cola and (not pendientes or time.monotonic() >= limite):
+                nombre, fn = cola.pop(0)
+                pendientes[_lanzar(nombre, fn, texto, categorias)] = nombre
+                limite = time.monotonic() + hedge_delay(nombre)
+        return "Otros"
+    finally:
+        for f in pendientes:
+            f.cancel()
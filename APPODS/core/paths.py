@@ -1,4 +1,5 @@
 # APPODS/core/paths.py
+import os
 from pathlib import Path
 
 def get_repo_root() -> Path:
@@ -11,8 +12,21 @@ def get_repo_root() -> Path:
     return Path(__file__).resolve().parents[2]
 
 def get_data_dir() -> Path:
-    root = get_repo_root()
-    data = root / "data"
+    """data/ del repo, o la carpeta de ZAVE_DATA_DIR (benchmarks, pruebas con datos desechables)."""
+    otra = os.getenv("ZAVE_DATA_DIR")
+    data = Path(otra) if otra else get_repo_root() / "data"
     data.mkdir(parents=True, exist_ok=True)
     return data
 
+
+def version_archivos(nombres) -> tuple:
+    """(mtime, tamaño) de cada archivo de data/ (None si no existe): cambia con cada escritura."""
+    data = get_data_dir()
+    version = []
+    for nombre in nombres:
+        try:
+            st = (data / nombre).stat()
+            version.append((st.st_mtime_ns, st.st_size))
+        except OSError:
+            version.append(None)
+    return tuple(version)
@@ -1,12 +1,16 @@
 # core/profile.py — manejo de perfil de usuario (JSON)
 from __future__ import annotations
-import json, re
+import copy, json, re
 from datetime import datetime
 from typing import Any, Dict
 from .paths import get_data_dir
+from . import money
 
 EMAIL_RE = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
 
+# Último perfil leído y la (mtime, tamaño) del archivo con que se leyó: se vuelve a leer solo si cambió
+_CACHE: Dict[str, Any] = {"version": None, "perfil": None}
+
 def _default_profile() -> Dict[str, Any]:
     return {
         "usuario": {
@@ -63,6 +67,10 @@ def load_profile() -> Dict[str, Any]:
         prof = _default_profile()
         save_profile(prof)
         return prof
+    st = path.stat()
+    version = (st.st_mtime_ns, st.st_size)
+    if _CACHE["version"] == version:
+        return copy.deepcopy(_CACHE["perfil"])   # quien lo recibe puede modificarlo
     try:
         with open(path, "r", encoding="utf-8") as f:
             data = json.load(f)
@@ -78,7 +86,9 @@ def load_profile() -> Dict[str, Any]:
                 else:
                     base[k] = deep_merge(base[k], v)
         return base
-    return deep_merge(data, default)
+    perfil = deep_merge(data, default)
+    _CACHE.update(version=version, perfil=copy.deepcopy(perfil))
+    return perfil
 
 def save_profile(profile: Dict[str, Any]) -> None:
     profile = dict(profile or {})
@@ -87,6 +97,7 @@ def save_profile(profile: Dict[str, Any]) -> None:
     p.parent.mkdir(parents=True, exist_ok=True)
     with open(p, "w", encoding="utf-8") as f:
         json.dump(profile, f, ensure_ascii=False, indent=2)
+    _CACHE["version"] = None
 
 def is_valid_email(email: str) -> bool:
     if not email:
@@ -94,25 +105,8 @@ def is_valid_email(email: str) -> bool:
     return EMAIL_RE.match(email) is not None
 
 def to_float(s: Any) -> float:
-    if s is None:
-        return 0.0
-    if isinstance(s, (int, float)):
-        return float(s)
-    txt = str(s).strip()
-    if not txt:
-        return 0.0
-    for ch in ["$", "MXN", "USD", "€", " "]:
-        txt = txt.replace(ch, "")
-    # 1.234,56 → 1234.56
-    if "," in txt and "." not in txt:
-        txt = txt.replace(".", "")
-        txt = txt.replace(",", ".")
-    else:
-        txt = txt.replace(",", "")
-    try:
-        return float(txt)
-    except Exception:
-        return 0.0
+    # Mismo parseo que el resto de la app (core.money): "$1,234.56", "1.234,56", 1234…
+    return money.to_float(s)
 
 def to_int(s: Any, default: int = 0) -> int:
     try:
@@ -0,0 +1,296 @@
+# core/reports.py — contenido de los reportes sin UI: recomendaciones, filas de la tabla, datos de la gráfica y exportación
+from __future__ import annotations
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from .analytics import Columnas, desde_filas, acumulado as acumulado_de, partes_por_categoria
+from .fechas import PERIODOS, fecha_a_epoch
+
+
+def pct_text(x: float) -> str:
+    try: return f"{x*100:.1f}%"
+    except: return "0%"
+
+def fmt_money(x) -> str:
+    try: return f"${float(x):,.2f}"
+    except: return "$0.00"
+
+
+# ---------- Recomendaciones (win_reco) ----------
+def build_recos(cls: dict, state: dict, topcats: list[tuple[str,float,float]]):
+    """Plan corto / mediano / largo plazo a partir de classify_user(), el perfil y las top categorías."""
+    rec_corto, rec_med, rec_largo = [], [], []
+
+    m   = cls.get("metrics", {})
+    lab = cls.get("labels", {})
+    consumo = cls.get("perfil_consumo", {})
+    metas   = cls.get("metas", {}) or {}
+
+    imt     = float(m.get("ingreso_total_mensual", 0.0))
+    cv      = float(m.get("carga_vivienda", 0.0))
+    dsr     = float(m.get("carga_deuda", 0.0))
+    cf      = float(m.get("carga_fijos", 0.0))
+    ca_mxn  = float(m.get("capacidad_ahorro_mxn", 0.0))
+    ca_pct  = float(m.get("capacidad_ahorro_pct", 0.0))
+    igd     = float(m.get("IGD", 0.0))
+
+    ess = max(0.0, imt * (cv + cf + dsr))
+
+    # --- Corto plazo (0–30 días) ---
+    if ca_pct <= 0:
+        rec_corto.append("Detén la fuga de caja: congela gastos discrecionales por 30 días (comer fuera, café, compras online).")
+    if cv >= 0.30:
+        rec_corto.append("Revisa contrato de vivienda: renegocia renta/servicios o considera roommate para bajar la carga < 30%.")
+    if dsr >= 0.20:
+        rec_corto.append("Define estrategia de deudas (avalancha o bola de nieve) y evita nuevos créditos.")
+    if topcats:
+        rec_corto.append("Ataca primero las categorías más altas con metas de reducción concretas (10–20%):")
+        for k, v, p in topcats[:5]:
+            rec_corto.append(f"• {k}: hoy {fmt_money(v)} ({pct_text(p)} del total). Propón tope mensual = {fmt_money(v*0.85)}.")
+
+    # --- Mediano plazo (1–6 meses) ---
+    est = (lab.get("estabilidad_ingreso","Fijo") or "").lower()
+    dependientes = int(state.get("situacion",{}).get("dependientes",0) or 0)
+    base_months = 6 if ("alta" in est or "media" in est) else 3
+    if dependientes>0: base_months += 3
+    fondo_meta = base_months * ess
+    rec_med.append(f"Fondo de emergencia: {base_months} meses de esenciales ≈ {fmt_money(fondo_meta)}. Aporta automático: {fmt_money(max(0.0, fondo_meta/ max(1, base_months*2)))}+/mes.")
+
+    meta_p = metas.get("principal","Ahorro de emergencia")
+    ratio  = float(m.get("ratio_aporte", 0.0))
+    aporte_lbl = metas.get("aporte_label","Aporte insuficiente")
+    if meta_p and meta_p != "N/D":
+        rec_med.append(f"Meta: {meta_p} — estado: {aporte_lbl}. Ajusta aportación para estar ≥100% del requerido (hoy {ratio*100:.0f}%).")
+
+    if igd >= 60:
+        rec_med.append("Tope discrecional: fija presupuestos envelope (comer/café/online) para no exceder 15–20% del ingreso.")
+    if cv >= 0.45:
+        rec_med.append("Plan de mudanza (3–6 meses): busca opciones para llevar vivienda < 30% del ingreso.")
+    if cf >= 0.50:
+        rec_med.append("Audita servicios y suscripciones: baja fijos a < 35% (renegocia internet/luz, cancela duplicados).")
+
+    # --- Largo plazo (6–24 meses) ---
+    if ca_pct >= 0.10:
+        rec_largo.append("Automatiza inversión del 10–20% del ingreso (tras cumplir fondo de emergencia).")
+    else:
+        rec_largo.append("Primero consolida fondo y reduce cargas; luego invierte de forma automática.")
+    if dsr >= 0.35:
+        rec_largo.append("Consolida deudas costosas si es viable (sin alargar plazo total) y libera flujo para metas.")
+    if lab.get("segmento_ingreso") in ("Medio alto","Alto"):
+        rec_largo.append("Optimiza impuestos y formaliza objetivos (AFORE/planes personales, inversión diversificada).")
+
+    tags = set((consumo or {}).get("tags", []))
+    if "Foodie" in tags:
+        rec_med.append("Batch cooking y menú semanal para recortar 15–25% en ‘comer fuera’.")
+    if "Café lover" in tags:
+        rec_corto.append("Sustituye 50% de cafés fuera por termo en casa; reinvierte el ahorro a tu meta.")
+    if "Onliner" in tags:
+        rec_corto.append("Carrito 24h + regla 30 días para compras no esenciales; desactiva ‘comprar en 1 clic’.")
+
+    return {
+        "Corto plazo (0–30 días)": rec_corto,
+        "Mediano plazo (1–6 meses)": rec_med,
+        "Largo plazo (6–24 meses)": rec_largo,
+    }
+
+
+def build_markdown(cls: dict, state: dict, topcats, recs, periodo: str = PERIODOS["todo"]) -> str:
+    """Reporte exportable (Markdown) con métricas, top categorías del periodo y el plan."""
+    u = state.get("usuario", {})
+    m = (cls or {}).get("metrics", {}) or {}
+    lbl = (cls or {}).get("labels", {}) or {}
+
+    lines = []
+    lines.append("# Recomendaciones ZAVE\n")
+    lines.append(f"**Persona**: {cls.get('persona','N/D')}\n")
+    lines.append(f"**Nombre**: {u.get('nombre','N/D')} | **Edad**: {u.get('edad','N/D')} | **Ciudad**: {state.get('usuario',{}).get('ubicacion',{}).get('ciudad','')}\n")
+    lines.append(f"**Segmento**: {lbl.get('segmento_ingreso','N/D')}  |  **Estabilidad**: {lbl.get('estabilidad_ingreso','N/D')}  |  **Ahorro**: {lbl.get('capacidad_ahorro','N/D')}\n")
+    lines.append("\n---\n")
+    lines.append("## Métricas\n")
+    lines.append(f"- Ingreso total mensual: {fmt_money(m.get('ingreso_total_mensual',0))}")
+    lines.append(f"- Capacidad de ahorro: {pct_text(float(m.get('capacidad_ahorro_pct',0)))} ({fmt_money(m.get('capacidad_ahorro_mxn',0))}/mes)")
+    lines.append(f"- Carga vivienda: {pct_text(float(m.get('carga_vivienda',0)))}")
+    lines.append(f"- Carga deudas: {pct_text(float(m.get('carga_deuda',0)))}")
+    lines.append(f"- Gastos fijos: {pct_text(float(m.get('carga_fijos',0)))}")
+    lines.append(f"- IGD (discrecional): {float(m.get('IGD',0)):.0f}/100\n")
+    lines.append(f"## Top categorías de gasto ({periodo})\n")
+    if not topcats:
+        lines.append("- (Sin datos)\n")
+    else:
+        for k, v, p in topcats[:10]:
+            lines.append(f"- {k}: {fmt_money(v)} ({pct_text(p)})")
+        lines.append("")
+    for title in ("Corto plazo (0–30 días)", "Mediano plazo (1–6 meses)", "Largo plazo (6–24 meses)"):
+        lines.append(f"## {title}")
+        arr = recs.get(title, [])
+        if not arr:
+            lines.append("- (Sin acciones por ahora)")
+        else:
+            for t in arr:
+                lines.append(f"- {t}")
+        lines.append("")
+    return "\n".join(lines)
+
+
+# ---------- Tabla y gráfica (win_table) ----------
+class DatosTabla(NamedTuple):
+    """Filas del periodo en columnas: la tabla virtual formatea solo las que muestra."""
+    rows: List[Dict[str, str]]
+    cols: Columnas
+    acumulado: np.ndarray     # pesos, en el orden de `rows`
+    principales: List[str]    # por índice de categoría (cols.categoria[i])
+    subs: List[str]
+    ordenes: Dict[str, np.ndarray]   # columna → permutación ascendente (se llena al ordenar)
+
+
+# Columnas de la tabla que se pueden ordenar (el acumulado depende del orden mismo)
+COLUMNAS_ORDENABLES = ("cat_principal", "subcategoria", "descripcion", "monto", "fecha")
+
+
+def preparar_tabla(rows: List[Dict[str, str]]) -> DatosTabla:
+    """
+    Montos, acumulado y "Padre > Sub" vectorizados (core.analytics): cada categoría distinta
+    se separa una sola vez y ningún texto se formatea todavía.
+    """
+    cols = desde_filas(rows)
+    principales, subs = partes_por_categoria(cols)
+    return DatosTabla(rows, cols, acumulado_de(cols), principales, subs, {})
+
+
+def fila_tabla(datos: DatosTabla, i: int, acumulado: Optional[float] = None) -> Tuple[str, str, str, str, str, str]:
+    """
+    Valores de la fila i del Treeview: (principal, sub, descripción, monto, fecha, acumulado).
+    `acumulado` reemplaza al del orden del ledger cuando la tabla está ordenada por otra columna.
+    """
+    r = datos.rows[i]
+    k = datos.cols.categoria[i]
+    return (
+        datos.principales[k],
+        datos.subs[k],
+        r.get("descripcion", "") or "",
+        f"${datos.cols.monto_cents[i] / 100:,.2f}",
+        r.get("fecha", "") or "",
+        f"${datos.acumulado[i] if acumulado is None else acumulado:,.2f}",
+    )
+
+
+def _rangos(valores: List[str]) -> np.ndarray:
+    """Posición alfabética (sin distinguir mayúsculas) de cada texto; solo se ordenan los distintos."""
+    codigo: Dict[str, int] = {}
+    codigos = np.fromiter((codigo.setdefault(v, len(codigo)) for v in valores), dtype=np.intp, count=len(valores))
+    distintos = sorted(codigo, key=str.casefold)
+    rango = np.empty(len(distintos), dtype=np.intp)
+    rango[[codigo[s] for s in distintos]] = np.arange(len(distintos))
+    return rango[codigos]
+
+
+def _clave_orden(datos: DatosTabla, columna: str) -> np.ndarray:
+    """Clave numérica por fila para argsort: centavos, epoch o el rango alfabético del texto."""
+    cols, rows = datos.cols, datos.rows
+    if columna == "monto":
+        return cols.monto_cents
+    if columna == "fecha":
+        return np.fromiter((fecha_a_epoch(r.get("fecha", "")) for r in rows), dtype=np.int64, count=len(rows))
+    if columna == "descripcion":
+        return _rangos([r.get("descripcion", "") or "" for r in rows])
+    if columna in ("cat_principal", "subcategoria"):
+        # Por categoría distinta (decenas), no por fila: luego se expande con cols.categoria
+        return _rangos(datos.principales if columna == "cat_principal" else datos.subs)[cols.categoria]
+    raise ValueError(f"Columna no ordenable: {columna}")
+
+
+def orden_tabla(datos: DatosTabla, columna: str, descendente: bool = False) -> np.ndarray:
+    """
+    Índices de las filas ordenadas por `columna` (argsort estable: los empates quedan en el
+    orden del ledger). La permutación se calcula una vez por columna y vive en `datos`,
+    que se reemplaza solo cuando cambia el ledger; descendente es la misma vista al revés.
+    """
+    perm = datos.ordenes.get(columna)
+    if perm is None:
+        perm = datos.ordenes[columna] = np.argsort(_clave_orden(datos, columna), kind="stable")
+    return perm[::-1] if descendente else perm
+
+
+def filas_en_orden(datos: DatosTabla, columna: Optional[str] = None, descendente: bool = False):
+    """fila(j) → valores de la j-ésima fila en pantalla; el acumulado corre en ese mismo orden."""
+    if columna is None:
+        return lambda j: fila_tabla(datos, j)
+    perm = orden_tabla(datos, columna, descendente)
+    acumulado = np.cumsum(datos.cols.monto_cents[perm]) / 100
+    return lambda j: fila_tabla(datos, int(perm[j]), float(acumulado[j]))
+
+
+def filas_tabla(rows: List[Dict[str, str]]) -> List[Tuple[str, str, str, str, str, str]]:
+    """Todas las filas ya formateadas (exportar / benchmarks); la UI usa preparar_tabla + fila_tabla."""
+    datos = preparar_tabla(rows)
+    return [fila_tabla(datos, i) for i in range(len(rows))]
+
+
+def resumen_totales(por_principal: Dict[str, float]) -> str:
+    """Texto de la barra de totales: total general y cada principal con su %."""
+    total_general = sum(por_principal.values())
+    bloques = [f"Total general: ${total_general:,.2f}"]
+    if por_principal and total_general > 0:
+        orden_principal = sorted(por_principal.items(), key=lambda kv: kv[1], reverse=True)
+        texto_principal = " | ".join([
+            f"{c}: ${v:,.2f} ({(v/total_general)*100:.1f}%)"
+            for c, v in orden_principal
+        ])
+        bloques.append(f"[Por categoría] {texto_principal}")
+    return "   ".join(bloques)
+
+
+def datos_grafica(por_principal: Dict[str, float]) -> Tuple[List[str], List[float], float]:
+    """(categorías, montos, total) de mayor a menor, como los dibuja la gráfica de barras/pastel."""
+    items = sorted(por_principal.items(), key=lambda kv: kv[1], reverse=True)
+    cats = [c for c, _ in items]
+    vals = [v for _, v in items]
+    return cats, vals, (sum(vals) if vals else 1.0)
+
+
+# ---------- Exportar (Markdown / HTML / PDF) ----------
+def exportar(md: str, path: str) -> Tuple[str, Optional[str]]:
+    """
+    Escribe el reporte según la extensión de `path` (.md/.txt, .html o .pdf).
+    Devuelve (ruta escrita, aviso): si el PDF no se puede generar (p. ej. falta reportlab)
+    se guarda como .md junto al destino y `aviso` explica por qué.
+    """
+    lname = path.lower()
+    if lname.endswith(".html"):
+        safe = (md.replace("&","&amp;").replace("<","&lt;").replace(">","&gt;"))
+        html = (
+            "<!DOCTYPE html><html><head><meta charset='utf-8'>"
+            "<title>Recomendaciones ZAVE</title>"
+            "<style>body{font-family: system-ui,Segoe UI,Arial,sans-serif; line-height:1.5; padding:24px;}"
+            "pre{white-space:pre-wrap;}</style></head><body>"
+            "<pre>"+ safe + "</pre></body></html>"
+        )
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(html)
+        return path, None
+    if lname.endswith(".pdf"):
+        try:
+            from reportlab.lib.pagesizes import letter
+            from reportlab.pdfgen import canvas as rlcanvas
+            from reportlab.lib.units import inch
+            from textwrap import wrap
+            c = rlcanvas.Canvas(path, pagesize=letter)
+            width, height = letter
+            y = height - 1*inch
+            for line in md.splitlines():
+                for chunk in wrap(line, 95):
+                    c.drawString(0.75*inch, y, chunk)
+                    y -= 14
+                    if y < 0.75*inch:
+                        c.showPage(); y = height - 1*inch
+            c.save()
+            return path, None
+        except Exception as e:
+            alt = path.rsplit(".",1)[0] + ".md"
+            with open(alt, "w", encoding="utf-8") as f:
+                f.write(md)
+            return alt, f"No se pudo exportar a PDF: {e}"
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(md)
+    return path, None
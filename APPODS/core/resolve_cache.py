@@ -0,0 +1,178 @@
+# core/resolve_cache.py — caché persistente descripción → categoría (data/resolve_cache.json)
+from __future__ import annotations
+import hashlib, json, os, threading, time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+from .paths import get_data_dir
+from .keymap import normalizar
+
+CACHE_JSON = get_data_dir() / "resolve_cache.json"   # snapshot compactado
+CACHE_LOG  = get_data_dir() / "resolve_cache.log"    # bitácora append-only (JSON por línea)
+
+MAX_ENTRIES   = 5000
+TTL_SECONDS   = 90 * 24 * 3600
+COMPACT_EVERY = 256   # líneas en la bitácora antes de reescribir el snapshot
+
+
+def categorias_fingerprint(categorias: List[str]) -> str:
+    return hashlib.sha1("\n".join(categorias).encode("utf-8")).hexdigest()[:12]
+
+
+class ResolveCache:
+    """
+    LRU acotado con TTL. Cada entrada guarda la huella de la lista de categorías con la que
+    se resolvió; si categorias.json cambia, la entrada deja de ser válida.
+    Las escrituras van a una bitácora append-only que se compacta cada COMPACT_EVERY líneas.
+    """
+
+    def __init__(self, snapshot=CACHE_JSON, log=CACHE_LOG,
+                 max_entries: int = MAX_ENTRIES, ttl_s: float = TTL_SECONDS):
+        self.snapshot = snapshot
+        self.log = log
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, dict]" = OrderedDict()
+        self._extra: Dict[str, dict] = {}   # entradas sin "final" (p. ej. "enriched"): se preservan tal cual
+        self._log_lines = 0
+        self._loaded = False
+
+    # ---------- Persistencia ----------
+    def _load(self) -> None:
+        data = {}
+        try:
+            with open(self.snapshot, "r", encoding="utf-8") as f:
+                data = json.load(f) or {}
+        except Exception:
+            data = {}
+        for k, v in data.items():
+            if isinstance(v, dict) and v.get("final"):
+                if v["final"] != "Otros":
+                    self._entries[k] = v
+            else:
+                self._extra[k] = v
+
+        try:
+            with open(self.log, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        rec = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # línea truncada por un cierre abrupto
+                    k = rec.pop("k", None)
+                    if k:
+                        self._entries.pop(k, None)
+                        if rec.get("final") != "Otros":
+                            self._entries[k] = rec
+                    self._log_lines += 1
+        except FileNotFoundError:
+            pass
+
+        # "Otros" es el fallback de error de los proveedores (snapshots viejos lo guardaban): se
+        # descarta para volver a preguntar. Orden LRU aproximado por antigüedad
+        ordered = sorted(self._entries.items(), key=lambda kv: kv[1].get("ts", 0))
+        self._entries = OrderedDict(ordered)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        self._loaded = True
+
+    def _ensure_loaded(self) -> None:
+        if not self._loaded:
+            self._load()
+
+    def _append_log(self, key: str, entry: dict) -> None:
+        try:
+            with open(self.log, "a", encoding="utf-8") as f:
+                f.write(json.dumps({"k": key, **entry}, ensure_ascii=False) + "\n")
+            self._log_lines += 1
+        except OSError as e:
+            print(f"[CACHE] no se pudo escribir la bitácora: {e}")
+
+    def compact(self) -> None:
+        """Reescribe el snapshot con las entradas vivas y vacía la bitácora."""
+        with self._lock:
+            self._ensure_loaded()
+            self._compact_locked()
+
+    def _compact_locked(self) -> None:
+        data = dict(self._extra)
+        data.update(self._entries)
+        tmp = self.snapshot.with_suffix(".json.tmp")
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            os.replace(tmp, self.snapshot)
+            open(self.log, "w", encoding="utf-8").close()
+            self._log_lines = 0
+        except OSError as e:
+            print(f"[CACHE] no se pudo compactar: {e}")
+
+    # ---------- API ----------
+    def get(self, texto: str, categorias: List[str]) -> Optional[str]:
+        key = normalizar(texto)
+        if not key:
+            return None
+        fp = categorias_fingerprint(categorias)
+        with self._lock:
+            self._ensure_loaded()
+            entry = self._entries.get(key)
+            valid = False
+            if entry is not None:
+                fresh = (time.time() - float(entry.get("ts", 0))) <= self.ttl_s
+                if entry.get("cats") is None:
+                    # Entradas antiguas sin huella: válidas solo si la categoría sigue existiendo
+                    valid = entry.get("final") in categorias
+                else:
+                    valid = entry.get("cats") == fp
+                # Sin "ts" (entradas heredadas) cuenta como vencida; "Otros" nunca es un acierto
+                valid = valid and fresh and entry.get("final") != "Otros"
+                if not valid:
+                    del self._entries[key]
+            if not valid:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry["final"]
+
+    def put(self, texto: str, categoria: str, categorias: List[str]) -> None:
+        key = normalizar(texto)
+        if not key or not categoria or categoria == "Otros":
+            return
+        entry = {"final": categoria, "ts": int(time.time()), "cats": categorias_fingerprint(categorias)}
+        with self._lock:
+            self._ensure_loaded()
+            self._entries.pop(key, None)
+            self._entries[key] = entry
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+            self._append_log(key, entry)
+            if self._log_lines >= COMPACT_EVERY:
+                self._compact_locked()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+                "log_lines": self._log_lines,
+            }
+
+
+_CACHE: Optional[ResolveCache] = None
+
+
+def get_cache() -> ResolveCache:
+    global _CACHE
+    if _CACHE is None:
+        _CACHE = ResolveCache()
+    return _CACHE
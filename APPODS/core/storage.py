@@ -1,13 +1,47 @@
 # core/storage.py — manejo robusto de gastos.csv
 from __future__ import annotations
-import csv, os
+import bisect, csv, io, json, mmap, os, re, threading, uuid
 from datetime import datetime
-from typing import List, Dict, Tuple
-from .paths import get_data_dir
+from typing import Iterator, List, Dict, Optional, Tuple
+from .paths import get_data_dir, version_archivos
+from .money import a_centavos, formatear
+from .fechas import FECHA_NULA, fecha_a_epoch, limite_a_epoch, mes_de_fecha
+from .categories import intern
 
 DATA_DIR = get_data_dir()
 GASTOS_CSV = DATA_DIR / "gastos.csv"
-FIELDNAMES = ["fecha", "descripcion", "categoria", "monto"]
+GASTOS_LOG = DATA_DIR / "gastos.log"   # ediciones/borrados por id (append-only, JSON por línea)
+COLUMNAR_DIR = DATA_DIR / "gastos.col"  # snapshot binario por columnas (ver core/columnar.py)
+ROLLUP_JSON = DATA_DIR / "gastos.rollup.json"   # sumas categoría × mes (ver rollups())
+FIELDNAMES = ["id", "fecha", "descripcion", "categoria", "monto"]
+EDITABLES = ("fecha", "descripcion", "categoria", "monto")
+
+# "csv" (data/gastos.csv), "sqlite" (data/gastos.db, ver core/storage_sqlite.py)
+# o "particionado" (data/gastos/YYYY-MM.csv + manifest, ver core/storage_particionado.py)
+BACKEND = os.getenv("ZAVE_STORAGE", "csv")
+
+# fsync al escribir filas nuevas: "none" (lo decide el SO), "batch" (uno por escritura agrupada)
+# o "every" (uno por fila)
+FSYNC = os.getenv("ZAVE_FSYNC", "batch")
+
+# Al pasar este número de cambios en gastos.log se reescribe el CSV en segundo plano
+COMPACT_LOG_EVERY = 500
+
+# Serializa escrituras: la UI y los hilos de clasificación escriben el mismo archivo
+_LOCK = threading.RLock()
+
+# ---------- Caché del ledger (compartida por todas las ventanas) ----------
+# key = (tamaño, mtime_ns) del CSV al momento de la última lectura/escritura propia.
+# Si el archivo solo creció (y los últimos bytes conocidos siguen iguales) se parsea
+# únicamente el rango agregado; las escrituras de este módulo actualizan la caché en sitio.
+# Lo mismo para gastos.log: "ops" acumula el último estado por id (None = tombstone)
+# para volver a aplicarlo si el CSV se relee completo.
+_TAIL_BYTES = 64
+_LEDGER: Dict[str, object] = {
+    "key": None, "offset": 0, "tail": b"", "fields": None, "rows": [], "by_id": {},
+    "log_key": None, "log_offset": 0, "ops": {}, "log_count": 0, "compacting": False,
+    "reescrituras": 0,   # cuántas veces se reescribió el CSV completo (lo usa iter_gastos)
+}
 
 def _ensure_data_dir():
     DATA_DIR.mkdir(parents=True, exist_ok=True)
@@ -15,111 +49,818 @@ def _ensure_data_dir():
 def _csv_is_empty(path) -> bool:
     return (not path.exists()) or (path.stat().st_size == 0)
 
-def append_gasto(descripcion: str, categoria: str, monto: float, fecha: str | None = None) -> None:
+def new_id() -> str:
+    return uuid.uuid4().hex[:12]
+
+def _fmt_monto(monto) -> str:
+    return formatear(a_centavos(monto))
+
+# ---------- Altas: escritura agrupada (group commit) ----------
+# Quien llega con la cola libre se vuelve "líder" y escribe de una sola vez todo lo encolado
+# mientras tanto (GUI, hilos de clasificación, importaciones); los demás esperan su turno.
+# No llamar a append_gasto(s) con _LOCK tomado: el líder lo necesita para escribir.
+_GRUPO: Dict[str, object] = {"cola": [], "lider": False, "cond": threading.Condition()}
+
+def _fila_nueva(descripcion: str, categoria: str, monto, fecha: str | None = None) -> Dict[str, str]:
+    return {
+        "id": new_id(),
+        "fecha": fecha or datetime.now().isoformat(timespec="seconds"),
+        "descripcion": descripcion,
+        "categoria": categoria,
+        "monto": _fmt_monto(monto),
+    }
+
+def _escribir_filas(rows: List[Dict[str, str]]) -> None:
+    """Un open + un write (o uno por fila con FSYNC="every") al final del CSV (llamar con _LOCK)."""
+    _ensure_data_dir()
+    _ledger_rows()  # la caché debe reflejar el archivo (y migrarlo a ids) antes de extenderla
+    vigente = _rollup_vigente()
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fieldnames=FIELDNAMES)
+    # Abrir SIEMPRE con newline="" en Windows para que csv maneje saltos.
+    with open(GASTOS_CSV, "a", encoding="utf-8", newline="") as f:
+        if f.tell() == 0:
+            writer.writeheader()  # escribe 'id,fecha,descripcion,categoria,monto\n'
+        elif not _termina_en_salto():
+            f.write("\n")         # CSV editado a mano sin salto final: no pegar la fila nueva a la última
+        if FSYNC == "every":
+            for row in rows:
+                writer.writerow(row)
+                f.write(buf.getvalue())
+                buf.seek(0)
+                buf.truncate()
+                f.flush()
+                os.fsync(f.fileno())
+        else:
+            writer.writerows(rows)
+            f.write(buf.getvalue())
+            if FSYNC == "batch":
+                f.flush()
+                os.fsync(f.fileno())
+    _ledger_after_append(rows)
+    _rollup_aplicar(vigente, rows, +1)
+
+def _termina_en_salto() -> bool:
+    with open(GASTOS_CSV, "rb") as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b"\n"
+
+def _commit_en_grupo(rows: List[Dict[str, str]]) -> None:
+    pedido = {"rows": rows, "hecho": False, "error": None}
+    cond = _GRUPO["cond"]
+    with cond:
+        _GRUPO["cola"].append(pedido)
+        while _GRUPO["lider"] and not pedido["hecho"]:
+            cond.wait()
+        if pedido["hecho"]:   # otro líder ya lo escribió
+            if pedido["error"]:
+                raise pedido["error"]
+            return
+        _GRUPO["lider"] = True
+        lote, _GRUPO["cola"] = _GRUPO["cola"], []
+
+    error = None
+    try:
+        with _LOCK:
+            _escribir_filas([r for p in lote for r in p["rows"]])
+    except Exception as e:
+        error = e
+    with cond:
+        for p in lote:
+            p["hecho"], p["error"] = True, error
+        _GRUPO["lider"] = False
+        cond.notify_all()
+    if error:
+        raise error
+
+def append_gastos(rows: List[Dict[str, object]]) -> List[str]:
+    """
+    Agrega muchas filas ({"descripcion", "categoria", "monto", "fecha" opcional}) con una sola
+    escritura al CSV. Devuelve los ids asignados, en el mismo orden.
+    """
+    nuevas = [_fila_nueva(r.get("descripcion") or "", r.get("categoria") or "",
+                          r.get("monto"), r.get("fecha")) for r in rows]
+    if nuevas:
+        _commit_en_grupo(nuevas)
+    return [r["id"] for r in nuevas]
+
+def append_gasto(descripcion: str, categoria: str, monto: float, fecha: str | None = None) -> str:
     """
     Agrega una fila al CSV garantizando encabezado y saltos correctos.
+    Devuelve el id estable asignado a la fila.
     """
-    _ensure_data_dir()
-    new_file = not GASTOS_CSV.exists()
-    write_header = _csv_is_empty(GASTOS_CSV)
+    row = _fila_nueva(descripcion, categoria, monto, fecha)
+    _commit_en_grupo([row])
+    return row["id"]
 
-    # Abrir SIEMPRE con newline="" en Windows para que csv maneje saltos.
-    with open(GASTOS_CSV, "a", encoding="utf-8", newline="") as f:
+def _normalize_row(r: Dict[str, str]) -> Optional[Dict[str, str]]:
+    if not r:
+        return None
+    # Normaliza a las llaves esperadas; si falta alguna, pon string vacío
+    row = {
+        "id": (r.get("id") or "").strip(),
+        "fecha": (r.get("fecha") or "").strip(),
+        "descripcion": (r.get("descripcion") or "").strip(),
+        "categoria": intern(r.get("categoria")),   # un solo str por categoría en toda la caché
+        "monto": (r.get("monto") or "").strip(),
+    }
+    # Si por error el header quedó pegado (ej: 'monto2025-...'), intenta recuperarlo:
+    if not row["monto"]:
+        for k in list(r.keys()):
+            if k and isinstance(k, str) and k.strip().lower().startswith("monto"):
+                row["monto"] = (r.get(k) or "").strip()
+                break
+    # descartar filas totalmente vacías
+    return row if any(row[k] for k in EDITABLES) else None
+
+def _stat_key(st) -> Tuple[int, int]:
+    return (st.st_size, st.st_mtime_ns)
+
+def _read_tail(f, end: int) -> bytes:
+    f.seek(max(0, end - _TAIL_BYTES))
+    return f.read(end - max(0, end - _TAIL_BYTES))
+
+def _parse_from(f, start: int, fields: Optional[List[str]], completo: bool = False):
+    """
+    Parsea desde `start`. Devuelve (filas, fin, campos). En lectura incremental se detiene en
+    el último salto de línea (una línea a medio escribir se deja para la próxima lectura);
+    con completo=True el fin de archivo también cierra la última fila, como csv.DictReader.
+    """
+    f.seek(start)
+    data = f.read()
+    cut = len(data) if completo else data.rfind(b"\n") + 1
+    text = data[:cut].decode("utf-8", errors="replace")
+    reader = csv.DictReader(io.StringIO(text, newline=""), fieldnames=fields)
+    rows = []
+    for r in reader:
+        row = _normalize_row(r)
+        if row:
+            rows.append(row)
+    return rows, start + cut, (fields or reader.fieldnames)
+
+# ---------- Bitácora de cambios (gastos.log) ----------
+def _apply_op(op: dict) -> None:
+    rid = op.get("id")
+    if not rid:
+        return
+    ops, by_id = _LEDGER["ops"], _LEDGER["by_id"]
+    if op.get("op") == "del":
+        ops[rid] = None
+        row = by_id.pop(rid, None)
+        if row is not None:
+            _fechas_quitar(row)
+            rows = _LEDGER["rows"]
+            for i in range(len(rows) - 1, -1, -1):   # lo borrado suele ser reciente
+                if rows[i] is row:
+                    del rows[i]
+                    break
+        return
+    if rid in ops and ops[rid] is None:
+        return  # ya tiene tombstone
+    campos = {k: v for k, v in (op.get("campos") or {}).items() if k in EDITABLES}
+    if "categoria" in campos:
+        campos["categoria"] = intern(campos["categoria"])
+    ops.setdefault(rid, {}).update(campos)
+    row = by_id.get(rid)
+    if row is not None:
+        if "fecha" in campos:
+            _fechas_quitar(row)
+        row.update(campos)
+        if "fecha" in campos:
+            _fechas_agregar([row])
+
+def _index_rows(rows: List[Dict[str, str]]) -> None:
+    """Registra filas nuevas en by_id y les aplica los cambios pendientes de la bitácora."""
+    ops, by_id = _LEDGER["ops"], _LEDGER["by_id"]
+    borrados = set()
+    for r in rows:
+        rid = r["id"]
+        if rid in ops:
+            if ops[rid] is None:
+                borrados.add(rid)
+                continue
+            r.update(ops[rid])
+        by_id[rid] = r
+    if borrados:
+        rows[:] = [r for r in rows if r["id"] not in borrados]
+
+def _sync_log() -> bool:
+    """Lee lo nuevo de gastos.log. False si la bitácora se truncó/reemplazó por fuera."""
+    if not GASTOS_LOG.exists():
+        if _LEDGER["log_offset"]:
+            return False
+        _LEDGER["log_key"] = None
+        return True
+    st = GASTOS_LOG.stat()
+    key = _stat_key(st)
+    if key == _LEDGER["log_key"]:
+        return True
+    if st.st_size < _LEDGER["log_offset"]:
+        return False
+    with open(GASTOS_LOG, "rb") as f:
+        f.seek(_LEDGER["log_offset"])
+        data = f.read()
+    cut = data.rfind(b"\n") + 1
+    for line in data[:cut].splitlines():
+        try:
+            _apply_op(json.loads(line))
+            _LEDGER["log_count"] += 1
+        except (ValueError, AttributeError):
+            continue
+    _LEDGER["log_offset"] += cut
+    _LEDGER["log_key"] = key
+    return True
+
+def _reset_ledger() -> None:
+    _LEDGER.update(key=None, offset=0, tail=b"", fields=None, rows=[], by_id={},
+                   log_key=None, log_offset=0, ops={}, log_count=0)
+    _fechas_invalidar()
+
+def _sync_csv() -> None:
+    if not GASTOS_CSV.exists():
+        _LEDGER.update(key=None, offset=0, tail=b"", fields=None, rows=[], by_id={})
+        _fechas_invalidar()
+        return
+    st = GASTOS_CSV.stat()
+    key = _stat_key(st)
+    if key == _LEDGER["key"]:
+        return
+
+    with open(GASTOS_CSV, "rb") as f:
+        offset = _LEDGER["offset"]
+        # Si la última fila leída no terminaba en salto de línea, lo que creció puede ser su
+        # continuación: se relee todo
+        grew = (_LEDGER["key"] is not None and _LEDGER["fields"] and st.st_size > offset
+                and _LEDGER["tail"].endswith(b"\n") and _read_tail(f, offset) == _LEDGER["tail"])
+        if grew:
+            nuevas, end, _ = _parse_from(f, offset, _LEDGER["fields"])
+            _index_rows(nuevas)
+            _LEDGER["rows"].extend(nuevas)
+            _fechas_agregar(nuevas)
+        else:
+            rows, end, fields = _parse_from(f, 0, None, completo=True)
+            _LEDGER.update(rows=rows, fields=fields, by_id={})
+            _index_rows(rows)
+            _fechas_invalidar()
+        _LEDGER.update(key=key, offset=end, tail=_read_tail(f, end))
+
+def _migrar_ids() -> None:
+    """
+    Archivo anterior a los ids (o filas agregadas a mano sin id): se migra una sola vez.
+    Va después de _sync_log: _write_all vacía la bitácora, así que las filas que escribe
+    ya deben traer sus ediciones y tombstones.
+    """
+    if "" in _LEDGER["by_id"] or ("id" not in (_LEDGER["fields"] or []) and _LEDGER["rows"]):
+        for r in _LEDGER["rows"]:
+            r["id"] = r["id"] or new_id()
+        _write_all(_LEDGER["rows"])
+
+def _ledger_rows() -> List[Dict[str, str]]:
+    """Filas vigentes (CSV + bitácora) en caché, sincronizadas con disco (llamar con _LOCK)."""
+    _sync_csv()
+    if not _sync_log():
+        _reset_ledger()
+        _sync_csv()
+        _sync_log()
+    _migrar_ids()
+    return _LEDGER["rows"]
+
+def _csv_reemplazado() -> None:
+    """
+    gastos.csv se reescribió por fuera de _write_all (exportar_csv de otro backend, que ya
+    incorporó gastos.log): la bitácora sobra y las cachés del ledger y del rollup quedan viejas.
+    """
+    with _LOCK:
+        GASTOS_LOG.unlink(missing_ok=True)
+        ROLLUP_JSON.unlink(missing_ok=True)
+        _ROLLUP.update(fuente=None, celdas=None, cargado=False)
+        _LEDGER["reescrituras"] += 1
+        _reset_ledger()
+
+def _ledger_after_append(rows: List[Dict[str, str]]) -> None:
+    """Extiende la caché con filas recién agregadas al final de un CSV que ya reflejaba (con _LOCK)."""
+    st = GASTOS_CSV.stat()
+    with open(GASTOS_CSV, "rb") as f:
+        tail = _read_tail(f, st.st_size)
+    nuevas = [r for r in (_normalize_row(x) for x in rows) if r]
+    _index_rows(nuevas)
+    _LEDGER["rows"].extend(nuevas)
+    _fechas_agregar(nuevas)
+    _LEDGER["fields"] = _LEDGER["fields"] or list(FIELDNAMES)
+    _LEDGER.update(key=_stat_key(st), offset=st.st_size, tail=tail)
+
+def _write_all(rows: List[Dict[str, str]], write_header: bool = True) -> None:
+    """Reescribe el CSV completo (atómico), vacía la bitácora y deja la caché igual al archivo."""
+    _ensure_data_dir()
+    tmp = GASTOS_CSV.with_suffix(".csv.tmp")
+    with open(tmp, "w", encoding="utf-8", newline="") as f:
         writer = csv.DictWriter(f, fieldnames=FIELDNAMES)
         if write_header:
-            writer.writeheader()  # escribe 'fecha,descripcion,categoria,monto\n'
-        writer.writerow({
-            "fecha": fecha or datetime.now().isoformat(timespec="seconds"),
-            "descripcion": descripcion,
-            "categoria": categoria,
-            "monto": f"{float(monto):.2f}",
-        })
+            writer.writeheader()
+        writer.writerows(rows)
+    os.replace(tmp, GASTOS_CSV)
+    _LEDGER["reescrituras"] += 1
+    if GASTOS_LOG.exists():
+        open(GASTOS_LOG, "w").close()
 
-def load_gastos() -> List[Dict[str, str]]:
+    _reset_ledger()
+    st = GASTOS_CSV.stat()
+    with open(GASTOS_CSV, "rb") as f:
+        tail = _read_tail(f, st.st_size)
+    nuevas = [r for r in (_normalize_row(x) for x in rows) if r]
+    _LEDGER.update(rows=nuevas, by_id={r["id"]: r for r in nuevas}, fields=list(FIELDNAMES),
+                   key=_stat_key(st), offset=st.st_size, tail=tail)
+    if GASTOS_LOG.exists():
+        _LEDGER["log_key"] = _stat_key(GASTOS_LOG.stat())
+    _rollup_reconstruir(nuevas)
+
+# ---------- Índice por fecha: epochs ordenados + filas alineadas, consultas con bisect ----------
+# Se construye una vez sobre la caché del ledger y se mantiene en sitio con altas, ediciones
+# de fecha y borrados; si el CSV se relee completo se invalida y se rehace al siguiente uso.
+_FECHAS: Dict[str, object] = {"listo": False, "epochs": [], "filas": []}
+
+def _fechas_invalidar() -> None:
+    _FECHAS.update(listo=False, epochs=[], filas=[])
+
+def _fechas_agregar(rows) -> None:
+    if not _FECHAS["listo"]:
+        return
+    epochs, filas = _FECHAS["epochs"], _FECHAS["filas"]
+    for r in rows:
+        e = fecha_a_epoch(r["fecha"])
+        i = bisect.bisect_right(epochs, e)   # tras las de la misma fecha: conserva el orden de captura
+        epochs.insert(i, e)
+        filas.insert(i, r)
+
+def _fechas_quitar(row: Dict[str, str]) -> None:
+    if not _FECHAS["listo"]:
+        return
+    epochs, filas = _FECHAS["epochs"], _FECHAS["filas"]
+    e = fecha_a_epoch(row["fecha"])
+    i = bisect.bisect_left(epochs, e)
+    while i < len(epochs) and epochs[i] == e:
+        if filas[i] is row:
+            del epochs[i], filas[i]
+            return
+        i += 1
+
+def _fechas_indice() -> Tuple[List[int], List[Dict[str, str]]]:
+    """(epochs, filas) del ledger vigente, ordenados por fecha (llamar con _LOCK)."""
+    rows = _ledger_rows()
+    if not _FECHAS["listo"]:
+        orden = sorted(range(len(rows)), key=lambda i: fecha_a_epoch(rows[i]["fecha"]))
+        filas = [rows[i] for i in orden]
+        _FECHAS.update(listo=True, epochs=[fecha_a_epoch(r["fecha"]) for r in filas], filas=filas)
+    return _FECHAS["epochs"], _FECHAS["filas"]
+
+def _rango(desde: str | None, hasta: str | None) -> List[Dict[str, str]]:
+    """Filas con desde <= fecha < hasta: O(log n + k) sobre el índice (llamar con _LOCK)."""
+    epochs, filas = _fechas_indice()
+    lo = bisect.bisect_left(epochs, limite_a_epoch(desde)) if desde else 0
+    hi = bisect.bisect_left(epochs, limite_a_epoch(hasta)) if hasta else len(epochs)
+    return filas[lo:hi]
+
+def load_gastos(desde: str | None = None, hasta: str | None = None) -> List[Dict[str, str]]:
     """
     Carga todas las filas del CSV. Ignora líneas vacías.
-    Devuelve una lista de dicts con llaves: fecha, descripcion, categoria, monto.
+    Devuelve una lista de dicts con llaves: id, fecha, descripcion, categoria, monto.
+    Sale de la caché compartida: solo se vuelve a leer lo que cambió en disco.
+    Con desde/hasta (ISO, hasta exclusivo) solo devuelve ese periodo, ordenado por fecha
+    y resuelto con bisect sobre el índice de fechas.
     """
     _ensure_data_dir()
-    rows: List[Dict[str, str]] = []
-    if not GASTOS_CSV.exists():
-        return rows
-    with open(GASTOS_CSV, "r", encoding="utf-8", newline="") as f:
-        reader = csv.DictReader(f)
-        for r in reader:
-            if not r:
-                continue
-            # Normaliza a las llaves esperadas; si falta alguna, pon string vacío
-            row = {
-                "fecha": (r.get("fecha") or "").strip(),
-                "descripcion": (r.get("descripcion") or "").strip(),
-                "categoria": (r.get("categoria") or "").strip(),
-                "monto": (r.get("monto") or "").strip(),
-            }
-            # Si por error el header quedó pegado (ej: 'monto2025-...'), intenta recuperarlo:
-            if not row["monto"]:
-                for k in list(r.keys()):
-                    if k and isinstance(k, str) and k.strip().lower().startswith("monto"):
-                        row["monto"] = (r.get(k) or "").strip()
-                        break
-            # descartar filas totalmente vacías
-            if any(row.values()):
-                rows.append(row)
-    return rows
+    with _LOCK:
+        if desde or hasta:
+            return [dict(r) for r in _rango(desde, hasta)]
+        return [dict(r) for r in _ledger_rows()]
+
+def get_gasto(gasto_id: str) -> Optional[Dict[str, str]]:
+    with _LOCK:
+        _ledger_rows()
+        row = _LEDGER["by_id"].get(gasto_id)
+        return dict(row) if row else None
 
 def clear_gastos(write_header: bool = True) -> None:
     """
     Limpia el CSV. Si write_header=True, deja solo el encabezado.
     """
-    _ensure_data_dir()
-    with open(GASTOS_CSV, "w", encoding="utf-8", newline="") as f:
-        if write_header:
-            writer = csv.DictWriter(f, fieldnames=FIELDNAMES)
-            writer.writeheader()
-            
+    with _LOCK:
+        _write_all([], write_header=write_header)
+
 def save_all_gastos(rows: list[dict]) -> None:
     """
     Reescribe 'gastos.csv' con la lista recibida (debe incluir encabezados correctos).
-    Cada item: {"fecha": str, "descripcion": str, "categoria": str, "monto": str/float}
+    Cada item: {"id": str (opcional), "fecha": str, "descripcion": str, "categoria": str, "monto": str/float}
     """
-    GASTOS_CSV.parent.mkdir(parents=True, exist_ok=True)
-    with open(GASTOS_CSV, "w", encoding="utf-8", newline="") as f:
-        writer = csv.DictWriter(f, fieldnames=FIELDNAMES)
-        writer.writeheader()
-        for r in rows:
-            writer.writerow({
-                "fecha": (r.get("fecha") or "").strip(),
-                "descripcion": (r.get("descripcion") or "").strip(),
-                "categoria": (r.get("categoria") or "").strip(),
-                "monto": f"{float(r.get('monto', 0) or 0):.2f}",
-            })
+    out = [{
+        "id": (r.get("id") or "").strip() or new_id(),
+        "fecha": (r.get("fecha") or "").strip(),
+        "descripcion": (r.get("descripcion") or "").strip(),
+        "categoria": (r.get("categoria") or "").strip(),
+        "monto": _fmt_monto(r.get("monto", 0)),
+    } for r in rows]
+    with _LOCK:
+        _write_all(out)
 
-def totals(rows: List[Dict[str, str]]) -> Tuple[float, Dict[str, float]]:
+# ---------- Cambios por id: O(1) en disco (una línea en gastos.log) ----------
+def _append_op(op: dict) -> None:
+    _ensure_data_dir()
+    vigente = _rollup_vigente()
+    antes = _LEDGER["by_id"].get(op["id"])
+    antes = dict(antes) if antes else None
+    with open(GASTOS_LOG, "a", encoding="utf-8") as f:
+        f.write(json.dumps(op, ensure_ascii=False) + "\n")
+    _LEDGER["log_offset"] = GASTOS_LOG.stat().st_size
+    _LEDGER["log_key"] = _stat_key(GASTOS_LOG.stat())
+    _LEDGER["log_count"] += 1
+    _apply_op(op)
+    if antes:
+        _rollup_aplicar(vigente, [antes], -1)
+    despues = _LEDGER["by_id"].get(op["id"])
+    _rollup_aplicar(vigente, [despues] if despues else [], +1)
+    if _LEDGER["log_count"] >= COMPACT_LOG_EVERY and not _LEDGER["compacting"]:
+        _LEDGER["compacting"] = True
+        threading.Thread(target=compactar, name="zave-compactar", daemon=True).start()
+
+def update_gasto(gasto_id: str, **fields) -> bool:
     """
-    Calcula total general y totales por categoría (texto completo).
+    Cambia campos de un gasto (fecha, descripcion, categoria, monto) por su id.
+    Devuelve False si el id no existe.
     """
-    def _to_float(x: str) -> float:
-        s = (x or "").strip()
-        if not s:
-            return 0.0
-        s = s.replace("$", "").replace("MXN", "").replace("USD", "").replace("€", "")
-        s = s.replace(" ", "")
-        # 1.234,56 -> 1234.56
-        if "," in s and "." not in s:
-            s = s.replace(".", "")
-            s = s.replace(",", ".")
-        else:
-            s = s.replace(",", "")
+    campos = {k: v for k, v in fields.items() if k in EDITABLES}
+    if "monto" in campos:
+        campos["monto"] = _fmt_monto(campos["monto"])
+    campos = {k: str(v).strip() for k, v in campos.items()}
+    with _LOCK:
+        _ledger_rows()
+        if gasto_id not in _LEDGER["by_id"]:
+            return False
+        if campos:
+            _append_op({"op": "upd", "id": gasto_id, "campos": campos})
+    return True
+
+def delete_gasto(gasto_id: str) -> bool:
+    """Borra un gasto por id (tombstone en gastos.log). False si no existe."""
+    with _LOCK:
+        _ledger_rows()
+        if gasto_id not in _LEDGER["by_id"]:
+            return False
+        _append_op({"op": "del", "id": gasto_id})
+    return True
+
+def compactar() -> None:
+    """Incorpora gastos.log al CSV (reescritura completa) y vacía la bitácora."""
+    try:
+        with _LOCK:
+            rows = _ledger_rows()
+            if _LEDGER["log_count"]:
+                _write_all([dict(r) for r in rows])
+            if COLUMNAR_DIR.exists():
+                exportar_columnar()
+    finally:
+        _LEDGER["compacting"] = False
+
+def actualizar_categoria(gasto_id: str, categoria: str, anterior: str) -> bool:
+    """
+    Cambia la categoría del gasto `gasto_id` solo si aún tiene `anterior`.
+    Devuelve False si la fila ya no existe o el usuario la editó mientras tanto.
+    """
+    with _LOCK:
+        row = get_gasto(gasto_id)
+        if not row or row["categoria"] != anterior:
+            return False
+        return update_gasto(gasto_id, categoria=categoria)
+
+# ---------- Rollups categoría × mes ----------
+# {"fuente": _fuente_key(), "celdas": {categoria: {"YYYY-MM": [centavos, n]}}}
+# Las altas, ediciones, borrados y reescrituras de este módulo lo ajustan en sitio y lo
+# persisten en gastos.rollup.json; si el CSV o la bitácora cambiaron por fuera, se
+# reconstruye la próxima vez que se pida.
+_ROLLUP: Dict[str, object] = {"fuente": None, "celdas": None, "cargado": False}
+_ROLLUP_VERSION = 2   # 2: el mes sale de fechas.mes_de_fecha (misma regla que los periodos)
+
+def _rollup_vigente() -> bool:
+    """¿El rollup en memoria refleja el CSV y la bitácora actuales? (llamar con _LOCK)"""
+    if not _ROLLUP["cargado"]:
+        _ROLLUP["cargado"] = True
         try:
-            return float(s)
-        except Exception:
-            return 0.0
+            with open(ROLLUP_JSON, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == _ROLLUP_VERSION:
+                _ROLLUP.update(fuente=data.get("fuente"), celdas=data.get("celdas"))
+        except (OSError, ValueError):
+            pass
+    return _ROLLUP["celdas"] is not None and _ROLLUP["fuente"] == _fuente_key()
+
+def _rollup_guardar() -> None:
+    _ROLLUP["fuente"] = _fuente_key()
+    tmp = ROLLUP_JSON.with_suffix(".json.tmp")
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": _ROLLUP_VERSION, "fuente": _ROLLUP["fuente"], "celdas": _ROLLUP["celdas"]},
+                      f, ensure_ascii=False)
+        os.replace(tmp, ROLLUP_JSON)
+    except OSError as e:
+        print(f"[ROLLUP] no se pudo guardar: {e}")
 
-    total = 0.0
-    por_cat: Dict[str, float] = {}
+def _rollup_sumar(rows, signo: int) -> None:
+    celdas = _ROLLUP["celdas"]
     for r in rows:
         cat = (r.get("categoria") or "Otros").strip() or "Otros"
-        monto = _to_float(r.get("monto", "0"))
-        total += monto
-        por_cat[cat] = por_cat.get(cat, 0.0) + monto
-    return total, por_cat
+        mes = mes_de_fecha(r.get("fecha") or "")
+        celda = celdas.setdefault(cat, {}).setdefault(mes, [0, 0])
+        celda[0] += signo * a_centavos(r.get("monto", "0"))
+        celda[1] += signo
+        if celda[1] <= 0:
+            del celdas[cat][mes]
+            if not celdas[cat]:
+                del celdas[cat]
+
+def _rollup_aplicar(vigente: bool, rows, signo: int) -> None:
+    """Ajusta el rollup tras una escritura propia; si no estaba al día se deja para reconstruir."""
+    if not vigente:
+        _ROLLUP["celdas"] = None
+        return
+    _rollup_sumar(rows, signo)
+    _rollup_guardar()
+
+def _rollup_reconstruir(rows) -> None:
+    _ROLLUP.update(celdas={}, cargado=True)
+    _rollup_sumar(rows, +1)
+    _rollup_guardar()
+
+def rollups() -> Dict[str, Dict[str, Tuple[float, int]]]:
+    """
+    {categoria: {"YYYY-MM": (suma, n)}} de todo el ledger, sin recorrer filas
+    mientras el rollup esté al día (si no, se reconstruye una vez).
+    """
+    with _LOCK:
+        if not _rollup_vigente():
+            _rollup_reconstruir(_ledger_rows())
+        return {cat: {mes: (c[0] / 100, c[1]) for mes, c in meses.items()}
+                for cat, meses in _ROLLUP["celdas"].items()}
+
+_MES_INICIO_RE = re.compile(r"^\d{4}-\d{2}(-01(T00:00(:00)?)?)?$")
+
+def _mes_de_limite(fecha: str | None) -> Optional[str]:
+    """'YYYY-MM' si `fecha` cae justo al inicio de un mes ('', None → sin límite); si no, None."""
+    if not fecha:
+        return ""
+    return fecha[:7] if _MES_INICIO_RE.match(fecha) else None
+
+# ---------- Lectura en streaming con filtros ----------
+ITER_LOTE = 2048   # filas por tramo: entre tramos se suelta el lock (y el mmap)
+
+def _leer_ops() -> Dict[str, Optional[dict]]:
+    """Estado final por id según gastos.log, sin tocar la caché del ledger."""
+    ops: Dict[str, Optional[dict]] = {}
+    try:
+        with open(GASTOS_LOG, "rb") as f:
+            for line in f:
+                try:
+                    op = json.loads(line)
+                except ValueError:
+                    continue
+                rid = op.get("id")
+                if not rid:
+                    continue
+                if op.get("op") == "del":
+                    ops[rid] = None
+                elif ops.get(rid, {}) is not None:
+                    campos = {k: v for k, v in (op.get("campos") or {}).items() if k in EDITABLES}
+                    ops.setdefault(rid, {}).update(campos)
+    except FileNotFoundError:
+        pass
+    return ops
+
+def _cumple(row: Dict[str, str], desde, hasta, categoria_prefix, min_monto) -> bool:
+    if desde or hasta:
+        # Misma regla que el índice de fechas, la máscara columnar y los rollups (hora de reloj)
+        e = fecha_a_epoch(row["fecha"])
+        if desde and e < limite_a_epoch(desde):
+            return False
+        if hasta and e >= limite_a_epoch(hasta):
+            return False
+    if categoria_prefix and not row["categoria"].startswith(categoria_prefix):
+        return False
+    if min_monto is not None and a_centavos(row["monto"]) < a_centavos(min_monto):
+        return False
+    return True
+
+def _escanear(mm, pos: int, ops, desde_e, hasta_e, pref_b, min_monto, filtro) -> Tuple[List[Dict[str, str]], int]:
+    """
+    Recorre líneas completas desde `pos` hasta juntar ITER_LOTE filas que pasen el filtro.
+    Antes de armar el dict descarta sin pasar por csv: fecha (2.º campo, con la misma regla que
+    _cumple contra los límites desde_e/hasta_e en epoch) y presencia del prefijo de categoría.
+    Las filas con cambios en la bitácora no se prefiltran.
+    """
+    out: List[Dict[str, str]] = []
+    end = len(mm)
+    while pos < end and len(out) < ITER_LOTE:
+        nl = mm.find(b"\n", pos)
+        if nl < 0:
+            nl = end - 1   # última fila sin salto de línea: la termina el fin del archivo (como _parse_from)
+        line = mm[pos:nl + 1]
+        # un campo entre comillas puede traer saltos de línea: completar hasta cerrar comillas
+        while line.count(b'"') % 2 and nl >= 0:
+            nl = mm.find(b"\n", nl + 1)
+            if nl >= 0:
+                line = mm[pos:nl + 1]
+        if nl < 0:
+            break
+        pos = nl + 1
+
+        if not line.startswith(b'"'):
+            c1 = line.find(b",")
+            rid = line[:c1].decode("utf-8", errors="replace") if c1 > 0 else ""
+            if rid not in ops:
+                c2 = line.find(b",", c1 + 1)
+                fecha_b = line[c1 + 1:c2] if c1 >= 0 and c2 > c1 else b""
+                if (desde_e is not None or hasta_e is not None) and not fecha_b.startswith(b'"'):
+                    e = fecha_a_epoch(fecha_b.decode("utf-8", errors="replace"))
+                    if (desde_e is not None and e < desde_e) or (hasta_e is not None and e >= hasta_e):
+                        continue
+                if pref_b and pref_b not in line:
+                    continue
+                if min_monto is not None:
+                    try:   # monto es el último campo y nunca va entre comillas
+                        if float(line.rsplit(b",", 1)[-1]) < min_monto:
+                            continue
+                    except ValueError:
+                        pass
+
+        campos = next(csv.reader([line.decode("utf-8", errors="replace")]), None)
+        row = _normalize_row(dict(zip(FIELDNAMES, campos or [])))
+        if not row:
+            continue
+        if row["id"] in ops:
+            if ops[row["id"]] is None:
+                continue
+            row.update(ops[row["id"]])
+        if filtro(row):
+            out.append(row)
+    return out, pos
+
+def iter_gastos(desde: str | None = None, hasta: str | None = None,
+                categoria_prefix: str | None = None, min_monto: float | None = None) -> Iterator[Dict[str, str]]:
+    """
+    Genera los gastos con desde <= fecha < hasta (ISO), categoría que empieza con
+    `categoria_prefix` y monto >= `min_monto` (None = sin filtro), en orden de captura.
+    Si la caché del ledger está al día se filtra ahí; si no, se escanea gastos.csv vía mmap
+    por tramos, sin cargar el historial completo en memoria. Si otro hilo reescribe el CSV
+    (compactar) entre tramos, el escaneo vuelve a empezar y omite los ids ya entregados.
+    """
+    filtro = lambda r: _cumple(r, desde, hasta, categoria_prefix, min_monto)  # noqa: E731
+    with _LOCK:
+        caliente = (_LEDGER["key"] is not None and GASTOS_CSV.exists()
+                    and _LEDGER["key"] == _stat_key(GASTOS_CSV.stat()))
+        en_memoria = caliente or _csv_is_empty(GASTOS_CSV)
+        if not en_memoria:
+            with open(GASTOS_CSV, "r", encoding="utf-8", newline="") as f:
+                en_memoria = "id" not in (next(csv.reader([f.readline()]), None) or [])
+        if en_memoria:
+            # Caché vigente (o archivo sin ids que hay que migrar): se filtra en memoria
+            rows = [dict(r) for r in _ledger_rows() if filtro(r)]
+        else:
+            rows = None
+            ops = _leer_ops()
+            generacion = _LEDGER["reescrituras"]
+    if rows is not None:
+        yield from rows
+        return
+
+    desde_e = limite_a_epoch(desde) if desde else None
+    hasta_e = limite_a_epoch(hasta) if hasta else None
+    pref_b = categoria_prefix.encode("utf-8") if categoria_prefix else b""
+    pos = None
+    entregados: set = set()
+    while True:
+        with _LOCK:
+            if _LEDGER["reescrituras"] != generacion:
+                # El CSV cambió bajo los pies: las posiciones ya no valen, se relee desde el inicio
+                ops = _leer_ops()
+                generacion = _LEDGER["reescrituras"]
+                pos = None
+            if not GASTOS_CSV.exists():
+                return
+            with open(GASTOS_CSV, "rb") as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    return
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    if pos is None:
+                        pos = mm.find(b"\n") + 1   # saltar encabezado
+                        if pos == 0:
+                            return
+                    lote, pos = _escanear(mm, pos, ops, desde_e, hasta_e, pref_b, min_monto, filtro)
+                    fin = pos >= len(mm) or mm.find(b"\n", pos) < 0
+        for row in lote:
+            if row["id"] not in entregados:
+                entregados.add(row["id"])
+                yield row
+        if fin:
+            return
+
+def totals(rows: List[Dict[str, str]]) -> Tuple[float, Dict[str, float]]:
+    """
+    Calcula total general y totales por categoría (texto completo).
+    Acepta también un LedgerColumnar (abrir_columnar()): suma directo sobre las columnas.
+    """
+    if hasattr(rows, "totales_por_categoria"):
+        return rows.totales_por_categoria()
+    from . import analytics
+    return analytics.totales_por_categoria(analytics.desde_filas(rows))
+
+
+def totales_por_categoria(desde: str | None = None, hasta: str | None = None) -> Tuple[float, Dict[str, float]]:
+    """
+    totals() sobre los gastos con desde <= fecha < hasta (fechas ISO; None = sin límite).
+    El backend SQLite lo resuelve con SUM(monto) GROUP BY categoria. Aquí, si el rango cae en
+    límites de mes (o no hay rango) sale de rollups(): O(categorías × meses), no O(filas);
+    si no, de un snapshot columnar vigente o de las k filas del índice de fechas.
+    """
+    m_desde, m_hasta = _mes_de_limite(desde), _mes_de_limite(hasta)
+    if m_desde is not None and m_hasta is not None:
+        total, por_cat = 0.0, {}
+        for cat, meses in rollups().items():
+            sel = [v for mes, (v, _) in meses.items()
+                   if (not m_desde or mes >= m_desde) and (not m_hasta or mes < m_hasta)]
+            if sel:
+                por_cat[cat] = sum(sel)
+                total += por_cat[cat]
+        return total, por_cat
+    col = abrir_columnar()
+    if col is not None:
+        return col.totales_por_categoria(desde, hasta)
+    with _LOCK:
+        return totals(_rango(desde, hasta))
+
+
+# Archivos del ledger en cualquier backend (CSV + bitácora, SQLite + WAL, manifiesto de particiones)
+_ARCHIVOS_LEDGER = ("gastos.csv", "gastos.log", "gastos.db", "gastos.db-wal", "gastos/manifest.json")
+
+def version_ledger() -> tuple:
+    """(mtime, tamaño) de los archivos del ledger: cambia con cada escritura, de este proceso o de otro."""
+    return version_archivos(_ARCHIVOS_LEDGER)
+
+
+# ---------- Ledger columnar (data/gastos.col/) ----------
+def _fuente_key() -> list:
+    """Versión de gastos.csv + gastos.log que refleja un snapshot columnar."""
+    claves = []
+    for p in (GASTOS_CSV, GASTOS_LOG):
+        try:
+            claves.append(list(_stat_key(p.stat())))
+        except OSError:
+            claves.append(None)
+    return claves
+
+def exportar_columnar(carpeta=COLUMNAR_DIR) -> int:
+    """Escribe los gastos vigentes en formato columnar. Devuelve filas escritas."""
+    from . import columnar
+    with _LOCK:
+        rows = load_gastos()
+        fuente = _fuente_key() if BACKEND == "csv" else None
+        return columnar.escribir(rows, carpeta, fuente)
+
+def importar_columnar(carpeta=COLUMNAR_DIR) -> int:
+    """Reemplaza el ledger con el contenido de un snapshot columnar. Devuelve filas importadas."""
+    from . import columnar
+    col = columnar.abrir(carpeta)
+    if col is None:
+        raise FileNotFoundError(f"No hay ledger columnar en {carpeta}")
+    if not col.fechas_originales and (col.fecha == FECHA_NULA).any():
+        # Un snapshot v1 solo guarda el epoch: esas fechas volverían vacías
+        raise ValueError(f"El ledger columnar de {carpeta} tiene fechas que no se pueden recuperar; "
+                         "vuelve a exportarlo con storage.exportar_columnar()")
+    rows = list(col.filas())
+    save_all_gastos(rows)
+    return len(rows)
+
+def abrir_columnar(carpeta=COLUMNAR_DIR, vigente: bool = True):
+    """
+    LedgerColumnar (np.memmap, sin copias) o None si no existe.
+    Con vigente=True solo se devuelve si refleja exactamente el CSV y la bitácora actuales.
+    """
+    if not (carpeta / "meta.json").exists():
+        return None
+    from . import columnar
+    col = columnar.abrir(carpeta)
+    if col is not None and vigente and (BACKEND != "csv" or col.meta.get("fuente") != _fuente_key()
+                                        or col.meta.get("version") != columnar.VERSION):
+        return None
+    return col
+
+
+# ---------- Backend ----------
+if BACKEND == "sqlite":
+    from .storage_sqlite import (  # noqa: F811  (reemplaza la implementación CSV)
+        append_gasto, append_gastos, load_gastos, iter_gastos, get_gasto, clear_gastos, save_all_gastos,
+        update_gasto, delete_gasto, actualizar_categoria, compactar, totales_por_categoria,
+        importar_csv, exportar_csv,
+    )
+elif BACKEND == "particionado":
+    from .storage_particionado import (  # noqa: F811
+        append_gasto, append_gastos, load_gastos, iter_gastos, get_gasto, clear_gastos, save_all_gastos,
+        update_gasto, delete_gasto, actualizar_categoria, compactar, totales_por_categoria,
+        importar_csv, exportar_csv,
+    )
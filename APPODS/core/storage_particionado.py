@@ -0,0 +1,348 @@
+# core/storage_particionado.py — ledger partido por mes (data/gastos/YYYY-MM.csv + manifest.json)
+from __future__ import annotations
+import csv, json, os, re, threading
+from typing import Iterator, List, Dict, Optional, Tuple
+from .storage import (DATA_DIR, GASTOS_CSV, FIELDNAMES, EDITABLES,
+                      new_id, _fmt_monto, _fila_nueva, _normalize_row, _stat_key, _cumple, _leer_ops, _csv_reemplazado, totals)
+
+PARTS_DIR = DATA_DIR / "gastos"
+MANIFEST_JSON = PARTS_DIR / "manifest.json"
+SIN_FECHA = "0000-00"   # partición para filas cuya fecha no empieza con YYYY-MM
+
+_MES_RE = re.compile(r"^\d{4}-\d{2}")
+
+# El manifest describe cada partición sin abrirla:
+#   {"version": 1, "particiones": {"2025-10": {"n", "total", "por_cat", "min", "max", "key"}}}
+# "key" = (tamaño, mtime_ns) del CSV de la partición; si no coincide, la entrada se recalcula.
+_LOCK = threading.RLock()
+_ESTADO: Dict[str, object] = {"manifest": None, "ids": None}
+
+
+def mes_de(fecha: str) -> str:
+    m = _MES_RE.match(fecha or "")
+    return m.group(0) if m else SIN_FECHA
+
+
+def _ruta(mes: str):
+    return PARTS_DIR / f"{mes}.csv"
+
+
+# ---------- Manifest ----------
+def _resumen(rows: List[Dict[str, str]], key) -> dict:
+    total, por_cat = totals(rows)
+    fechas = [r["fecha"] for r in rows if r["fecha"]]
+    return {"n": len(rows), "total": total, "por_cat": por_cat,
+            "min": min(fechas) if fechas else "", "max": max(fechas) if fechas else "",
+            "key": list(key) if key else None}
+
+
+def _leer_particion(mes: str) -> List[Dict[str, str]]:
+    try:
+        with open(_ruta(mes), "r", encoding="utf-8", newline="") as f:
+            return [r for r in (_normalize_row(x) for x in csv.DictReader(f)) if r]
+    except FileNotFoundError:
+        return []
+
+
+def _key(mes: str):
+    try:
+        return _stat_key(_ruta(mes).stat())
+    except OSError:
+        return None
+
+
+def _guardar_manifest() -> None:
+    tmp = MANIFEST_JSON.with_suffix(".json.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(_ESTADO["manifest"], f, ensure_ascii=False)
+    os.replace(tmp, MANIFEST_JSON)
+
+
+def _manifest() -> Dict[str, dict]:
+    """Particiones vigentes; migra gastos.csv la primera vez y recalcula entradas obsoletas."""
+    with _LOCK:
+        if _ESTADO["manifest"] is None:
+            nuevo = not PARTS_DIR.exists()
+            PARTS_DIR.mkdir(parents=True, exist_ok=True)
+            try:
+                with open(MANIFEST_JSON, "r", encoding="utf-8") as f:
+                    _ESTADO["manifest"] = json.load(f)
+            except (OSError, ValueError):
+                _ESTADO["manifest"] = {"version": 1, "particiones": {}}
+            if nuevo and GASTOS_CSV.exists():
+                n = importar_csv(GASTOS_CSV)
+                print(f"[PARTICIONES] data/gastos/ creada desde gastos.csv ({n} filas)")
+
+        partes = _ESTADO["manifest"]["particiones"]
+        en_disco = {p.stem for p in PARTS_DIR.glob("*.csv")}
+        cambio = False
+        for mes in set(partes) - en_disco:
+            del partes[mes]
+            cambio = True
+        for mes in en_disco:
+            key = _key(mes)
+            if mes not in partes or partes[mes].get("key") != list(key or ()):
+                partes[mes] = _resumen(_leer_particion(mes), key)
+                cambio = True
+        if cambio:
+            _ESTADO["ids"] = None
+            _guardar_manifest()
+        return partes
+
+
+def _meses(desde: str | None = None, hasta: str | None = None) -> List[str]:
+    """Particiones que pueden tener filas con desde <= fecha < hasta (poda por min/max)."""
+    out = []
+    for mes, p in sorted(_manifest().items()):
+        if p["n"] == 0:
+            continue
+        if desde and p["max"] and p["max"] < desde:
+            continue
+        if hasta and p["min"] and p["min"] >= hasta:
+            continue
+        out.append(mes)
+    return out
+
+
+def _indice_ids() -> Dict[str, str]:
+    """id → mes. Se arma una vez por proceso (lee solo lo necesario) y se mantiene en las escrituras."""
+    with _LOCK:
+        _manifest()
+        if _ESTADO["ids"] is None:
+            ids: Dict[str, str] = {}
+            for mes in _meses():
+                for r in _leer_particion(mes):
+                    ids[r["id"]] = mes
+            _ESTADO["ids"] = ids
+        return _ESTADO["ids"]
+
+
+# ---------- Escritura ----------
+def _append_particion(mes: str, rows: List[Dict[str, str]]) -> None:
+    with open(_ruta(mes), "a", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDNAMES)
+        if f.tell() == 0:
+            writer.writeheader()
+        writer.writerows(rows)
+    partes = _ESTADO["manifest"]["particiones"]
+    p = partes.get(mes) or _resumen([], None)
+    total, por_cat = totals(rows)
+    for cat, v in por_cat.items():
+        p["por_cat"][cat] = p["por_cat"].get(cat, 0.0) + v
+    fechas = [r["fecha"] for r in rows if r["fecha"]] + [x for x in (p["min"], p["max"]) if x]
+    p.update(n=p["n"] + len(rows), total=p["total"] + total,
+             min=min(fechas) if fechas else "", max=max(fechas) if fechas else "",
+             key=list(_key(mes)))
+    partes[mes] = p
+
+
+def _reescribir_particion(mes: str, rows: List[Dict[str, str]]) -> None:
+    ruta = _ruta(mes)
+    if not rows:
+        ruta.unlink(missing_ok=True)
+        _ESTADO["manifest"]["particiones"].pop(mes, None)
+        return
+    tmp = ruta.with_suffix(".csv.tmp")
+    with open(tmp, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDNAMES)
+        writer.writeheader()
+        writer.writerows(rows)
+    os.replace(tmp, ruta)
+    _ESTADO["manifest"]["particiones"][mes] = _resumen(rows, _key(mes))
+
+
+def _agregar(rows: List[Dict[str, str]]) -> None:
+    por_mes: Dict[str, List[Dict[str, str]]] = {}
+    for r in rows:
+        por_mes.setdefault(mes_de(r["fecha"]), []).append(r)
+    with _LOCK:
+        _manifest()
+        ids = _ESTADO["ids"]   # si aún no se armó, no hace falta para agregar
+        for mes, filas in por_mes.items():
+            _append_particion(mes, filas)
+            if ids is not None:
+                for r in filas:
+                    ids[r["id"]] = mes
+        _guardar_manifest()
+
+
+# ---------- API (misma que core.storage) ----------
+def append_gastos(rows: List[Dict[str, object]]) -> List[str]:
+    nuevas = [_fila_nueva(r.get("descripcion") or "", r.get("categoria") or "",
+                          r.get("monto"), r.get("fecha")) for r in rows]
+    if nuevas:
+        _agregar(nuevas)
+    return [r["id"] for r in nuevas]
+
+
+def append_gasto(descripcion: str, categoria: str, monto: float, fecha: str | None = None) -> str:
+    row = _fila_nueva(descripcion, categoria, monto, fecha)
+    _agregar([row])
+    return row["id"]
+
+
+def iter_gastos(desde: str | None = None, hasta: str | None = None,
+                categoria_prefix: str | None = None, min_monto: float | None = None) -> Iterator[Dict[str, str]]:
+    """Solo se abren las particiones cuyo rango [min, max] cruza [desde, hasta)."""
+    with _LOCK:
+        meses = _meses(desde, hasta)
+    for mes in meses:
+        with _LOCK:
+            rows = _leer_particion(mes)
+        for r in rows:
+            if _cumple(r, desde, hasta, categoria_prefix, min_monto):
+                yield r
+
+
+def load_gastos(desde: str | None = None, hasta: str | None = None) -> List[Dict[str, str]]:
+    return list(iter_gastos(desde, hasta))
+
+
+def get_gasto(gasto_id: str) -> Optional[Dict[str, str]]:
+    with _LOCK:
+        mes = _indice_ids().get(gasto_id)
+        if mes is None:
+            return None
+        return next((r for r in _leer_particion(mes) if r["id"] == gasto_id), None)
+
+
+def clear_gastos(write_header: bool = True) -> None:
+    with _LOCK:
+        _manifest()
+        for p in PARTS_DIR.glob("*.csv"):
+            p.unlink()
+        _ESTADO["manifest"] = {"version": 1, "particiones": {}}
+        _ESTADO["ids"] = {}
+        _guardar_manifest()
+
+
+def save_all_gastos(rows: list[dict]) -> None:
+    out = [{
+        "id": (r.get("id") or "").strip() or new_id(),
+        "fecha": (r.get("fecha") or "").strip(),
+        "descripcion": (r.get("descripcion") or "").strip(),
+        "categoria": (r.get("categoria") or "").strip(),
+        "monto": _fmt_monto(r.get("monto", 0)),
+    } for r in rows]
+    por_mes: Dict[str, List[Dict[str, str]]] = {}
+    for r in out:
+        por_mes.setdefault(mes_de(r["fecha"]), []).append(r)
+    with _LOCK:
+        _manifest()
+        for p in PARTS_DIR.glob("*.csv"):
+            if p.stem not in por_mes:
+                p.unlink()
+        _ESTADO["manifest"]["particiones"] = {}
+        for mes, filas in por_mes.items():
+            _reescribir_particion(mes, filas)
+        _ESTADO["ids"] = {r["id"]: mes_de(r["fecha"]) for r in out}
+        _guardar_manifest()
+
+
+def update_gasto(gasto_id: str, **fields) -> bool:
+    """Reescribe solo la partición del gasto (y la de destino si cambia de mes)."""
+    campos = {k: str(v).strip() for k, v in fields.items() if k in EDITABLES}
+    if "monto" in campos:
+        campos["monto"] = _fmt_monto(campos["monto"])
+    with _LOCK:
+        ids = _indice_ids()
+        mes = ids.get(gasto_id)
+        if mes is None:
+            return False
+        if not campos:
+            return True
+        rows = _leer_particion(mes)
+        fila = next((r for r in rows if r["id"] == gasto_id), None)
+        if fila is None:
+            return False
+        fila.update(campos)
+        destino = mes_de(fila["fecha"])
+        if destino == mes:
+            _reescribir_particion(mes, rows)
+        else:
+            _reescribir_particion(mes, [r for r in rows if r["id"] != gasto_id])
+            _append_particion(destino, [fila])
+            ids[gasto_id] = destino
+        _guardar_manifest()
+    return True
+
+
+def delete_gasto(gasto_id: str) -> bool:
+    with _LOCK:
+        ids = _indice_ids()
+        mes = ids.pop(gasto_id, None)
+        if mes is None:
+            return False
+        _reescribir_particion(mes, [r for r in _leer_particion(mes) if r["id"] != gasto_id])
+        _guardar_manifest()
+    return True
+
+
+def actualizar_categoria(gasto_id: str, categoria: str, anterior: str) -> bool:
+    with _LOCK:
+        row = get_gasto(gasto_id)
+        if not row or row["categoria"] != anterior:
+            return False
+        return update_gasto(gasto_id, categoria=categoria)
+
+
+def compactar() -> None:
+    """Las particiones se reescriben en cada edición: solo se revalida el manifest."""
+    with _LOCK:
+        _ESTADO["manifest"] = None
+        _manifest()
+
+
+def totales_por_categoria(desde: str | None = None, hasta: str | None = None) -> Tuple[float, Dict[str, float]]:
+    """
+    Particiones completas dentro de [desde, hasta) salen del manifest sin abrir filas;
+    solo las de los bordes del rango se leen.
+    """
+    total, por_cat = 0.0, {}
+    with _LOCK:
+        partes = _manifest()
+        meses = _meses(desde, hasta)
+    for mes in meses:
+        p = partes[mes]
+        completa = (not desde or (p["min"] and p["min"] >= desde)) and (not hasta or (p["max"] and p["max"] < hasta))
+        if completa:
+            t, cats = p["total"], p["por_cat"]
+        else:
+            t, cats = totals(r for r in _leer_particion(mes) if _cumple(r, desde, hasta, None, None))
+        total += t
+        for cat, v in cats.items():
+            por_cat[cat] = por_cat.get(cat, 0.0) + v
+    return total, por_cat
+
+
+# ---------- Importar / exportar en el formato de gastos.csv ----------
+def importar_csv(path=GASTOS_CSV, reemplazar: bool = True) -> int:
+    """Reparte un CSV con el formato de gastos.csv en particiones. Devuelve filas importadas."""
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        rows = [r for r in (_normalize_row(x) for x in csv.DictReader(f)) if r]
+    if path == GASTOS_CSV:
+        # ediciones pendientes del backend CSV (data/gastos.log)
+        ops = _leer_ops()
+        rows = [{**r, **(ops.get(r["id"]) or {})} for r in rows if not (r["id"] in ops and ops[r["id"]] is None)]
+    if reemplazar:
+        save_all_gastos(rows)
+    else:
+        with _LOCK:
+            _manifest()
+        _agregar([{**r, "id": r["id"] or new_id()} for r in rows])
+    return len(rows)
+
+
+def exportar_csv(path=GASTOS_CSV) -> int:
+    """Escribe todas las particiones, en orden de mes, en el formato de gastos.csv."""
+    rows = load_gastos()
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDNAMES)
+        writer.writeheader()
+        writer.writerows(rows)
+    tmp.replace(path)
+    if path == GASTOS_CSV:
+        # Las particiones ya incluyen gastos.log (importar_csv la aplicó): volver a csv no la repite
+        _csv_reemplazado()
+    return len(rows)
@@ -0,0 +1,269 @@
+# core/storage_sqlite.py — backend SQLite del ledger (data/gastos.db), mismas funciones que core.storage
+from __future__ import annotations
+import csv, sqlite3, threading
+from datetime import datetime
+from typing import Iterator, List, Dict, Optional, Tuple
+from .storage import (DATA_DIR, GASTOS_CSV, FIELDNAMES, EDITABLES,
+                      new_id, _normalize_row, _leer_ops, _csv_reemplazado, totals)
+from .money import a_centavos, formatear
+from .categories import intern
+
+GASTOS_DB = DATA_DIR / "gastos.db"
+
+# PRAGMA user_version: 0 = base sin versión (la primera tenía `monto REAL`), 1 = monto_cents
+_VERSION = 1
+
+_TABLA = """
+CREATE TABLE {nombre} (
+    seq         INTEGER PRIMARY KEY AUTOINCREMENT,   -- orden de captura
+    id          TEXT NOT NULL UNIQUE,
+    fecha       TEXT NOT NULL DEFAULT '',
+    descripcion TEXT NOT NULL DEFAULT '',
+    categoria   TEXT NOT NULL DEFAULT '',
+    monto_cents INTEGER NOT NULL DEFAULT 0               -- centavos: sumas exactas
+)"""
+
+_SCHEMA = _TABLA.format(nombre="IF NOT EXISTS gastos") + """;
+CREATE INDEX IF NOT EXISTS idx_gastos_fecha     ON gastos(fecha);
+CREATE INDEX IF NOT EXISTS idx_gastos_categoria ON gastos(categoria);
+"""
+
+# Una conexión por proceso; la UI y los hilos de clasificación la comparten con el lock
+_LOCK = threading.RLock()
+_DB: Dict[str, Optional[sqlite3.Connection]] = {"conn": None}
+
+
+def _conn() -> sqlite3.Connection:
+    with _LOCK:
+        if _DB["conn"] is None:
+            DATA_DIR.mkdir(parents=True, exist_ok=True)
+            nueva = not GASTOS_DB.exists()
+            conn = sqlite3.connect(str(GASTOS_DB), check_same_thread=False, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            _migrar(conn)
+            conn.executescript(_SCHEMA)
+            _DB["conn"] = conn
+            if nueva and GASTOS_CSV.exists():
+                n = importar_csv(GASTOS_CSV)
+                print(f"[SQLITE] gastos.db creada desde gastos.csv ({n} filas)")
+        return _DB["conn"]
+
+
+def _migrar(conn: sqlite3.Connection) -> None:
+    """
+    Lleva una gastos.db anterior al esquema actual. v0 → v1: `monto REAL` pasa a
+    `monto_cents INTEGER` copiando la tabla (SQLite no cambia el tipo de una columna en sitio);
+    seq e id se conservan, los índices los vuelve a crear _SCHEMA.
+    """
+    if conn.execute("PRAGMA user_version").fetchone()[0] >= _VERSION:
+        return
+    columnas = {r[1] for r in conn.execute("PRAGMA table_info(gastos)")}
+    with conn:
+        conn.execute("BEGIN")
+        if columnas and "monto_cents" not in columnas:
+            conn.execute(_TABLA.format(nombre="gastos_v1"))
+            conn.execute(
+                "INSERT INTO gastos_v1(seq, id, fecha, descripcion, categoria, monto_cents) "
+                "SELECT seq, id, fecha, descripcion, categoria, CAST(ROUND(COALESCE(monto, 0) * 100) AS INTEGER) "
+                "FROM gastos")
+            conn.execute("DROP TABLE gastos")
+            conn.execute("ALTER TABLE gastos_v1 RENAME TO gastos")
+            print("[SQLITE] gastos.db migrada: monto → monto_cents")
+        conn.execute(f"PRAGMA user_version = {_VERSION}")
+
+
+def _row_out(r: sqlite3.Row) -> Dict[str, str]:
+    return {
+        "id": r["id"],
+        "fecha": r["fecha"],
+        "descripcion": r["descripcion"],
+        "categoria": intern(r["categoria"]),
+        "monto": formatear(r["monto_cents"]),
+    }
+
+
+def _to_db(r: Dict[str, str]) -> Tuple[str, str, str, str, int]:
+    return ((r.get("id") or "").strip() or new_id(),
+            (r.get("fecha") or "").strip(),
+            (r.get("descripcion") or "").strip(),
+            (r.get("categoria") or "").strip(),
+            a_centavos(r.get("monto")))
+
+
+def _insert_many(conn: sqlite3.Connection, rows) -> int:
+    cur = conn.executemany(
+        "INSERT OR REPLACE INTO gastos(id, fecha, descripcion, categoria, monto_cents) VALUES (?,?,?,?,?)",
+        (_to_db(r) for r in rows))
+    return cur.rowcount
+
+
+# ---------- API (misma que core.storage) ----------
+def append_gasto(descripcion: str, categoria: str, monto: float, fecha: str | None = None) -> str:
+    row = {
+        "id": new_id(),
+        "fecha": fecha or datetime.now().isoformat(timespec="seconds"),
+        "descripcion": descripcion,
+        "categoria": categoria,
+        "monto": monto,
+    }
+    with _LOCK:
+        _insert_many(_conn(), [row])
+    return row["id"]
+
+
+def append_gastos(rows: List[Dict[str, object]]) -> List[str]:
+    """Todas las filas en una sola transacción (executemany). Devuelve los ids asignados."""
+    nuevas = [{**r, "id": new_id(),
+               "fecha": r.get("fecha") or datetime.now().isoformat(timespec="seconds")} for r in rows]
+    with _LOCK:
+        conn = _conn()
+        with conn:
+            conn.execute("BEGIN")
+            _insert_many(conn, nuevas)
+    return [r["id"] for r in nuevas]
+
+
+def load_gastos(desde: str | None = None, hasta: str | None = None) -> List[Dict[str, str]]:
+    if desde or hasta:
+        return list(iter_gastos(desde, hasta))
+    with _LOCK:
+        cur = _conn().execute("SELECT id, fecha, descripcion, categoria, monto_cents FROM gastos ORDER BY seq")
+        return [_row_out(r) for r in cur]
+
+
+def get_gasto(gasto_id: str) -> Optional[Dict[str, str]]:
+    with _LOCK:
+        r = _conn().execute("SELECT id, fecha, descripcion, categoria, monto_cents FROM gastos WHERE id = ?",
+                            (gasto_id,)).fetchone()
+    return _row_out(r) if r else None
+
+
+def clear_gastos(write_header: bool = True) -> None:
+    with _LOCK:
+        _conn().execute("DELETE FROM gastos")
+
+
+def save_all_gastos(rows: list[dict]) -> None:
+    with _LOCK:
+        conn = _conn()
+        with conn:
+            conn.execute("BEGIN")
+            conn.execute("DELETE FROM gastos")
+            _insert_many(conn, rows)
+
+
+def update_gasto(gasto_id: str, **fields) -> bool:
+    campos = {k: v for k, v in fields.items() if k in EDITABLES}
+    if "monto" in campos:
+        campos["monto_cents"] = a_centavos(campos.pop("monto"))
+    with _LOCK:
+        conn = _conn()
+        if not campos:
+            return conn.execute("SELECT 1 FROM gastos WHERE id = ?", (gasto_id,)).fetchone() is not None
+        sets = ", ".join(f"{k} = ?" for k in campos)   # llaves ya filtradas contra EDITABLES
+        cur = conn.execute(f"UPDATE gastos SET {sets} WHERE id = ?", (*campos.values(), gasto_id))
+        return cur.rowcount > 0
+
+
+def delete_gasto(gasto_id: str) -> bool:
+    with _LOCK:
+        return _conn().execute("DELETE FROM gastos WHERE id = ?", (gasto_id,)).rowcount > 0
+
+
+def actualizar_categoria(gasto_id: str, categoria: str, anterior: str) -> bool:
+    with _LOCK:
+        cur = _conn().execute("UPDATE gastos SET categoria = ? WHERE id = ? AND categoria = ?",
+                              (categoria, gasto_id, anterior))
+        return cur.rowcount > 0
+
+
+def compactar() -> None:
+    """Equivalente a la compactación del CSV: reintegra el WAL y libera espacio."""
+    with _LOCK:
+        conn = _conn()
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        conn.execute("VACUUM")
+
+
+def iter_gastos(desde: str | None = None, hasta: str | None = None,
+                categoria_prefix: str | None = None, min_monto: float | None = None) -> Iterator[Dict[str, str]]:
+    """Igual que core.storage.iter_gastos: los filtros van en el WHERE (fecha usa su índice)."""
+    where, params = [], []
+    if desde:
+        where.append("fecha >= ?")
+        params.append(desde)
+    if hasta:
+        where.append("fecha < ?")
+        params.append(hasta)
+    if categoria_prefix:
+        where.append("substr(categoria, 1, length(?)) = ?")
+        params += [categoria_prefix, categoria_prefix]
+    if min_monto is not None:
+        where.append("monto_cents >= ?")
+        params.append(a_centavos(min_monto))
+    sql = ("SELECT id, fecha, descripcion, categoria, monto_cents FROM gastos"
+           + (" WHERE " + " AND ".join(where) if where else "") + " ORDER BY seq")
+    with _LOCK:
+        cur = _conn().cursor()
+        cur.execute(sql, params)
+        lote = cur.fetchmany(2048)
+    while lote:
+        for r in lote:
+            yield _row_out(r)
+        with _LOCK:
+            lote = cur.fetchmany(2048)
+
+
+def totales_por_categoria(desde: str | None = None, hasta: str | None = None) -> Tuple[float, Dict[str, float]]:
+    """
+    Igual que totals(load_gastos()) pero agregado dentro de SQLite (SUM ... GROUP BY categoria):
+    no se materializa ninguna fila en Python. `desde`/`hasta` son fechas ISO (hasta exclusivo).
+    """
+    where, params = [], []
+    if desde:
+        where.append("fecha >= ?")
+        params.append(desde)
+    if hasta:
+        where.append("fecha < ?")
+        params.append(hasta)
+    sql = ("SELECT COALESCE(NULLIF(TRIM(categoria), ''), 'Otros') AS cat, SUM(monto_cents) FROM gastos"
+           + (" WHERE " + " AND ".join(where) if where else "") + " GROUP BY cat")
+    with _LOCK:
+        sumas = {cat: int(s or 0) for cat, s in _conn().execute(sql, params)}
+    return sum(sumas.values()) / 100, {cat: s / 100 for cat, s in sumas.items()}
+
+
+# ---------- Importar / exportar en el formato de gastos.csv ----------
+def importar_csv(path=GASTOS_CSV, reemplazar: bool = True) -> int:
+    """Carga un CSV con el formato de gastos.csv (con o sin columna id). Devuelve filas importadas."""
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        rows = [r for r in (_normalize_row(x) for x in csv.DictReader(f)) if r]
+    if path == GASTOS_CSV:
+        # ediciones pendientes del backend CSV (data/gastos.log)
+        ops = _leer_ops()
+        rows = [{**r, **(ops.get(r["id"]) or {})} for r in rows if not (r["id"] in ops and ops[r["id"]] is None)]
+    with _LOCK:
+        conn = _conn()
+        with conn:
+            conn.execute("BEGIN")
+            if reemplazar:
+                conn.execute("DELETE FROM gastos")
+            _insert_many(conn, rows)
+    return len(rows)
+
+
+def exportar_csv(path=GASTOS_CSV) -> int:
+    """Escribe la tabla completa en el formato de gastos.csv. Devuelve filas exportadas."""
+    rows = load_gastos()
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDNAMES)
+        writer.writeheader()
+        writer.writerows(rows)
+    tmp.replace(path)
+    if path == GASTOS_CSV:
+        # La tabla ya incluye gastos.log (importar_csv la aplicó): volver a ZAVE_STORAGE=csv no la repite
+        _csv_reemplazado()
+    return len(rows)
@@ -0,0 +1,131 @@
+# core/warmup.py — precalentamiento en hilos de fondo: importaciones, perfil, ledger y categorías en caché
+from __future__ import annotations
+import importlib, os, threading, time
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+
+class Tarea(NamedTuple):
+    nombre: str               # lo que muestra el splash mientras corre
+    peso: float               # parte de la barra que avanza al terminar
+    fn: Callable[[], object]
+
+
+# Estado de la corrida en curso (lo lee el hilo de la UI con progreso())
+_ESTADO: Dict[str, object] = {
+    "total": 0.0, "hecho": 0.0, "pendientes": 0, "actual": "", "errores": {}, "inicio": 0.0, "fin": None,
+}
+_LOCK = threading.Lock()
+
+
+def importar(*modulos: str) -> Callable[[], None]:
+    """Tarea que importa `modulos` (las pantallas y lo que arrastran: matplotlib, SDKs, importador)."""
+    def _fn():
+        for m in modulos:
+            importlib.import_module(m)
+    return _fn
+
+
+def _ledger():
+    from . import storage
+    storage.load_gastos()            # CSV + bitácora → caché en memoria (índice por id y por fecha)
+    storage.totales_por_categoria()  # rollups categoría × mes
+
+
+def _categorias():
+    from . import categories, keymap
+    categories.categorias()
+    keymap._ensure_matcher()         # regex del keymap compilada
+
+
+def _perfil():
+    from .profile import load_profile
+    load_profile()
+
+
+def _ia():
+    # Solo dispara las conexiones (hilos daemon propios): la red no detiene el splash
+    from .orchestrator import precalentar_en_segundo_plano
+    precalentar_en_segundo_plano()
+
+
+def tareas_core() -> List[Tarea]:
+    """Lo que cualquier pantalla usa: categorías, perfil y ledger (+ IA si ZAVE_PRECALENTAR_IA no es 0)."""
+    tareas = [
+        Tarea("Categorías", 1.0, _categorias),
+        Tarea("Perfil", 0.5, _perfil),
+        Tarea("Gastos", 3.0, _ledger),
+    ]
+    if os.getenv("ZAVE_PRECALENTAR_IA", "1") != "0":
+        tareas.append(Tarea("Conexiones IA", 0.1, _ia))
+    return tareas
+
+
+def _correr(t: Tarea) -> None:
+    with _LOCK:
+        _ESTADO["actual"] = t.nombre
+    t0 = time.perf_counter()
+    try:
+        t.fn()
+    except Exception as e:
+        # Un paso fallido no detiene el arranque: la pantalla lo hará en frío al abrirse
+        with _LOCK:
+            _ESTADO["errores"][t.nombre] = e
+        print(f"[WARMUP] {t.nombre} falló: {e}")
+    with _LOCK:
+        _ESTADO["hecho"] += t.peso
+        _ESTADO["pendientes"] -= 1
+        if _ESTADO["pendientes"] == 0:
+            _ESTADO["fin"] = time.perf_counter()
+    print(f"[WARMUP] {t.nombre}: {(time.perf_counter() - t0) * 1000:.0f} ms")
+
+
+def iniciar(tareas: List[Tarea], hilos: int = 3) -> None:
+    """Lanza las tareas en `hilos` hilos daemon y regresa de inmediato (no bloquean el cierre de la app)."""
+    with _LOCK:
+        _ESTADO.update(total=sum(t.peso for t in tareas), hecho=0.0, pendientes=len(tareas),
+                       actual="", errores={}, inicio=time.perf_counter(),
+                       fin=None if tareas else time.perf_counter())
+    if not tareas:
+        return
+    # Las más pesadas primero: el tiempo total lo marca la más lenta
+    cola = iter(sorted(tareas, key=lambda t: t.peso, reverse=True))
+
+    def _trabajador():
+        while True:
+            with _LOCK:
+                t = next(cola, None)
+            if t is None:
+                return
+            _correr(t)
+
+    for i in range(min(max(1, hilos), len(tareas))):
+        threading.Thread(target=_trabajador, name=f"zave-warmup-{i}", daemon=True).start()
+
+
+def progreso() -> float:
+    """Fracción completada (0..1) según el peso de las tareas ya terminadas."""
+    with _LOCK:
+        total = _ESTADO["total"]
+        return 1.0 if not total else min(1.0, _ESTADO["hecho"] / total)
+
+
+def terminado() -> bool:
+    with _LOCK:
+        return _ESTADO["fin"] is not None
+
+
+def actual() -> str:
+    with _LOCK:
+        return _ESTADO["actual"]
+
+
+def errores() -> Dict[str, Exception]:
+    with _LOCK:
+        return dict(_ESTADO["errores"])
+
+
+def duracion() -> Optional[float]:
+    """Segundos que tardó la corrida completa (None si sigue en curso)."""
+    with _LOCK:
+        fin = _ESTADO["fin"]
+        return None if fin is None else fin - _ESTADO["inicio"]
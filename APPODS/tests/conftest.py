@@ -0,0 +1,25 @@
+# tests/conftest.py — los módulos de core fijan DATA_DIR al importarse: ZAVE_DATA_DIR va antes que todo
+import os, shutil, sys, tempfile
+from pathlib import Path
+
+import pytest
+
+APPODS_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(APPODS_DIR))
+
+DATA = Path(tempfile.mkdtemp(prefix="zave_tests_"))
+shutil.copy(APPODS_DIR.parent / "data" / "categorias.json", DATA / "categorias.json")
+os.environ["ZAVE_DATA_DIR"] = str(DATA)
+os.environ["ZAVE_STORAGE"] = "csv"
+os.environ["ZAVE_PRECALENTAR_IA"] = "0"
+
+
+@pytest.fixture
+def data_dir():
+    """Carpeta de datos vacía (solo categorias.json) y cachés del ledger en frío."""
+    from core import storage
+    for p in DATA.iterdir():
+        if p.name != "categorias.json":
+            shutil.rmtree(p) if p.is_dir() else p.unlink()
+    storage._reset_ledger()
+    return DATA
@@ -0,0 +1,79 @@
+# tests/test_storage.py — ledger CSV (core.storage)
+from core import storage
+
+ENCABEZADO = "id,fecha,descripcion,categoria,monto\n"
+
+
+def _descripciones():
+    return [r["descripcion"] for r in storage.load_gastos()]
+
+
+def test_ultima_fila_sin_salto_de_linea(data_dir):
+    (data_dir / "gastos.csv").write_text(ENCABEZADO + "a1,2025-01-01,uno,Otros,10.00\n"
+                                         "a2,2025-01-02,dos,Otros,20.00", encoding="utf-8")
+    rows = storage.load_gastos()
+    assert [r["descripcion"] for r in rows] == ["uno", "dos"]
+    assert storage.totals(rows)[0] == 30.0
+
+
+def test_append_despues_de_fila_sin_salto(data_dir):
+    csv_path = data_dir / "gastos.csv"
+    csv_path.write_text(ENCABEZADO + "a1,2025-01-01,uno,Otros,10.00\n"
+                        "a2,2025-01-02,dos,Otros,20.00", encoding="utf-8")
+    storage.append_gasto("tres", "Otros", 30, "2025-01-03T00:00:00")
+    assert _descripciones() == ["uno", "dos", "tres"]
+
+    # Releído en frío desde disco: la fila nueva no quedó pegada a la anterior
+    storage._reset_ledger()
+    rows = storage.load_gastos()
+    assert [r["descripcion"] for r in rows] == ["uno", "dos", "tres"]
+    assert [r["monto"] for r in rows] == ["10.00", "20.00", "30.00"]
+    assert csv_path.read_text(encoding="utf-8").count("\n") == 4
+
+
+def test_columnar_conserva_fechas(data_dir):
+    fechas = ["2024-02-29T23:30:00-06:00", "sin fecha", "2024-03-01 08:00"]
+    for i, f in enumerate(fechas):
+        storage.append_gasto(f"g{i}", "Otros", 10 + i, f)
+    antes = storage.load_gastos()
+    storage.exportar_columnar()
+    assert storage.importar_columnar() == 3
+    assert storage.load_gastos() == antes
+
+
+def test_periodo_con_zona_horaria(data_dir):
+    # La zona se ignora: cuenta el día escrito, igual en el índice, el filtro y los rollups
+    for i, f in enumerate(["2024-02-29T23:30:00-06:00", "2024-03-01 08:00", "2024-03-31T22:00:00-06:00"]):
+        storage.append_gasto(f"g{i}", "Otros", 10 * (i + 1), f)
+    esperadas = ["g1", "g2"]
+    assert [r["descripcion"] for r in storage.load_gastos("2024-03-01", "2024-04-01")] == esperadas
+    assert [r["descripcion"] for r in storage.iter_gastos("2024-03-01", "2024-04-01")] == esperadas
+    assert storage.totales_por_categoria("2024-03-01", "2024-04-01")[0] == 50.0
+    assert storage.totales_por_categoria("2024-03-01", "2024-03-31T23:00:00")[0] == 50.0
+    storage.exportar_columnar()
+    assert storage.abrir_columnar().totales_por_categoria("2024-03-01", "2024-04-01")[0] == 50.0
+
+
+def test_iter_gastos_en_frio_igual_que_load_gastos(data_dir):
+    (data_dir / "gastos.csv").write_text(
+        ENCABEZADO + "a1,2024-03-31T22:00:00-06:00,uno,Otros,10.00\n"
+        "a2,2024-03-31 23:30,dos,Otros,20.00\n"
+        "a3,2024-04-01,tres,Otros,30.00", encoding="utf-8")
+    for desde, hasta in (("2024-03-31T23:00", None), (None, "2024-03-31 23:00"), (None, None)):
+        storage._reset_ledger()   # sin caché: escaneo por mmap
+        fria = [r["descripcion"] for r in storage.iter_gastos(desde, hasta)]
+        assert fria == [r["descripcion"] for r in storage.load_gastos(desde, hasta)]
+
+
+def test_iter_gastos_sobrevive_a_compactar(data_dir, monkeypatch):
+    monkeypatch.setattr(storage, "ITER_LOTE", 2)
+    storage.append_gastos([{"descripcion": f"g{i}", "categoria": "Otros", "monto": i + 1,
+                            "fecha": f"2024-01-{i + 1:02d}"} for i in range(6)])
+    ids = [r["id"] for r in storage.load_gastos()]
+    storage.update_gasto(ids[4], descripcion="g4 editado")
+    storage._reset_ledger()
+    it = storage.iter_gastos()
+    vistos = [next(it)["descripcion"], next(it)["descripcion"]]
+    storage.compactar()   # reescribe gastos.csv entre tramos
+    vistos += [r["descripcion"] for r in it]
+    assert vistos == ["g0", "g1", "g2", "g3", "g4 editado", "g5"]